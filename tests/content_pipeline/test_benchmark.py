@@ -0,0 +1,52 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from tools.content_pipeline.benchmark import STAGES, compare_to_baseline, main, run_benchmarks
+
+
+class BenchmarkTests(unittest.TestCase):
+    def test_run_benchmarks_reports_every_stage(self):
+        report = run_benchmarks(sizes=[20], isolate=False)
+
+        self.assertEqual([r["stage"] for r in report["results"]], list(STAGES))
+        for result in report["results"]:
+            self.assertGreater(result["entries_per_sec"], 0)
+            self.assertGreater(result["peak_rss_kb"], 0)
+
+    def test_compare_to_baseline_flags_throughput_and_memory(self):
+        baseline = {"results": [
+            {"stage": "run_auto_qa_batch", "size": 100, "entries_per_sec": 1000.0, "peak_rss_kb": 20000},
+            {"stage": "build_review_sample", "size": 100, "entries_per_sec": 500.0, "peak_rss_kb": 20000},
+        ]}
+        report = {"results": [
+            {"stage": "run_auto_qa_batch", "size": 100, "entries_per_sec": 800.0, "peak_rss_kb": 30000},
+            {"stage": "build_review_sample", "size": 100, "entries_per_sec": 450.0, "peak_rss_kb": 21000},
+            {"stage": "write_review_exports", "size": 100, "entries_per_sec": 1.0, "peak_rss_kb": 99999},
+        ]}
+
+        regressions = compare_to_baseline(report, baseline, threshold=0.15)
+
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(all(r.startswith("run_auto_qa_batch@100") for r in regressions))
+
+    def test_main_fails_on_regression_against_stored_baseline(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            baseline_path = Path(tmp) / "baseline.json"
+            baseline_path.write_text(json.dumps({"results": [
+                {"stage": "run_auto_qa_batch", "size": 10, "entries_per_sec": 1e12, "peak_rss_kb": 1},
+            ]}), encoding="utf-8")
+            output_path = Path(tmp) / "bench" / "report.json"
+
+            code = main([
+                "--sizes", "10", "--stages", "run_auto_qa_batch", "--in-process",
+                "--output", str(output_path), "--baseline", str(baseline_path),
+            ])
+
+            self.assertEqual(code, 1)
+            self.assertEqual(json.loads(output_path.read_text(encoding="utf-8"))["results"][0]["size"], 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
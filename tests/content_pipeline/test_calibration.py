@@ -0,0 +1,115 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from tools.content_pipeline import calibration
+from tools.content_pipeline.calibration import (
+    aggregate_events,
+    calibrate_dataset,
+    calibrate_entry,
+    difficulty_for_solve_rate,
+    write_event_fixture,
+)
+from tools.content_pipeline.chunk_store import iter_dataset_entries, read_manifest
+from tools.content_pipeline.entry_index import EntryIndex
+from tools.content_pipeline.pilot_generation import write_pilot_dataset
+
+
+class CalibrationTests(unittest.TestCase):
+    def test_aggregates_across_batches(self):
+        events = [("a", True), ("b", False), ("a", False), ("c", True), ("a", True)]
+        counters = aggregate_events(events, batch_size=2)
+        self.assertEqual(counters.totals("a"), (3, 2))
+        self.assertEqual(counters.totals("b"), (1, 0))
+        self.assertEqual(counters.totals("missing"), (0, 0))
+        self.assertEqual(counters.events, 5)
+
+    def test_stdlib_fallback_matches(self):
+        events = [(f"e{i % 7}", i % 3 == 0) for i in range(100)]
+        with mock.patch.object(calibration, "np", None):
+            fallback = aggregate_events(events, batch_size=13)
+        default = aggregate_events(events, batch_size=13)
+        for entry_id in fallback.ids:
+            self.assertEqual(fallback.totals(entry_id), default.totals(entry_id))
+
+    @unittest.skipIf(calibration.np is None, "numpy is not installed")
+    def test_numpy_and_fallback_calibrate_the_same_dataset(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp) / "dataset"
+            events_path = Path(tmp) / "events.jsonl"
+            write_pilot_dataset(str(source), per_language=15, chunk_size=10)
+            write_event_fixture(str(source), str(events_path), events_per_entry=25)
+
+            calibrate_dataset(str(source), str(events_path), str(Path(tmp) / "numpy"), batch_size=64)
+            with mock.patch.object(calibration, "np", None):
+                calibrate_dataset(str(source), str(events_path), str(Path(tmp) / "fallback"), batch_size=64)
+            results = [
+                list(iter_dataset_entries(Path(tmp) / name, read_manifest(Path(tmp) / name)))
+                for name in ("numpy", "fallback")
+            ]
+        self.assertEqual(len(results[0]), 60)
+        self.assertEqual(results[0], results[1])
+
+    def test_calibrate_entry_needs_enough_attempts(self):
+        entry = {"difficulty": 1, "quality_scores": {"predicted_solve_rate": 0.9}, "version": 2}
+        self.assertIsNone(calibrate_entry(entry, attempts=5, solves=0))
+
+        updated = calibrate_entry(entry, attempts=90, solves=18)
+        self.assertEqual(updated["quality_scores"]["predicted_solve_rate"], 0.27)
+        self.assertEqual(updated["difficulty"], difficulty_for_solve_rate(0.27))
+        self.assertEqual(updated["difficulty"], 5)
+        self.assertEqual(updated["difficulty_confidence"], 0.9)
+        self.assertEqual(updated["version"], 3)
+        self.assertEqual(entry["version"], 2)
+
+    def test_calibration_rechecks_readability_for_the_new_difficulty(self):
+        entry = {
+            "clue_text": "x" * 60,
+            "difficulty": 2,
+            "quality_scores": {"predicted_solve_rate": 0.8},
+            "auto_qa": {"leak": [], "readability": []},
+        }
+        updated = calibrate_entry(entry, attempts=200, solves=190)
+        self.assertEqual(updated["difficulty"], 1)
+        self.assertEqual(updated["auto_qa"], {"leak": [], "readability": ["readability_flag"]})
+        self.assertEqual(entry["auto_qa"]["readability"], [])
+
+    def test_calibrates_dataset_into_new_versions(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp) / "dataset"
+            target = Path(tmp) / "calibrated"
+            events_path = Path(tmp) / "events.jsonl"
+            write_pilot_dataset(str(source), per_language=20, chunk_size=8, storage_format="jsonl.gz")
+            written = write_event_fixture(str(source), str(events_path), events_per_entry=30)
+            with events_path.open("a", encoding="utf-8") as fp:
+                fp.write(json.dumps({"entry_id": "xx-000001", "solved": True}) + "\n")
+                # entries with too few attempts keep their version
+                for _ in range(3):
+                    fp.write(json.dumps({"entry_id": "de-000019", "solved": False}) + "\n")
+
+            lost = source / read_manifest(source)["languages"]["es"]["files"][-1]
+            lost.unlink()
+            manifest = calibrate_dataset(str(source), str(events_path), str(target), batch_size=100)
+            entries = {e["entry_id"]: e for e in iter_dataset_entries(target, read_manifest(target))}
+            with EntryIndex(target) as index:
+                indexed = index.get("fr-000004")
+
+        self.assertEqual(written, 80 * 30)
+        self.assertEqual(manifest["calibration"]["events"], written + 4)
+        # the lost last es chunk held 4 entries; their events count as unknown
+        self.assertEqual(manifest["calibration"]["calibrated_entries"], 76)
+        self.assertEqual(manifest["calibration"]["unknown_entry_ids"], 5)
+        self.assertEqual(manifest["calibration"]["missing_files"], [str(lost.relative_to(source))])
+        es = manifest["languages"]["es"]
+        self.assertEqual(es["files"], [record["file"] for record in es["chunk_records"]])
+        self.assertEqual((es["chunks"], es["entries"]), (2, 16))
+        self.assertEqual(manifest["storage_format"], "jsonl.gz")
+        self.assertEqual(entries["es-000003"]["version"], 2)
+        self.assertEqual(entries["es-000003"]["difficulty_confidence"], 0.75)
+        self.assertEqual(indexed, entries["fr-000004"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from tools.content_pipeline.chunk_store import (
+    ColumnarChunkReader,
+    iter_dataset_entries,
+    read_chunk,
+    read_manifest,
+    write_atomic,
+    write_chunk,
+)
+from tools.content_pipeline.pilot_generation import generate_language_entries, write_pilot_dataset
+from tools.content_pipeline.review_sample import build_review_sample
+
+
+class ChunkStoreTests(unittest.TestCase):
+    def test_every_format_round_trips_entries(self):
+        entries = generate_language_entries("es", count=25)
+        with tempfile.TemporaryDirectory() as tmp:
+            for storage_format in ("json", "jsonl.gz", "columnar"):
+                path = Path(tmp) / f"chunk.{storage_format}"
+                write_chunk(path, entries, storage_format)
+                self.assertEqual(read_chunk(path, storage_format), entries, storage_format)
+
+    def test_columnar_reader_projects_requested_columns(self):
+        entries = generate_language_entries("de", count=30)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "batch_001.spcol"
+            write_chunk(path, entries, "columnar")
+
+            with ColumnarChunkReader(path) as reader:
+                self.assertIn("quality_scores.readability", reader.columns)
+                rows = reader.read_rows(["language", "difficulty", "quality_scores"])
+
+        self.assertEqual(rows[3], {
+            "language": "de",
+            "difficulty": entries[3]["difficulty"],
+            "quality_scores": entries[3]["quality_scores"],
+        })
+
+    def test_columnar_rows_do_not_share_dictionary_values(self):
+        entries = generate_language_entries("en", count=10)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "batch_001.spcol"
+            write_chunk(path, entries, "columnar")
+            rows = read_chunk(path, "columnar")
+
+        rows[0]["auto_qa"]["leak"].append("manual_flag")
+        self.assertEqual(rows[1]["auto_qa"]["leak"], entries[1]["auto_qa"]["leak"])
+
+    def test_pilot_dataset_in_columnar_format_is_readable(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = write_pilot_dataset(tmp, per_language=40, chunk_size=15, storage_format="columnar")
+            self.assertEqual(manifest["storage_format"], "columnar")
+            self.assertTrue(manifest["languages"]["fr"]["files"][0].endswith(".spcol"))
+
+            projected = list(iter_dataset_entries(Path(tmp), read_manifest(Path(tmp)), columns=["clue_text"]))
+            self.assertEqual(len(projected), 160)
+            self.assertEqual(set(projected[0]), {"clue_text"})
+
+            sample = build_review_sample(tmp, sample_size=30)
+            self.assertEqual(len(sample), 30)
+
+    def test_concurrent_atomic_writes_publish_one_whole_payload(self):
+        payloads = [bytes([value]) * 200_000 for value in range(8)]
+        with tempfile.TemporaryDirectory() as tmp:
+            target = Path(tmp) / "shared.json"
+            threads = [threading.Thread(target=write_atomic, args=(target, payload)) for payload in payloads]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertIn(target.read_bytes(), payloads)
+            self.assertEqual([path.name for path in Path(tmp).iterdir()], ["shared.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
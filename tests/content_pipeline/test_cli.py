@@ -0,0 +1,68 @@
+import contextlib
+import io
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from tools.content_pipeline.cli import main
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def _run(argv):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        code = main(argv)
+    return code, json.loads(out.getvalue()) if out.getvalue() else None
+
+
+class CliTests(unittest.TestCase):
+    def test_subcommands_on_a_small_dataset(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            dataset = str(Path(tmp) / "ds")
+            code, generated = _run(["generate", dataset, "--per-language", "20", "--chunk-size", "10"])
+            self.assertEqual(code, 0)
+            self.assertEqual(generated["chunks"], 8)
+
+            code, stats = _run(["stats", dataset])
+            self.assertEqual((code, stats["entries"], stats["languages"]["de"]["chunks"]), (0, 80, 2))
+
+            code, validated = _run(["validate", dataset])
+            self.assertEqual((code, validated["complete"], validated["issues"]), (0, True, {}))
+
+            code, qa = _run(["qa", dataset])
+            self.assertEqual((code, qa["entries"], qa["changed"]), (0, 80, 0))
+
+            code, sample = _run(["sample", dataset, str(Path(tmp) / "sample"), "--size", "8"])
+            self.assertEqual(sample["entries"], 8)
+            self.assertTrue(Path(sample["csv"]).exists())
+
+            code, exported = _run(["export", dataset, "--output-dir", str(Path(tmp) / "out"), "--all-statuses"])
+            self.assertEqual((code, exported["entries"]), (0, 80))
+            code, again = _run(["export", dataset, "--output-dir", str(Path(tmp) / "out2"), "--all-statuses"])
+            self.assertEqual((code, again["entries"]), (0, 80))
+            self.assertTrue((Path(tmp) / "out2" / "de" / "batch_001.json").exists())
+
+    def test_errors_exit_with_code_two(self):
+        with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stderr(io.StringIO()) as err:
+            self.assertEqual(main(["stats", tmp]), 2)
+        self.assertIn("manifest_not_found", err.getvalue())
+
+    def test_help_does_not_import_pipeline_modules(self):
+        probe = (
+            "import sys\n"
+            "from tools.content_pipeline.cli import build_parser\n"
+            "build_parser().format_help()\n"
+            "print(sorted(m for m in sys.modules if m.startswith('tools.content_pipeline.')))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", probe], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        )
+        self.assertEqual(result.stdout.strip(), "['tools.content_pipeline.cli']")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import asyncio
+import socket
+import tempfile
+import unittest
+from pathlib import Path
+
+from tools.content_pipeline.chunk_store import iter_dataset_entries, read_manifest
+from tools.content_pipeline.clue_generation import (
+    HttpClueBackend,
+    StubClueServer,
+    generate_candidates,
+    generate_clues,
+    generate_dataset_clues,
+)
+from tools.content_pipeline.pilot_generation import iter_language_entries, write_pilot_dataset
+from tools.content_pipeline.qa_cache import QACache
+
+
+class _ListBackend:
+    name = "fixed"
+
+    def __init__(self):
+        self.batches = []
+
+    async def generate(self, language, items, candidates):
+        self.batches.append([item["id"] for item in items])
+        return {item["id"]: [f"{item['word']} again", "  ", "You open it to enter a room"] for item in items}
+
+
+async def _generate_with_http(url, entries, **options):
+    backend = HttpClueBackend(url, max_connections=3, backoff=0.0)
+    try:
+        await generate_clues(entries, backend, batch_size=4, concurrency=3, **options)
+    finally:
+        await backend.close()
+    return backend
+
+
+class ClueGenerationTests(unittest.TestCase):
+    def test_http_backend_pools_connections_and_retries(self):
+        entries = list(iter_language_entries("en", 40))
+        with StubClueServer(fail_first=2, delay=0.01) as stub:
+            backend = asyncio.run(_generate_with_http(stub.url, entries))
+
+        self.assertEqual((backend.requests, backend.retried), (12, 2))
+        self.assertLessEqual(stub.max_in_flight, 3)
+        self.assertLessEqual(stub.connections, 3 + 2)
+        for entry in entries:
+            self.assertNotIn(entry["word"], entry["clue_text"])
+            self.assertEqual(entry["auto_qa"]["leak"], [])
+            self.assertEqual(len(entry["clue_variants"]), 2)
+
+    def test_candidates_are_cached(self):
+        entries = list(iter_language_entries("de", 10))
+        with tempfile.TemporaryDirectory() as tmp, StubClueServer() as stub:
+            with QACache(str(Path(tmp) / "cache.sqlite")) as cache:
+                first = asyncio.run(_generate_with_http(stub.url, entries, cache=cache))
+                again = list(iter_language_entries("de", 10))
+                second = asyncio.run(_generate_with_http(stub.url, again, cache=cache))
+        self.assertEqual((first.requests, second.requests), (3, 0))
+        self.assertEqual([e["clue_text"] for e in entries], [e["clue_text"] for e in again])
+
+    def test_pluggable_backend_and_unreachable_host(self):
+        backend = _ListBackend()
+        entries = list(iter_language_entries("fr", 5)) + list(iter_language_entries("es", 3))
+        asyncio.run(generate_clues(entries, backend, batch_size=2))
+        self.assertEqual(sorted(len(batch) for batch in backend.batches), [1, 1, 2, 2, 2])
+        self.assertTrue(all(entry["clue_text"] == "You open it to enter a room" for entry in entries))
+        self.assertEqual(entries[0]["clue_variants"], [])
+
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        unreachable = HttpClueBackend(f"http://127.0.0.1:{port}/v1", retries=1, backoff=0.0, timeout=2)
+        try:
+            with self.assertRaisesRegex(ConnectionError, "backend_unavailable"):
+                asyncio.run(generate_candidates(entries[:1], unreachable))
+        finally:
+            asyncio.run(unreachable.close())
+        self.assertEqual(unreachable.requests, 2)
+
+    def _retried_until_unavailable(self, respond):
+        async def handler(reader, writer):
+            await reader.readuntil(b"\r\n\r\n")
+            writer.write(respond)
+            await writer.drain()
+            writer.close()
+
+        async def scenario():
+            server = await asyncio.start_server(handler, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            backend = HttpClueBackend(f"http://127.0.0.1:{port}/v1", retries=2, backoff=0.0, timeout=2)
+            try:
+                with self.assertRaisesRegex(ConnectionError, "backend_unavailable"):
+                    await backend.generate("en", [{"id": "0", "word": "haus"}], 2)
+            finally:
+                await backend.close()
+                server.close()
+                await server.wait_closed()
+            return backend
+
+        backend = asyncio.run(scenario())
+        self.assertEqual((backend.requests, backend.retried), (3, 2))
+
+    def test_garbled_status_line_is_retried(self):
+        self._retried_until_unavailable(b"HTTP/1.1 OK\r\nContent-Length: 0\r\n\r\n")
+
+    def test_malformed_chunk_size_is_retried(self):
+        self._retried_until_unavailable(b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\nzz\r\n")
+
+    def test_non_json_body_is_retried(self):
+        self._retried_until_unavailable(b"HTTP/1.1 200 OK\r\nContent-Length: 6\r\n\r\n<html>")
+
+    def test_finished_batches_are_cached_before_a_failure(self):
+        class FailingBackend(_ListBackend):
+            async def generate(self, language, items, candidates):
+                if self.batches:
+                    raise ConnectionError("backend_unavailable")
+                return await super().generate(language, items, candidates)
+
+        entries = list(iter_language_entries("en", 4))
+        with tempfile.TemporaryDirectory() as tmp, QACache(str(Path(tmp) / "cache.sqlite")) as cache:
+            with self.assertRaisesRegex(ConnectionError, "backend_unavailable"):
+                asyncio.run(generate_candidates(entries, FailingBackend(), batch_size=2, concurrency=1, cache=cache))
+            self.assertEqual(len(cache), 2)
+
+    def test_dataset_stage_keeps_layout(self):
+        with tempfile.TemporaryDirectory() as tmp, StubClueServer() as stub:
+            write_pilot_dataset(str(Path(tmp) / "ds"), per_language=20, chunk_size=10, storage_format="jsonl.gz")
+            manifest = generate_dataset_clues(str(Path(tmp) / "ds"), str(Path(tmp) / "out"), stub.url, candidates=3)
+            source = read_manifest(Path(tmp) / "ds")
+            self.assertEqual(manifest["clue_generation"]["entries_generated"], 80)
+            for language, info in manifest["languages"].items():
+                self.assertEqual(info["files"], source["languages"][language]["files"])
+            entries = list(iter_dataset_entries(Path(tmp) / "out", read_manifest(Path(tmp) / "out")))
+            self.assertEqual(len(entries), 80)
+            self.assertTrue(all(entry["clue_text"].startswith("Hint ") for entry in entries))
+
+
+if __name__ == "__main__":
+    unittest.main()
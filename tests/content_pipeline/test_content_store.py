@@ -0,0 +1,88 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from tools.content_pipeline.chunk_store import iter_dataset_entries, read_manifest
+from tools.content_pipeline.content_store import ContentStore
+from tools.content_pipeline.pilot_generation import iter_language_entries, write_pilot_dataset
+
+
+class ContentStoreTests(unittest.TestCase):
+    def test_versions_share_unchanged_entries(self):
+        entries = list(iter_language_entries("en", 200))
+        with tempfile.TemporaryDirectory() as tmp:
+            store = ContentStore(tmp)
+            first = store.commit_entries("v1", entries, bucket_count=32)
+
+            entries[5] = {**entries[5], "status": "approved", "version": 2}
+            del entries[7]
+            entries.append({**entries[0], "entry_id": "en-999999"})
+            second = store.commit_entries("v2", entries, bucket_count=32)
+
+            self.assertEqual(first["new_objects"], 200)
+            self.assertEqual(second["new_objects"], 2)
+            self.assertEqual(store.diff("v1", "v2"), {
+                "added": ["en-999999"],
+                "changed": ["en-000005"],
+                "removed": ["en-000007"],
+            })
+            self.assertEqual(store.get_entry("v2", "en-000005")["status"], "approved")
+            self.assertIsNone(store.get_entry("v2", "en-000007"))
+            self.assertEqual(len(list(store.iter_entries("v2"))), 200)
+            self.assertEqual(store.versions(), ["v1", "v2"])
+
+    def test_diff_reads_only_changed_buckets(self):
+        entries = list(iter_language_entries("de", 300))
+        with tempfile.TemporaryDirectory() as tmp:
+            store = ContentStore(tmp)
+            store.commit_entries("a", entries, bucket_count=64)
+            entries[10] = {**entries[10], "clue_text": "Neuer Hinweis"}
+            store.commit_entries("b", entries, bucket_count=64)
+
+            with mock.patch.object(store, "_bucket", wraps=store._bucket) as reads:
+                diff = store.diff("a", "b")
+            self.assertEqual(diff["changed"], ["de-000010"])
+            self.assertEqual(reads.call_count, 2)
+
+            store.commit_entries("c", entries, bucket_count=16)
+            self.assertEqual(store.diff("b", "c"), {"added": [], "changed": [], "removed": []})
+
+    def test_commit_dataset_round_trips(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            dataset = Path(tmp) / "dataset"
+            write_pilot_dataset(str(dataset), per_language=15, chunk_size=5, storage_format="columnar")
+            store = ContentStore(str(Path(tmp) / "store"))
+            version = store.commit_dataset("nightly-1", str(dataset))
+            expected = sorted(iter_dataset_entries(dataset, read_manifest(dataset)), key=lambda e: e["entry_id"])
+
+            self.assertEqual(version["entries"], 60)
+            self.assertEqual(sorted(store.iter_entries("nightly-1"), key=lambda e: e["entry_id"]), expected)
+            with self.assertRaisesRegex(ValueError, "version_exists"):
+                store.commit_dataset("nightly-1", str(dataset))
+            with self.assertRaisesRegex(ValueError, "invalid_version_name"):
+                store.load_version("../escape")
+
+    def test_rebuilt_dataset_shares_entries_despite_new_timestamps(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            dataset = Path(tmp) / "dataset"
+            store = ContentStore(str(Path(tmp) / "store"))
+            write_pilot_dataset(str(dataset), per_language=15, chunk_size=5, resume=False)
+            first = store.commit_dataset("run-1", str(dataset), bucket_count=8)
+            write_pilot_dataset(str(dataset), per_language=15, chunk_size=5, resume=False)
+            second = store.commit_dataset("run-2", str(dataset), bucket_count=8)
+            rebuilt = next(iter_dataset_entries(dataset, read_manifest(dataset)))
+
+            self.assertEqual(first["new_objects"], 60)
+            self.assertEqual(second["new_objects"], 0)
+            self.assertEqual(first["buckets"], second["buckets"])
+            self.assertEqual(store.diff("run-1", "run-2"), {"added": [], "changed": [], "removed": []})
+            self.assertEqual(store.get_entry("run-2", rebuilt["entry_id"]), rebuilt)
+            self.assertNotEqual(
+                store.get_entry("run-1", rebuilt["entry_id"])["source_trace"]["imported_at"],
+                rebuilt["source_trace"]["imported_at"],
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
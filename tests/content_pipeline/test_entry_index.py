@@ -0,0 +1,64 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from tools.content_pipeline import entry_index
+from tools.content_pipeline.chunk_store import iter_dataset_entries, read_manifest
+from tools.content_pipeline.entry_index import EntryIndex, build_entry_index
+from tools.content_pipeline.pilot_generation import write_pilot_dataset
+
+
+class EntryIndexTests(unittest.TestCase):
+    def test_lookups_match_full_scan_in_every_format(self):
+        for storage_format in ("json", "jsonl.gz", "columnar"):
+            with tempfile.TemporaryDirectory() as tmp:
+                manifest = write_pilot_dataset(tmp, per_language=25, chunk_size=10, storage_format=storage_format)
+                self.assertEqual(manifest["entry_index"], "entry_index.sqlite")
+                expected = {entry["entry_id"]: entry for entry in iter_dataset_entries(Path(tmp), manifest)}
+
+                with EntryIndex(Path(tmp)) as index:
+                    self.assertEqual(len(index), 100)
+                    self.assertEqual(index.get("fr-000013"), expected["fr-000013"], storage_format)
+                    wanted = ["es-000024", "de-000000", "missing", "es-000003"]
+                    found = index.get_many(wanted)
+                    self.assertEqual(list(found), ["es-000024", "de-000000", "es-000003"])
+                    self.assertEqual(found["es-000003"], expected["es-000003"], storage_format)
+                    self.assertIsNone(index.get("missing"))
+
+    def test_json_locations_point_at_single_entries(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_pilot_dataset(tmp, per_language=12, chunk_size=5)
+            with EntryIndex(Path(tmp)) as index:
+                rel_file, row, offset, length = index.locate("de-000007")
+            raw = (Path(tmp) / rel_file).read_bytes()[offset : offset + length]
+
+        self.assertEqual((rel_file, row), (str(Path("de") / "batch_002.json"), 2))
+        self.assertTrue(raw.startswith(b"{") and raw.endswith(b"}"))
+        self.assertIn(b'"entry_id": "de-000007"', raw)
+
+    def test_rebuild_only_reindexes_changed_chunks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = write_pilot_dataset(tmp, per_language=20, chunk_size=10)
+            manifest["languages"]["en"]["chunk_records"][1]["sha256"] = "changed"
+
+            with mock.patch.object(entry_index, "_chunk_locations", wraps=entry_index._chunk_locations) as reads:
+                count = build_entry_index(Path(tmp), manifest)
+
+            self.assertEqual(count, 80)
+            self.assertEqual([call.args[0].name for call in reads.call_args_list], ["batch_002.json"])
+
+            smaller = write_pilot_dataset(tmp, per_language=10, chunk_size=10)
+            self.assertEqual(build_entry_index(Path(tmp), read_manifest(Path(tmp))), 40)
+            with EntryIndex(Path(tmp)) as index:
+                self.assertNotIn("en-000015", index)
+            self.assertEqual(smaller["languages"]["en"]["chunks"], 1)
+
+    def test_missing_index_raises(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaises(FileNotFoundError):
+                EntryIndex(Path(tmp))
+
+
+if __name__ == "__main__":
+    unittest.main()
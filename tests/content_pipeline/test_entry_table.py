@@ -0,0 +1,113 @@
+import json
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+from unittest import mock
+
+from tools.content_pipeline import entry_table
+from tools.content_pipeline.entry_table import EntryTable
+from tools.content_pipeline.game_artifact import compile_dataset, compile_table
+from tools.content_pipeline.pilot_generation import iter_language_entries, write_pilot_dataset
+from tools.content_pipeline.review_sample import build_review_sample, build_review_sample_from_table
+
+
+def _entries():
+    entries = [entry for language in ("de", "fr") for entry in iter_language_entries(language, 300)]
+    for entry in entries[::4]:
+        entry["status"] = "approved"
+    entries[3]["auto_qa"] = {"leak": ["word_leak"], "policy": []}
+    del entries[8]["clue_style"]
+    entries[9]["version"] = "2b"
+    return entries
+
+
+class EntryTableTests(unittest.TestCase):
+    def test_rows_round_trip(self):
+        entries = _entries()
+        table = EntryTable.from_entries(entries)
+        self.assertEqual(len(table), len(entries))
+        self.assertEqual(list(table.rows()), entries)
+        self.assertEqual(table.column("version")[9], "2b")
+        self.assertEqual(
+            list(table.rows([3], columns=["entry_id", "auto_qa"])),
+            [{"entry_id": entries[3]["entry_id"], "auto_qa": {"leak": ["word_leak"], "policy": []}}],
+        )
+        table.row(3)["auto_qa"]["leak"].append("changed")
+        self.assertEqual(table.row(3)["auto_qa"]["leak"], ["word_leak"])
+
+    def test_select_and_group(self):
+        entries = _entries()
+        table = EntryTable.from_entries(entries)
+
+        rows = table.select({"language": "de", "difficulty": [1, 2], "status": "approved"})
+        expected = [
+            i for i, entry in enumerate(entries)
+            if entry["language"] == "de" and entry["difficulty"] in (1, 2) and entry["status"] == "approved"
+        ]
+        self.assertEqual(list(rows), expected)
+        self.assertEqual(list(table.select({"language": "xx"})), [])
+
+        counts = table.group_counts(["language", "status"])
+        self.assertEqual(counts, dict(Counter((entry["language"], entry["status"]) for entry in entries)))
+        self.assertEqual(list(counts)[0], ("de", "approved"))
+        groups = table.group_indices(["difficulty"], rows=rows)
+        self.assertEqual(sorted(groups), [(1,), (2,)])
+        self.assertEqual(sorted(row for group in groups.values() for row in group), expected)
+        self.assertLess(table.nbytes(), len(json.dumps(entries)))
+
+    def test_review_sample_and_artifacts_from_table(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_pilot_dataset(tmp, per_language=50, chunk_size=25)
+            table = EntryTable.from_dataset(tmp)
+            for allocation in ("round_robin", "proportional"):
+                self.assertEqual(
+                    build_review_sample_from_table(table, 30, seed=5, allocation=allocation),
+                    build_review_sample(tmp, 30, seed=5, allocation=allocation),
+                )
+
+            entries = list(table.rows())
+            for entry in entries[::3]:
+                entry["status"] = "approved"
+            approved = EntryTable.from_entries(entries)
+            with_table = compile_table(approved, str(Path(tmp) / "from_table"), sizes=(5, 7))
+            dataset_dir = Path(tmp) / "approved"
+            (dataset_dir / "all").mkdir(parents=True)
+            (dataset_dir / "all" / "batch_001.json").write_text(json.dumps(entries), encoding="utf-8")
+            manifest = {"languages": {
+                language: {"files": ["all/batch_001.json"]} for language in ("de", "en", "fr", "es")
+            }}
+            (dataset_dir / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+            with_dataset = compile_dataset(str(dataset_dir), str(Path(tmp) / "from_dataset"), sizes=(5, 7))
+            self.assertEqual(
+                [record["sha256"] for record in with_table["artifacts"]],
+                [record["sha256"] for record in with_dataset["artifacts"]],
+            )
+            self.assertTrue(with_table["artifacts"])
+
+    @unittest.skipIf(entry_table.np is None, "numpy is not installed")
+    def test_numpy_and_fallback_paths_agree(self):
+        table = EntryTable.from_entries(_entries())
+        rows = table.select({"language": "fr"})
+
+        def run_queries():
+            return [
+                list(table.select({"language": ["de", "xx"], "difficulty": [1, 2, 9], "status": "approved"})),
+                list(table.select({"quality_scores.readability": table.column("quality_scores.readability")[:40]})),
+                list(table.select({"version": [1, "2b"]})),
+                table.group_counts(["language", "status"]),
+                table.group_counts(["difficulty", "clue_style"], rows=rows),
+                {key: list(group) for key, group in table.group_indices(["quality_scores.similarity"]).items()},
+                {key: list(group) for key, group in table.group_indices(["status", "version"], rows=rows[::3]).items()},
+                list(table.rows(rows[:5])),
+            ]
+
+        with_numpy = run_queries()
+        with mock.patch.object(entry_table, "np", None):
+            fallback = run_queries()
+        self.assertEqual(with_numpy, fallback)
+        self.assertEqual(len(with_numpy[3]), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
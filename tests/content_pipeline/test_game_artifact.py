@@ -0,0 +1,77 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from tools.content_pipeline.chunk_store import read_chunk, read_manifest, write_chunk
+from tools.content_pipeline.game_artifact import (
+    build_game_artifacts,
+    compile_dataset,
+    load_game_artifact,
+    write_game_artifacts,
+)
+from tools.content_pipeline.pilot_generation import write_pilot_dataset
+
+
+def _entry(word, profile=None, status="approved", language="en", difficulty=3, flags=None):
+    entry = {
+        "language": language,
+        "word": word,
+        "clue_text": f"Clue for {word}",
+        "difficulty": difficulty,
+        "status": status,
+        "auto_qa": {"policy": flags or []},
+    }
+    if profile is not None:
+        entry["content_profile"] = profile
+    return entry
+
+
+class GameArtifactTests(unittest.TestCase):
+    def test_profiles_are_cumulative_index_lists(self):
+        artifacts = build_game_artifacts([
+            _entry("apple", "kid"),
+            _entry("Bread", "standard"),
+            _entry("c-ake"),
+            _entry("dunes", flags=["policy_unsafe"]),
+            _entry("eagle", "kid", status="draft"),
+            _entry("APPLE", "standard"),
+            _entry("gardens", "kid", difficulty=5),
+        ])
+
+        five = artifacts[("en", 5)]
+        self.assertEqual(five["words"], ["APPLE", "BREAD", "DUNES"])
+        self.assertEqual(five["profiles"], {"kid": [0], "family": [0], "standard": [0, 1, 2]})
+        self.assertEqual(artifacts[("en", 7)]["difficulty"], [3])
+        self.assertNotIn(("en", 4), artifacts)
+
+    def test_compiles_approved_pilot_chunks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            dataset = Path(tmp) / "dataset"
+            write_pilot_dataset(str(dataset), per_language=20, chunk_size=10)
+            chunk_path = dataset / read_manifest(dataset)["languages"]["de"]["files"][0]
+            entries = read_chunk(chunk_path)
+            entries[0].update(word="hausen", status="approved")
+            entries[1].update(word="baeume", status="approved", content_profile="kid")
+            entries[2].update(word="wasser1", status="approved")
+            write_chunk(chunk_path, entries)
+
+            manifest = compile_dataset(str(dataset), str(Path(tmp) / "game"), sizes=[6])
+            artifact = load_game_artifact(str(Path(tmp) / "game" / "de_6.json"))
+            stored = json.loads((Path(tmp) / "game" / "game_manifest.json").read_text(encoding="utf-8"))
+
+        self.assertEqual(artifact["words"], ["HAUSEN", "BAEUME", "WASSER"])
+        self.assertEqual(artifact["profiles"]["kid"], [1])
+        self.assertEqual(stored["artifacts"], manifest["artifacts"])
+        self.assertEqual(manifest["artifacts"][0]["profiles"], {"kid": 1, "family": 3, "standard": 3})
+
+    def test_output_is_stable_between_builds(self):
+        entries = [_entry("apple", "kid"), _entry("lemon")]
+        with tempfile.TemporaryDirectory() as tmp:
+            first = write_game_artifacts(entries, str(Path(tmp) / "a"))
+            second = write_game_artifacts(entries, str(Path(tmp) / "b"))
+        self.assertEqual(first["artifacts"], second["artifacts"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from tools.content_pipeline import auto_qa
+from tools.content_pipeline.auto_qa import run_auto_qa_batch
+from tools.content_pipeline.instrumentation import Metrics
+from tools.content_pipeline.pilot_generation import iter_language_entries, write_pilot_dataset
+
+
+class InstrumentationTests(unittest.TestCase):
+    def test_instrumented_batch_matches_plain_batch(self):
+        entries = list(iter_language_entries("en", 60))
+        entries[0]["clue_text"] = "A thing to hate"
+        metrics = Metrics()
+
+        with mock.patch.object(auto_qa, "_check_entry", wraps=auto_qa._check_entry) as checks:
+            self.assertEqual(run_auto_qa_batch(entries, metrics=metrics), run_auto_qa_batch(entries))
+        # both modes run the same per-entry checks
+        self.assertEqual(checks.call_count, 120)
+        with mock.patch.object(auto_qa.time, "perf_counter", wraps=auto_qa.time.perf_counter) as clock:
+            run_auto_qa_batch(entries)
+        self.assertEqual(clock.call_count, 0)
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["qa.leak"]["calls"], 60)
+        self.assertEqual(snapshot["qa.policy"]["hits"], 1)
+        self.assertEqual(snapshot["qa.ambiguity"]["hits"], 1)
+        self.assertIn("seconds", snapshot["qa.term_scan"])
+
+    def test_manifest_contains_stage_metrics_in_both_modes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            serial = write_pilot_dataset(str(Path(tmp) / "serial"), per_language=40, chunk_size=15, metrics=Metrics())
+            parallel = write_pilot_dataset(
+                str(Path(tmp) / "parallel"), per_language=40, chunk_size=15, workers=2, metrics=Metrics()
+            )
+            plain = write_pilot_dataset(str(Path(tmp) / "plain"), per_language=40, chunk_size=15)
+
+        for manifest in (serial, parallel):
+            stages = manifest["metrics"]
+            self.assertEqual(stages["stage.generation"]["calls"], 160)
+            self.assertEqual(stages["stage.serialization"]["calls"], 160)
+            self.assertEqual(stages["stage.disk_write"]["calls"], 12)
+            self.assertEqual(stages["qa.readability"]["calls"], 160)
+        self.assertIn("stage.plan", parallel["metrics"])
+        self.assertNotIn("metrics", plain)
+
+    def test_exports_prometheus_text_and_json_lines(self):
+        metrics = Metrics()
+        metrics.record("qa.leak", 0.5, calls=4, hits=1)
+        metrics.record("stage.disk_write", 0.25)
+        with tempfile.TemporaryDirectory() as tmp:
+            prom_path = Path(tmp) / "metrics.prom"
+            jsonl_path = Path(tmp) / "metrics.jsonl"
+            metrics.write_prometheus(str(prom_path))
+            metrics.append_jsonl(str(jsonl_path), run="nightly")
+            metrics.append_jsonl(str(jsonl_path), run="nightly")
+
+            prom = prom_path.read_text(encoding="utf-8")
+            lines = [json.loads(line) for line in jsonl_path.read_text(encoding="utf-8").splitlines()]
+
+        self.assertIn('content_pipeline_hits_total{name="qa.leak"} 1', prom)
+        self.assertIn('content_pipeline_calls_total{name="stage.disk_write"} 1', prom)
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(lines[0]["hit_rate"], 0.25)
+
+
+if __name__ == "__main__":
+    unittest.main()
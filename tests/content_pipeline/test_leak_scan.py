@@ -0,0 +1,54 @@
+import tempfile
+import unittest
+
+from tools.content_pipeline.auto_qa import leak_check
+from tools.content_pipeline.leak_scan import AhoCorasick, scan_dataset_leaks, scan_leaks
+from tools.content_pipeline.pilot_generation import iter_language_entries, write_pilot_dataset
+
+
+def _entry(entry_id, word, clue, lemma=None, language="en"):
+    entry = {"entry_id": entry_id, "language": language, "word": word, "clue_text": clue}
+    if lemma is not None:
+        entry["lemma"] = lemma
+    return entry
+
+
+class LeakScanTests(unittest.TestCase):
+    def test_automaton_reports_overlapping_matches(self):
+        automaton = AhoCorasick()
+        for term in ("he", "she", "his", "hers"):
+            automaton.add(term, term)
+        matches = sorted((start, term) for start, _, term in automaton.iter_matches("ushers"))
+        self.assertEqual(matches, [(1, "she"), (2, "he"), (2, "hers")])
+
+    def test_reports_self_and_cross_leaks(self):
+        results = scan_leaks([
+            _entry("en-1", "garden", "Place where flowers grow"),
+            _entry("en-2", "flower", "Blooms in the garden"),
+            _entry("en-3", "running", "They ran after the run", lemma="run"),
+            _entry("en-4", "river", "Water flows, rivers bend"),
+            _entry("en-5", "bloom", "A flowerbed, not a garden", language="de"),
+        ])
+
+        self.assertEqual(results["en-1"], {"self": [], "cross": ["en-2"]})
+        self.assertEqual(results["en-2"], {"self": [], "cross": ["en-1"]})
+        self.assertEqual(results["en-3"]["self"], ["lemma_leak"])
+        self.assertEqual(results["en-4"], {"self": ["word_leak"], "cross": []})
+        # other languages are scanned separately
+        self.assertEqual(results["en-5"]["cross"], [])
+
+    def test_self_leaks_agree_with_auto_qa(self):
+        entries = list(iter_language_entries("de", 200))
+        results = scan_leaks(entries)
+        for entry in entries:
+            self.assertEqual(results[entry["entry_id"]]["self"], leak_check(entry["word"], entry["clue_text"]))
+
+    def test_scans_a_pilot_dataset(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_pilot_dataset(tmp, per_language=30, chunk_size=10, storage_format="columnar")
+            results = scan_dataset_leaks(tmp)
+        self.assertEqual(len(results), 120)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from tools.content_pipeline.lifecycle_log import LOG_FILE, SNAPSHOT_FILE, LifecycleLog
+from tools.content_pipeline.phase1_model import Status
+from tools.content_pipeline.reviewer_queue import QueueItem, ReviewDecision, apply_decision
+
+
+class LifecycleLogTests(unittest.TestCase):
+    def test_batch_is_rejected_as_a_whole(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log = LifecycleLog(tmp)
+            log.register([("a", "reviewed"), ("b", "draft")])
+            log.apply_transitions([
+                ("a", "approved", "approve", None, ""),
+                ("b", "reviewed", "submit", None, ""),
+            ])
+            with self.assertRaisesRegex(ValueError, "invalid_transition"):
+                log.apply_transitions([
+                    ("b", "approved", "approve", None, ""),
+                    ("a", "draft", "request_edit", "ambiguity", ""),
+                ])
+            self.assertEqual(log.statuses(), {"a": "approved", "b": "reviewed"})
+            self.assertEqual(len(list(log.history())), 4)
+
+            with self.assertRaisesRegex(ValueError, "invalid_transition"):
+                log.apply_transitions([("a", "reviewed", "reopen", None, "")])
+            with self.assertRaisesRegex(ValueError, "unknown_entry_id"):
+                log.apply_transitions([("zzz", "reviewed", "submit", None, "")])
+            self.assertEqual(log.status("a"), Status.APPROVED)
+
+    def test_decisions_leave_an_audit_trail(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log = LifecycleLog(tmp)
+            log.register([("en-1", "reviewed")])
+            item = QueueItem("en-1", "en", "apple", "Red fruit", [], {}, {})
+            apply_decision(item, ReviewDecision("escalate", "ambiguity", "second opinion"), log)
+            apply_decision(item, ReviewDecision("approve"), log)
+            self.assertEqual(item.status, "approved")
+            with self.assertRaisesRegex(ValueError, "invalid_transition"):
+                apply_decision(item, ReviewDecision("request_edit", "ambiguity"), log)
+            self.assertEqual(item.status, "approved")
+
+            trail = [(event["action"], event["from"], event["to"]) for event in log.history("en-1")]
+            self.assertEqual(trail, [
+                ("register", None, "reviewed"),
+                ("escalate", "reviewed", "reviewed"),
+                ("approve", "reviewed", "approved"),
+            ])
+
+    def test_rejected_decision_batch_keeps_sequence_gapless(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log = LifecycleLog(tmp)
+            log.register([("a", "reviewed"), ("b", "reviewed")])
+            with self.assertRaises(ValueError):
+                log.apply_decisions([
+                    ("a", ReviewDecision("approve")),
+                    ("b", ReviewDecision("reject", "not_a_code")),
+                ])
+            log.apply_decisions([("a", ReviewDecision("approve"))])
+            self.assertEqual([event["seq"] for event in log.history()], [1, 2, 3])
+
+    def test_reload_uses_snapshot_and_tail(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log = LifecycleLog(tmp, snapshot_every=50)
+            log.register([(f"e{i}", "draft") for i in range(40)])
+            log.apply_transitions([(f"e{i}", "reviewed", "submit", None, "") for i in range(20)])
+            snapshot = json.loads((Path(tmp) / SNAPSHOT_FILE).read_text(encoding="utf-8"))
+            self.assertEqual(snapshot["sequence"], 60)
+            log.apply_transitions([("e0", "approved", "approve", None, "")])
+
+            with (Path(tmp) / LOG_FILE).open("ab") as fp:
+                fp.write(b'{"seq": 62, "entry_id": "e1", "to": "appr')
+
+            reloaded = LifecycleLog(tmp)
+            self.assertEqual(reloaded.statuses(), log.statuses())
+            self.assertEqual(reloaded.status("e0"), Status.APPROVED)
+            self.assertEqual(reloaded.status("e1"), Status.REVIEWED)
+            reloaded.apply_transitions([("e1", "approved", "approve", None, "")])
+            self.assertEqual(len(list(reloaded.history())), 62)
+            self.assertEqual(LifecycleLog(tmp).status("e1"), Status.APPROVED)
+
+
+if __name__ == "__main__":
+    unittest.main()
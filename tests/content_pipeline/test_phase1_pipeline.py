@@ -1,13 +1,16 @@
+import dataclasses
 import unittest
 
-from tools.content_pipeline.auto_qa import run_auto_qa
+from tools.content_pipeline.auto_qa import run_auto_qa, run_auto_qa_batch
 from tools.content_pipeline.phase1_model import (
     ContentEntry,
     SourceTrace,
     Status,
     can_transition,
+    validate_entries,
     validate_entry,
 )
+from tools.content_pipeline.pilot_generation import generate_language_entries
 from tools.content_pipeline.reviewer_queue import QueueItem, ReviewDecision, apply_decision
 
 
@@ -43,6 +46,59 @@ class Phase1PipelineTests(unittest.TestCase):
 
         self.assertEqual(validate_entry(entry), [])
 
+    def test_entry_from_chunk_row_is_slotted_and_valid(self):
+        row = generate_language_entries("fr", count=1)[0]
+        entry = ContentEntry.from_dict(row)
+
+        self.assertEqual(entry.source_trace.source_name, "phase2-pilot-generator")
+        self.assertEqual(entry.status, Status.DRAFT)
+        self.assertEqual(validate_entry(entry), [])
+        self.assertFalse(hasattr(entry, "__dict__"))
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            entry.source_trace.reviewer = "someone"
+
+    def test_validate_entries_reports_only_problem_rows(self):
+        rows = generate_language_entries("en", count=5)
+        rows[1]["difficulty"] = 9
+        del rows[2]["quality_scores"]["similarity"]
+        rows[4]["entry_id"] = rows[3]["entry_id"]
+
+        problems = validate_entries(rows)
+
+        self.assertEqual(problems, {
+            "en-000001": ["difficulty_out_of_range"],
+            "en-000002": ["missing_quality_score:similarity"],
+            "en-000003": ["duplicate_entry_id"],
+        })
+
+    def test_validate_entries_reports_mistyped_numbers(self):
+        rows = generate_language_entries("de", count=3)
+        rows[0]["difficulty"] = None
+        rows[1]["difficulty_confidence"] = "high"
+        rows[2]["version"] = "2b"
+
+        self.assertEqual(validate_entries(rows), {
+            "de-000000": ["invalid_difficulty"],
+            "de-000001": ["invalid_difficulty_confidence"],
+            "de-000002": ["invalid_version"],
+        })
+
+    def test_validate_entries_reports_mistyped_strings(self):
+        rows = generate_language_entries("fr", count=4)
+        rows[0]["entry_id"] = 17
+        rows[1]["word"] = ["maison"]
+        rows[2]["language"] = ["fr"]
+        rows[2]["clue_style"] = {"neutral": True}
+        rows[3]["quality_scores"] = 0.5
+        rows[3]["clue_text"] = "   "
+
+        self.assertEqual(validate_entries(rows), {
+            "17": ["invalid_entry_id"],
+            "fr-000001": ["invalid_word"],
+            "fr-000002": ["language_not_supported", "invalid_clue_style"],
+            "fr-000003": ["invalid_quality_scores", "required_field_missing"],
+        })
+
     def test_status_transitions(self):
         self.assertTrue(can_transition(Status.DRAFT, Status.REVIEWED))
         self.assertTrue(can_transition(Status.REVIEWED, Status.APPROVED))
@@ -59,6 +115,22 @@ class Phase1PipelineTests(unittest.TestCase):
 
         self.assertIn("word_leak", result["leak"])
 
+    def test_auto_qa_batch_matches_single_checks(self):
+        entries = [
+            {"word": "tree", "clue_text": "A thing that can kill  time", "language": "en", "difficulty": 1},
+            {"word": "Haus", "clue_text": "Etwas zum Wohnen", "language": "de", "difficulty": 2},
+            {"word": "Haus", "clue_text": "Etwas zum  Wohnen", "language": "de", "difficulty": 2},
+        ]
+
+        results = run_auto_qa_batch(entries)
+
+        self.assertEqual(results[0], run_auto_qa(existing_clues=[], **entries[0]))
+        self.assertEqual(results[0]["policy"], ["policy_unsafe"])
+        self.assertEqual(results[0]["ambiguity"], ["ambiguity_flag"])
+        self.assertEqual(results[1]["similarity"], [])
+        # later entries of a batch are compared with earlier ones
+        self.assertEqual(results[2]["similarity"], ["similarity_flag"])
+
     def test_reviewer_queue_decision(self):
         item = QueueItem(
             entry_id="en-tree-001",
@@ -1,9 +1,25 @@
 import json
+import re
 import tempfile
+import time
 import unittest
 from pathlib import Path
+from unittest import mock
 
-from tools.content_pipeline.pilot_generation import chunk_entries, write_pilot_dataset
+from tools.content_pipeline import auto_qa, pilot_generation, similarity_index
+
+from tools.content_pipeline.pilot_generation import (
+    GENERATOR_VERSION,
+    chunk_entries,
+    generate_entry,
+    generate_language_entries,
+    iter_language_entries,
+    iter_qa_chunks,
+    regenerate_chunk,
+    regenerate_chunks,
+    write_pilot_dataset,
+)
+from tools.content_pipeline.similarity_index import SimilarityIndex
 
 
 class PilotGenerationTests(unittest.TestCase):
@@ -13,6 +29,36 @@ class PilotGenerationTests(unittest.TestCase):
         self.assertEqual(len(chunks), 5)
         self.assertEqual(len(chunks[-1]), 15)
 
+    def test_iter_qa_chunks_streams_one_chunk_at_a_time(self):
+        produced = []
+
+        def tracked_entries():
+            for entry in iter_language_entries("fr", count=95):
+                produced.append(entry["entry_id"])
+                yield entry
+
+        chunks = iter_qa_chunks(tracked_entries(), chunk_size=20, similarity_index=SimilarityIndex())
+        first = next(chunks)
+        self.assertEqual(len(first), 20)
+        self.assertEqual(len(produced), 20)
+        self.assertIn("policy", first[0]["auto_qa"])
+
+        remaining = list(chunks)
+        self.assertEqual([len(c) for c in remaining], [20, 20, 20, 15])
+        streamed = [first] + remaining
+        generated = generate_language_entries("fr", count=95)
+        self.assertEqual(
+            [e["auto_qa"] for chunk in streamed for e in chunk],
+            [e["auto_qa"] for e in generated],
+        )
+
+    def test_similarity_covers_whole_language_not_recent_window(self):
+        entries = generate_language_entries("en", count=30)
+        # entry 24 repeats entry 0's clue, which is outside the old 20-entry window
+        self.assertEqual(entries[24]["clue_text"], entries[0]["clue_text"])
+        self.assertEqual(entries[24]["auto_qa"]["similarity"], ["similarity_flag"])
+        self.assertEqual(entries[0]["auto_qa"]["similarity"], [])
+
     def test_write_pilot_dataset_outputs_manifest_and_chunks(self):
         with tempfile.TemporaryDirectory() as tmp:
             manifest = write_pilot_dataset(tmp, per_language=40, chunk_size=15)
@@ -35,6 +81,201 @@ class PilotGenerationTests(unittest.TestCase):
             # return value and file should be aligned
             self.assertEqual(manifest["per_language"], on_disk["per_language"])
 
+    def test_parallel_workers_match_serial_output(self):
+        def without_timestamps(text):
+            return re.sub(r'"(imported_at|generated_at)": "[^"]*"', "", text)
+
+        with tempfile.TemporaryDirectory() as serial, tempfile.TemporaryDirectory() as parallel:
+            serial_manifest = write_pilot_dataset(serial, per_language=70, chunk_size=20)
+            parallel_manifest = write_pilot_dataset(parallel, per_language=70, chunk_size=20, workers=3)
+
+            for language, language_info in serial_manifest["languages"].items():
+                self.assertEqual(language_info["files"], parallel_manifest["languages"][language]["files"])
+                for rel_file in language_info["files"]:
+                    self.assertEqual(
+                        without_timestamps((Path(serial) / rel_file).read_text(encoding="utf-8")),
+                        without_timestamps((Path(parallel) / rel_file).read_text(encoding="utf-8")),
+                    )
+
+    def test_rerun_reuses_valid_chunks_and_rebuilds_stale_ones(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            first = write_pilot_dataset(tmp, per_language=50, chunk_size=20)
+            stale = Path(tmp) / first["languages"]["en"]["files"][1]
+            stale.write_text("[]", encoding="utf-8")
+
+            with mock.patch.object(pilot_generation, "_write_chunk", wraps=pilot_generation._write_chunk) as writes:
+                second = write_pilot_dataset(tmp, per_language=50, chunk_size=20)
+
+            self.assertEqual([call.args[1:3] for call in writes.call_args_list], [("en", 2)])
+            self.assertEqual(second["languages"]["de"], first["languages"]["de"])
+            self.assertEqual(second["languages"]["en"]["files"], first["languages"]["en"]["files"])
+            self.assertNotEqual(stale.read_text(encoding="utf-8"), "[]")
+
+    def test_non_resumed_smaller_run_removes_old_chunks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_pilot_dataset(tmp, per_language=50, chunk_size=10)
+            manifest = write_pilot_dataset(tmp, per_language=20, chunk_size=10, resume=False)
+            on_disk = sorted(str(path.relative_to(tmp)) for path in Path(tmp).glob("*/batch_*"))
+            expected = sorted(rel_file for info in manifest["languages"].values() for rel_file in info["files"])
+            self.assertEqual(on_disk, expected)
+            self.assertEqual(len(on_disk), 8)
+
+    def test_rule_edits_invalidate_checked_chunks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_pilot_dataset(tmp, per_language=20, chunk_size=10)
+            banned = {**auto_qa.BANNED_TERMS, "en": auto_qa.BANNED_TERMS["en"] | {"daily"}}
+            auto_qa._matcher_for.cache_clear()
+            try:
+                with mock.patch.object(auto_qa, "BANNED_TERMS", banned), \
+                        mock.patch.object(pilot_generation, "_write_chunk", wraps=pilot_generation._write_chunk) as writes:
+                    manifest = write_pilot_dataset(tmp, per_language=20, chunk_size=10)
+            finally:
+                auto_qa._matcher_for.cache_clear()
+            self.assertEqual([call.args[1:3] for call in writes.call_args_list], [("en", 1), ("en", 2)])
+            en_entries = json.loads((Path(tmp) / manifest["languages"]["en"]["files"][0]).read_text(encoding="utf-8"))
+            self.assertIn(["policy_unsafe"], [entry["auto_qa"]["policy"] for entry in en_entries])
+
+            # a changed similarity setting ignores the stored flags of regenerated chunks
+            with mock.patch.object(similarity_index, "SIMILARITY_THRESHOLD", 0.5), \
+                    mock.patch.object(pilot_generation, "_similarity_flags_for", return_value=[False] * 10) as fallback:
+                record = regenerate_chunk(tmp, "de", 2)
+            fallback.assert_called_once_with("de", 10, 20)
+            self.assertEqual(record["params"]["qa_rules"]["similarity"]["threshold"], 0.5)
+
+    def test_interrupted_run_resumes_from_journal(self):
+        def without_timestamps(text):
+            return re.sub(r'"(imported_at|generated_at)": "[^"]*"', "", text)
+
+        real_write_chunk = pilot_generation._write_chunk
+        calls = []
+
+        def failing_write_chunk(*args):
+            calls.append(args[1:3])
+            if len(calls) == 4:
+                raise KeyboardInterrupt
+            return real_write_chunk(*args)
+
+        with tempfile.TemporaryDirectory() as resumed, tempfile.TemporaryDirectory() as fresh:
+            with mock.patch.object(pilot_generation, "_write_chunk", side_effect=failing_write_chunk):
+                with self.assertRaises(KeyboardInterrupt):
+                    write_pilot_dataset(resumed, per_language=45, chunk_size=15)
+            self.assertFalse((Path(resumed) / "manifest.json").exists())
+            self.assertTrue((Path(resumed) / pilot_generation.BUILD_JOURNAL).exists())
+
+            with mock.patch.object(pilot_generation, "_write_chunk", wraps=real_write_chunk) as writes:
+                manifest = write_pilot_dataset(resumed, per_language=45, chunk_size=15)
+            # de is complete, en stopped before its first chunk was written
+            self.assertEqual(writes.call_args_list[0].args[1:3], ("en", 1))
+            self.assertEqual(len(writes.call_args_list), 9)
+            self.assertFalse((Path(resumed) / pilot_generation.BUILD_JOURNAL).exists())
+
+            write_pilot_dataset(fresh, per_language=45, chunk_size=15)
+            for language_info in manifest["languages"].values():
+                for rel_file in language_info["files"]:
+                    self.assertEqual(
+                        without_timestamps((Path(resumed) / rel_file).read_text(encoding="utf-8")),
+                        without_timestamps((Path(fresh) / rel_file).read_text(encoding="utf-8")),
+                    )
+
+    def test_pipelined_writer_matches_serial_output_with_bounded_backlog(self):
+        def without_timestamps(text):
+            return re.sub(r'"(imported_at|generated_at)": "[^"]*"', "", text)
+
+        real_write_chunk = pilot_generation._write_chunk
+        real_generate_range = pilot_generation._generate_range
+        written = []
+        backlog = []
+
+        def slow_write_chunk(*args):
+            time.sleep(0.005)
+            record = real_write_chunk(*args)
+            written.append(record["file"])
+            return record
+
+        def tracked_generate_range(*args):
+            backlog.append(len(backlog) - len(written))
+            return real_generate_range(*args)
+
+        with tempfile.TemporaryDirectory() as piped, tempfile.TemporaryDirectory() as serial:
+            with mock.patch.object(pilot_generation, "_write_chunk", side_effect=slow_write_chunk), \
+                    mock.patch.object(pilot_generation, "_generate_range", side_effect=tracked_generate_range):
+                manifest = write_pilot_dataset(piped, per_language=60, chunk_size=5, writer_threads=2)
+            write_pilot_dataset(serial, per_language=60, chunk_size=5)
+
+            self.assertEqual(len(written), 48)
+            self.assertLessEqual(max(backlog), 4)
+            self.assertEqual(manifest["languages"]["es"]["files"][-1], str(Path("es") / "batch_012.json"))
+            for language_info in manifest["languages"].values():
+                for rel_file in language_info["files"]:
+                    self.assertEqual(
+                        without_timestamps((Path(piped) / rel_file).read_text(encoding="utf-8")),
+                        without_timestamps((Path(serial) / rel_file).read_text(encoding="utf-8")),
+                    )
+
+    def test_writer_threads_are_serial_mode_only(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaisesRegex(ValueError, "writer_threads_require_serial_mode"):
+                write_pilot_dataset(tmp, per_language=10, workers=2, writer_threads=2)
+
+    def test_generate_entry_matches_sequential_generation(self):
+        entries = list(iter_language_entries("es", 40, seed=7))
+        for index in (0, 17, 39):
+            expected = dict(entries[index])
+            actual = generate_entry("es", index, seed=7)
+            for entry in (expected, actual):
+                del entry["source_trace"]["imported_at"]
+            self.assertEqual(actual, expected)
+        self.assertNotEqual(generate_entry("es", 17, seed=8)["quality_scores"], entries[17]["quality_scores"])
+
+    def test_regenerate_chunk_restores_content_without_other_chunks(self):
+        def without_timestamps(text):
+            return re.sub(r'"(imported_at|generated_at)": "[^"]*"', "", text)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            first = write_pilot_dataset(tmp, per_language=50, chunk_size=20)
+            self.assertEqual(first["generation"]["generator_version"], GENERATOR_VERSION)
+            target = Path(tmp) / first["languages"]["en"]["files"][1]
+            original = target.read_text(encoding="utf-8")
+            target.unlink()
+
+            with mock.patch.object(pilot_generation, "_generate_range", wraps=pilot_generation._generate_range) as ranges, \
+                    mock.patch.object(pilot_generation, "_similarity_flags_for") as fallback:
+                record = regenerate_chunk(tmp, "en", 2)
+            self.assertEqual([call.args[:3] for call in ranges.call_args_list], [("en", 20, 40)])
+            fallback.assert_not_called()
+            self.assertEqual(without_timestamps(target.read_text(encoding="utf-8")), without_timestamps(original))
+            manifest = json.loads((Path(tmp) / "manifest.json").read_text(encoding="utf-8"))
+            self.assertEqual(manifest["languages"]["en"]["chunk_records"][1], record)
+            self.assertEqual(manifest["languages"]["de"], first["languages"]["de"])
+
+            # records without stored flags fall back to the prefix index
+            del manifest["languages"]["en"]["chunk_records"][1]["similar"]
+            (Path(tmp) / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+            self.assertEqual(regenerate_chunk(tmp, "en", 2)["similar"], record["similar"])
+
+            with self.assertRaisesRegex(ValueError, "unknown_chunk"):
+                regenerate_chunk(tmp, "en", 9)
+            with self.assertRaisesRegex(ValueError, "unknown_language"):
+                regenerate_chunk(tmp, "it", 1)
+
+    def test_regenerate_with_new_seed_rerolls_only_those_chunks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            first = write_pilot_dataset(tmp, per_language=60, chunk_size=20)
+            before = {
+                rel_file: json.loads((Path(tmp) / rel_file).read_text(encoding="utf-8"))
+                for rel_file in first["languages"]["fr"]["files"]
+            }
+            manifest = regenerate_chunks(tmp, "fr", [1, 3], seed=99, workers=2)
+
+            records = manifest["languages"]["fr"]["chunk_records"]
+            self.assertEqual([record["params"]["seed"] for record in records], [99, 42, 99])
+            for rel_file, entries in before.items():
+                after = json.loads((Path(tmp) / rel_file).read_text(encoding="utf-8"))
+                self.assertEqual([e["clue_text"] for e in after], [e["clue_text"] for e in entries])
+                self.assertEqual([e["auto_qa"] for e in after], [e["auto_qa"] for e in entries])
+                changed = [e["quality_scores"] for e in after] != [e["quality_scores"] for e in entries]
+                self.assertEqual(changed, rel_file != first["languages"]["fr"]["files"][1])
+
 
 if __name__ == "__main__":
     unittest.main()
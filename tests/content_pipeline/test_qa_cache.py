@@ -0,0 +1,74 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from tools.content_pipeline import auto_qa
+from tools.content_pipeline.auto_qa import run_auto_qa_batch
+from tools.content_pipeline.chunk_store import read_chunk
+from tools.content_pipeline.pilot_generation import iter_language_entries, write_pilot_dataset
+from tools.content_pipeline.qa_cache import QACache
+
+
+class QACacheTests(unittest.TestCase):
+    def test_cached_results_match_uncached_results(self):
+        entries = list(iter_language_entries("fr", 50))
+        entries[3]["clue_text"] = "quelque chose de haine"
+        expected = run_auto_qa_batch(entries)
+        with tempfile.TemporaryDirectory() as tmp:
+            with QACache(str(Path(tmp) / "qa.sqlite")) as cache:
+                self.assertEqual(run_auto_qa_batch(entries, cache=cache), expected)
+                self.assertEqual(cache.misses, 200)
+                self.assertEqual(run_auto_qa_batch(entries, cache=cache), expected)
+                self.assertEqual(cache.hits, 200)
+
+    def test_rule_change_invalidates_only_dependent_check(self):
+        entries = list(iter_language_entries("en", 20))
+        with tempfile.TemporaryDirectory() as tmp:
+            with QACache(str(Path(tmp) / "qa.sqlite")) as cache:
+                run_auto_qa_batch(entries, cache=cache)
+                limits = {**auto_qa.READABILITY_LIMITS, 3: 10}
+                with mock.patch.object(auto_qa, "READABILITY_LIMITS", limits):
+                    results = run_auto_qa_batch(entries, cache=cache)
+
+                self.assertEqual(cache.misses, 80 + 20)
+                self.assertEqual(cache.hits, 60)
+                self.assertEqual(results[2]["readability"], ["readability_flag"])
+
+    def test_lru_eviction_keeps_size_cap(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with QACache(str(Path(tmp) / "qa.sqlite"), max_entries=3) as cache:
+                cache.put_many({"a": [], "b": ["x"]})
+                cache.get_many(["a"])
+                cache.put_many({"c": [], "d": []})
+
+                self.assertEqual(len(cache), 3)
+                self.assertEqual(set(cache.get_many(["a", "b", "c", "d"])), {"a", "c", "d"})
+
+    def test_put_many_counts_rows_only_when_the_cap_may_be_crossed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with QACache(str(Path(tmp) / "qa.sqlite"), max_entries=1000) as cache:
+                with mock.patch.object(QACache, "__len__", autospec=True, side_effect=QACache.__len__) as counts:
+                    for batch in range(150):
+                        cache.put_many({f"{batch}-{i}": [] for i in range(10)})
+                # first count at 1010 rows; eviction leaves 950, so the next one
+                # is six batches later
+                self.assertEqual(counts.call_count, 9)
+                self.assertLessEqual(len(cache), 1000)
+                self.assertEqual(set(cache.get_many(["149-9", "0-0"])), {"149-9"})
+
+    def test_pilot_dataset_reuses_cache_across_runs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = str(Path(tmp) / "qa.sqlite")
+            write_pilot_dataset(str(Path(tmp) / "a"), per_language=30, chunk_size=10, qa_cache_path=cache_path)
+            write_pilot_dataset(str(Path(tmp) / "b"), per_language=30, chunk_size=10, workers=2, qa_cache_path=cache_path)
+            with QACache(cache_path) as cache:
+                self.assertEqual(len(cache), 4 * 30 * 4)
+
+            first = read_chunk(Path(tmp) / "a" / "es" / "batch_002.json")
+            second = read_chunk(Path(tmp) / "b" / "es" / "batch_002.json")
+        self.assertEqual([e["auto_qa"] for e in first], [e["auto_qa"] for e in second])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from tools.content_pipeline.pilot_generation import generate_language_entries
+from tools.content_pipeline.queue_store import QueueStore
+from tools.content_pipeline.reviewer_queue import ReviewDecision, queue_item_from_entry
+
+
+class QueueStoreTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = str(Path(self._tmp.name) / "queue.sqlite")
+        self.store = QueueStore(self.path)
+        entries = generate_language_entries("de", count=30) + generate_language_entries("en", count=20)
+        items = [queue_item_from_entry(entry) for entry in entries]
+        items[0].auto_flags.append("policy_unsafe")
+        self.store.add_items(items)
+
+    def tearDown(self):
+        self.store.close()
+        self._tmp.cleanup()
+
+    def test_paged_fetch_by_language_and_flag(self):
+        first = self.store.fetch_page(language="en", limit=15)
+        second = self.store.fetch_page(language="en", after=first[-1].entry_id, limit=15)
+
+        self.assertEqual(len(first) + len(second), 20)
+        self.assertEqual(first[0].entry_id, "en-000000")
+        self.assertTrue(all(item.language == "en" for item in first + second))
+        self.assertEqual([i.entry_id for i in self.store.fetch_page(flag="policy_unsafe")], ["de-000000"])
+        self.assertEqual(self.store.count(status="reviewed", language="de"), 30)
+
+    def test_bulk_decisions_persist_in_one_transaction(self):
+        decided = self.store.apply_decisions([
+            ("de-000001", ReviewDecision(action="approve")),
+            ("de-000002", ReviewDecision(action="reject", reason_code="duplicate")),
+        ])
+        self.assertEqual(decided, 2)
+
+        with QueueStore(self.path) as reopened:
+            self.assertEqual(reopened.get("de-000001").status, "approved")
+            self.assertEqual(reopened.get("de-000002").status, "deprecated")
+            self.assertEqual(reopened.count(status="approved"), 1)
+
+    def test_invalid_decision_rolls_back_whole_batch(self):
+        with self.assertRaises(ValueError):
+            self.store.apply_decisions([
+                ("de-000001", ReviewDecision(action="approve")),
+                ("de-000002", ReviewDecision(action="reject", reason_code="not_a_code")),
+            ])
+        with self.assertRaises(ValueError):
+            self.store.apply_decisions([
+                ("de-000001", ReviewDecision(action="approve")),
+                ("xx-404", ReviewDecision(action="approve")),
+            ])
+
+        self.assertEqual(self.store.get("de-000001").status, "reviewed")
+
+    def test_re_adding_items_keeps_reviewer_state(self):
+        decision = ReviewDecision(action="reject", reason_code="duplicate", note="same as 2")
+        self.store.apply_decisions([("de-000003", decision)])
+        item = queue_item_from_entry(generate_language_entries("de", count=4)[3])
+        item.clue_text = "regenerated clue"
+        item.auto_flags.append("policy_unsafe")
+        self.assertEqual(self.store.add_items([item]), 1)
+
+        stored = self.store.get("de-000003")
+        self.assertEqual((stored.status, stored.clue_text), ("deprecated", "regenerated clue"))
+        self.assertEqual([i.entry_id for i in self.store.fetch_page(flag="policy_unsafe")], ["de-000000", "de-000003"])
+        row = self.store._conn.execute(
+            "SELECT last_action, reason_code, note FROM queue_items WHERE entry_id = ?", ("de-000003",)
+        ).fetchone()
+        self.assertEqual(row, ("reject", "duplicate", "same as 2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
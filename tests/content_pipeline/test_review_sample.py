@@ -1,5 +1,6 @@
 import json
 import tempfile
+from collections import Counter
 import unittest
 from pathlib import Path
 
@@ -15,6 +16,38 @@ class ReviewSampleTests(unittest.TestCase):
             self.assertEqual(len(sample), 120)
             self.assertTrue(all(item["language"] in {"de", "en", "fr", "es"} for item in sample))
 
+    def test_build_review_sample_is_reproducible_for_seed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_pilot_dataset(tmp, per_language=60, chunk_size=25)
+            first = [e["entry_id"] for e in build_review_sample(tmp, sample_size=50, seed=3)]
+            second = [e["entry_id"] for e in build_review_sample(tmp, sample_size=50, seed=3)]
+            other = [e["entry_id"] for e in build_review_sample(tmp, sample_size=50, seed=4)]
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertEqual(len(set(first)), 50)
+
+    def test_allocation_modes_on_skewed_strata(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            entries = [
+                {"entry_id": f"de-{i:03d}", "language": "de", "difficulty": 1 if i < 90 else 2}
+                for i in range(100)
+            ]
+            (root / "de").mkdir()
+            (root / "de" / "batch_001.json").write_text(json.dumps(entries), encoding="utf-8")
+            manifest = {"languages": {"de": {"files": ["de/batch_001.json"]}}}
+            (root / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+
+            round_robin = build_review_sample(tmp, sample_size=20, seed=1)
+            proportional = build_review_sample(tmp, sample_size=20, seed=1, allocation="proportional")
+
+        def per_difficulty(sample):
+            return sorted(Counter(e["difficulty"] for e in sample).items())
+
+        self.assertEqual(per_difficulty(round_robin), [(1, 10), (2, 10)])
+        self.assertEqual(per_difficulty(proportional), [(1, 18), (2, 2)])
+
     def test_write_review_exports_creates_json_and_csv(self):
         with tempfile.TemporaryDirectory() as tmp:
             write_pilot_dataset(tmp, per_language=30, chunk_size=10)
@@ -0,0 +1,164 @@
+import json
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+from tools.content_pipeline import auto_qa, sharding
+from tools.content_pipeline.chunk_store import read_chunk, read_manifest, write_chunk
+from tools.content_pipeline.pilot_generation import write_pilot_dataset
+from tools.content_pipeline.sharding import merge_partials, run_shard_worker
+
+
+class ShardingTests(unittest.TestCase):
+    def test_workers_claim_disjoint_chunks_and_merge(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_pilot_dataset(tmp, per_language=40, chunk_size=10)
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                partials = list(pool.map(lambda w: run_shard_worker(tmp, "validate", w), ["w1", "w2", "w3"]))
+            merged = merge_partials(tmp, "validate")
+            stored = json.loads((sharding._task_dir(Path(tmp), "validate") / "manifest.json").read_text(encoding="utf-8"))
+
+        claimed = [rel_file for partial in partials for rel_file in partial["chunks"]]
+        self.assertEqual(len(claimed), 16)
+        self.assertEqual(len(set(claimed)), 16)
+        self.assertTrue(merged["complete"])
+        self.assertEqual(merged["entries"], 160)
+        self.assertEqual(
+            [chunk["file"] for chunk in merged["chunks"][:2]],
+            [str(Path("de") / "batch_001.json"), str(Path("de") / "batch_002.json")],
+        )
+        self.assertEqual(stored, merged)
+
+    def test_expired_lease_is_taken_over_and_merge_is_deterministic(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_pilot_dataset(tmp, per_language=20, chunk_size=10)
+            first = run_shard_worker(tmp, "qa", "worker-b", max_chunks=2, lease_seconds=60)
+            partial = merge_partials(tmp, "qa")
+            self.assertFalse(partial["complete"])
+            self.assertEqual(len(partial["missing"]), 6)
+
+            # a worker that claimed a chunk and died leaves a lease behind
+            lease = sharding._lease_path(sharding._task_dir(Path(tmp), "qa"), str(Path("en") / "batch_001.json"))
+            lease.write_text(json.dumps({"worker": "crashed", "expires_at": 0, "state": "claimed"}), encoding="utf-8")
+            second = run_shard_worker(tmp, "qa", "worker-a")
+            merged = merge_partials(tmp, "qa")
+            leftovers = [path.name for path in lease.parent.iterdir() if ".expired." in path.name]
+            partial_lines = (lease.parent.parent / "partials" / "worker-b.jsonl").read_text(encoding="utf-8")
+
+        self.assertEqual(len(first["chunks"]), 2)
+        self.assertIn(str(Path("en") / "batch_001.json"), second["chunks"])
+        self.assertTrue(merged["complete"])
+        self.assertEqual(merged["workers"], ["worker-a", "worker-b"])
+        self.assertEqual(merged["chunks"][0]["changed"], [])
+        self.assertEqual(leftovers, [])
+        self.assertEqual(len(partial_lines.splitlines()), 2)
+
+    def test_rule_edit_makes_done_chunks_due_again(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_pilot_dataset(tmp, per_language=10, chunk_size=5)
+            run_shard_worker(tmp, "qa", "w1")
+            self.assertEqual(run_shard_worker(tmp, "qa", "w2")["chunks"], {})
+
+            banned = {**auto_qa.BANNED_TERMS, "en": auto_qa.BANNED_TERMS["en"] | {"daily"}}
+            auto_qa._matcher_for.cache_clear()
+            try:
+                with mock.patch.object(auto_qa, "BANNED_TERMS", banned):
+                    rerun = run_shard_worker(tmp, "qa", "w2")
+                    merged = merge_partials(tmp, "qa")
+            finally:
+                auto_qa._matcher_for.cache_clear()
+
+        self.assertEqual(len(rerun["chunks"]), 8)
+        self.assertTrue(merged["complete"])
+        self.assertGreater(sum(chunk["flagged"].get("policy", 0) for chunk in merged["chunks"]), 0)
+
+    def test_valid_lease_blocks_other_workers(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_pilot_dataset(tmp, per_language=10, chunk_size=10)
+            with mock.patch.object(sharding, "_finish_lease"):
+                run_shard_worker(tmp, "validate", "slow", max_chunks=1)
+            other = run_shard_worker(tmp, "validate", "fast")
+        self.assertEqual(len(other["chunks"]), 3)
+        self.assertNotIn(str(Path("de") / "batch_001.json"), other["chunks"])
+
+    def test_takeover_does_not_steal_a_fresh_lease(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "chunk.lease"
+            expired = {"worker": "crashed", "expires_at": 0, "state": "claimed"}
+            path.write_text(json.dumps(expired), encoding="utf-8")
+            real_read_lease = sharding._read_lease
+            reads = []
+
+            def read_then_lose_race(lease_path, lease_seconds):
+                lease = real_read_lease(lease_path, lease_seconds)
+                reads.append(lease_path)
+                if len(reads) == 1:
+                    # worker B takes the expired lease over right after A read it
+                    self.assertIsNotNone(sharding._try_claim(path, "b", 60, None))
+                return lease
+
+            with mock.patch.object(sharding, "_read_lease", side_effect=read_then_lose_race):
+                self.assertIsNone(sharding._try_claim(path, "a", 60, None))
+            lease = json.loads(path.read_text(encoding="utf-8"))
+            self.assertEqual((lease["worker"], lease["state"]), ("b", "claimed"))
+
+            # A's own claim expired and was taken over: it must not mark the chunk done
+            self.assertFalse(sharding._finish_lease(path, "a", lease["expires_at"], 60, None))
+            self.assertTrue(sharding._finish_lease(path, "b", lease["expires_at"], 60, None))
+            self.assertEqual(json.loads(path.read_text(encoding="utf-8"))["state"], "done")
+
+    def test_rewritten_chunks_are_processed_again(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_pilot_dataset(tmp, per_language=10, chunk_size=5)
+            run_shard_worker(tmp, "validate", "w1")
+            self.assertEqual(run_shard_worker(tmp, "validate", "w2")["chunks"], {})
+
+            stale = Path(tmp) / "de" / "batch_002.json"
+            stale.write_text("[]", encoding="utf-8")
+            write_pilot_dataset(tmp, per_language=10, chunk_size=5)
+            rerun = run_shard_worker(tmp, "validate", "w2")
+            merged = merge_partials(tmp, "validate")
+
+        self.assertEqual(list(rerun["chunks"]), [str(Path("de") / "batch_002.json")])
+        self.assertTrue(merged["complete"])
+        self.assertEqual(merged["chunks"][1]["worker"], "w2")
+
+    def test_export_writes_approved_entries(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            dataset = Path(tmp) / "dataset"
+            write_pilot_dataset(str(dataset), per_language=10, chunk_size=5)
+            chunk_path = dataset / read_manifest(dataset)["languages"]["fr"]["files"][0]
+            entries = read_chunk(chunk_path)
+            entries[2]["status"] = "approved"
+            write_chunk(chunk_path, entries)
+
+            options = {"output_dir": str(Path(tmp) / "out"), "storage_format": "jsonl.gz"}
+            run_shard_worker(str(dataset), "export", "w1", options=options)
+            merged = merge_partials(str(dataset), "export", options)
+            exported = read_chunk(Path(tmp) / "out" / "fr" / "batch_001.jsonl.gz", "jsonl.gz")
+
+        self.assertEqual(merged["entries"], 1)
+        self.assertEqual(merged["chunks"][4]["output_file"], str(Path("fr") / "batch_001.jsonl.gz"))
+        self.assertEqual(exported, [entries[2]])
+
+    def test_export_options_get_their_own_leases(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            dataset = str(Path(tmp) / "dataset")
+            write_pilot_dataset(dataset, per_language=10, chunk_size=5)
+            for name in ("out_a", "out_b"):
+                options = {"output_dir": str(Path(tmp) / name), "approved_only": False}
+                run_shard_worker(dataset, "export", "w1", options=options)
+                merged = merge_partials(dataset, "export", options)
+                self.assertTrue(merged["complete"])
+                self.assertEqual(merged["entries"], 40)
+                self.assertTrue((Path(tmp) / name / "de" / "batch_002.json").exists())
+
+            gz_options = {"output_dir": str(Path(tmp) / "out_a"), "approved_only": False, "storage_format": "jsonl.gz"}
+            self.assertEqual(len(run_shard_worker(dataset, "export", "w1", options=gz_options)["chunks"]), 8)
+            self.assertTrue((Path(tmp) / "out_a" / "de" / "batch_002.jsonl.gz").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from tools.content_pipeline.auto_qa import normalize, similarity_check
+from tools.content_pipeline.similarity_index import SimilarityIndex, band_keys
+
+
+class SimilarityIndexTests(unittest.TestCase):
+    def test_finds_near_duplicate_anywhere_in_corpus(self):
+        index = SimilarityIndex()
+        index.add(normalize("Tall plant with a trunk and leaves"))
+        for i in range(200):
+            index.add(normalize(f"Unrelated filler clue number {i} about rivers"))
+
+        self.assertEqual(index.find_similar(normalize("Tall plant with a trunk and leaves!")), 0)
+        self.assertIsNone(index.find_similar(normalize("Small animal that barks at night")))
+
+    def test_similarity_check_uses_index(self):
+        index = SimilarityIndex()
+        index.add(normalize("Ort zum Wohnen fuer eine Familie"))
+        self.assertEqual(
+            similarity_check("Ort zum Wohnen fuer eine Familie.", [], similarity_index=index),
+            ["similarity_flag"],
+        )
+        self.assertEqual(similarity_check("Etwas ganz anderes", [], similarity_index=index), [])
+
+    def test_save_and_load_round_trip(self):
+        index = SimilarityIndex()
+        index.add_many([normalize("Common daily-life term related to house00"), normalize("River bank")])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "index.json"
+            index.save(str(path))
+            loaded = SimilarityIndex.load(str(path))
+            items = json.loads(path.read_text(encoding="utf-8"))["items"]
+
+        self.assertEqual([keys for _, keys in items], [band_keys(text) for text, _ in items])
+        self.assertEqual(len(loaded), 2)
+        self.assertEqual(loaded.find_similar(normalize("Common daily-life term related to house01")), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import tempfile
+import unittest
+from pathlib import Path
+from random import Random
+
+from tools.content_pipeline.game_artifact import load_game_artifact, write_game_artifacts
+from tools.content_pipeline.word_square import (
+    WordBitsetIndex,
+    build_grid_pool,
+    grid_words,
+    solve_word_square,
+)
+
+SATOR = ["SATOR", "AREPO", "TENET", "OPERA", "ROTAS"]
+NOISE = ["QUIZZ", "JUMPY", "XYLYL", "FJORD", "KNACK", "WALTZ", "BUXOM", "VEXED"]
+
+
+def _is_square(rows, columns, words):
+    size = len(rows)
+    transposed = ["".join(row[j] for row in rows) for j in range(size)]
+    return transposed == columns and all(word in words for word in rows + columns)
+
+
+class WordSquareTests(unittest.TestCase):
+    def test_finds_the_sator_square_among_noise(self):
+        words = NOISE + SATOR
+        solved = solve_word_square(WordBitsetIndex(words), Random(3))
+        self.assertIsNotNone(solved)
+        rows = [words[i] for i in solved[0]]
+        columns = [words[i] for i in solved[1]]
+        self.assertTrue(_is_square(rows, columns, words))
+        self.assertEqual(len(set(rows)), 5)
+
+    def test_returns_none_when_no_square_exists(self):
+        self.assertIsNone(solve_word_square(WordBitsetIndex(NOISE), Random(1)))
+
+    def test_rows_and_columns_may_differ(self):
+        words = ["CARD", "AREA", "REAR", "DART", "CARE", "ARRA", "REED", "DEAR", "AAAA"]
+        pool = build_grid_pool(words, list(range(len(words))), count=5, seed=7)
+        self.assertGreater(len(pool), 0)
+        for grid in pool:
+            rows = [words[i] for i in grid["rows"]]
+            columns = [words[i] for i in grid["columns"]]
+            self.assertTrue(_is_square(rows, columns, words))
+
+    def test_grid_pools_respect_profiles(self):
+        entries = [
+            {"language": "la", "word": word, "clue_text": word, "difficulty": 2, "status": "approved",
+             "content_profile": "standard" if word == "TENET" else "kid"}
+            for word in NOISE + SATOR
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = write_game_artifacts(entries, tmp, sizes=[5], grid_pool_size=3)
+            artifact = load_game_artifact(str(Path(tmp) / "la_5.json"))
+
+        # SATOR reads the same top-down and bottom-up, so there are two grids
+        self.assertEqual(manifest["artifacts"][0]["grids"], {"kid": 0, "family": 0, "standard": 2})
+        for grid in artifact["grids"]["standard"]:
+            rows, columns = grid_words(artifact, grid)
+            self.assertEqual(sorted(rows), sorted(SATOR))
+            self.assertEqual(rows, columns)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,5 @@
+import sys
+
+from tools.content_pipeline.cli import main
+
+sys.exit(main())
@@ -2,9 +2,16 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 import re
-from difflib import SequenceMatcher
-from typing import Dict, List
+import time
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set
+
+from tools.content_pipeline.instrumentation import Metrics
+from tools.content_pipeline.qa_cache import QACache
+from tools.content_pipeline.similarity_index import SimilarityIndex, is_near_duplicate
 
 
 BANNED_TERMS = {
@@ -14,20 +21,79 @@ BANNED_TERMS = {
     "es": {"odio", "matar", "sexo"},
 }
 
+GENERIC_MARKERS = ("etwas", "thing", "quelque", "algo")
+
+READABILITY_LIMITS = {1: 55, 2: 65, 3: 75, 4: 85, 5: 90}
+
+_WHITESPACE = re.compile(r"\s+")
+
+# bump a check's version when its logic changes; rule table edits are picked up
+# by rule_fingerprints on their own
+CHECK_VERSIONS = {"policy": 1, "leak": 1, "readability": 1, "ambiguity": 1}
+
 
 def normalize(text: str) -> str:
-    return re.sub(r"\s+", " ", text.strip().lower())
+    return _WHITESPACE.sub(" ", text.strip().lower())
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    # Factor shared prefixes into one regex ("se(?:x(?:e)?)"), so a scan costs about
+    # one pass over the clue instead of one substring search per term.
+    trie: Dict[str, Dict] = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node: Dict[str, Dict]) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if "" in node else group
+
+    return emit(trie)
+
+
+class _TermMatcher:
+    def __init__(self, categories: Mapping[str, Iterable[str]]) -> None:
+        self._categories_by_term: Dict[str, Set[str]] = {}
+        for category, terms in categories.items():
+            for term in terms:
+                if term:
+                    self._categories_by_term.setdefault(term, set()).add(category)
+        self._wanted = len({c for cats in self._categories_by_term.values() for c in cats})
+        self._pattern = re.compile(_trie_pattern(self._categories_by_term)) if self._categories_by_term else None
+
+    def scan(self, normalized: str) -> Set[str]:
+        found: Set[str] = set()
+        if self._pattern is None:
+            return found
+        match = self._pattern.search(normalized)
+        while match is not None:
+            hit = match.group()
+            # the regex prefers the longest term; shorter terms at the same spot count too
+            for end in range(1, len(hit) + 1):
+                found.update(self._categories_by_term.get(hit[:end], ()))
+            if len(found) == self._wanted:
+                break
+            match = self._pattern.search(normalized, match.start() + 1)
+        return found
+
+
+@lru_cache(maxsize=None)
+def _matcher_for(language: str) -> _TermMatcher:
+    return _TermMatcher({"policy": BANNED_TERMS.get(language, ()), "ambiguity": GENERIC_MARKERS})
 
 
 def policy_check(clue_text: str, language: str) -> List[str]:
-    terms = BANNED_TERMS.get(language, set())
-    normalized = normalize(clue_text)
-    return ["policy_unsafe"] if any(term in normalized for term in terms) else []
+    return ["policy_unsafe"] if "policy" in _matcher_for(language).scan(normalize(clue_text)) else []
 
 
-def leak_check(word: str, clue_text: str) -> List[str]:
-    w = normalize(word)
-    c = normalize(clue_text)
+def _leak_flags(w: str, c: str) -> List[str]:
     if w in c:
         return ["word_leak"]
     if len(w) >= 5 and w[:4] in c:
@@ -35,36 +101,222 @@ def leak_check(word: str, clue_text: str) -> List[str]:
     return []
 
 
+def leak_check(word: str, clue_text: str) -> List[str]:
+    return _leak_flags(normalize(word), normalize(clue_text))
+
+
 def readability_check(clue_text: str, difficulty: int) -> List[str]:
-    max_len = {1: 55, 2: 65, 3: 75, 4: 85, 5: 90}.get(difficulty, float('inf'))
+    max_len = READABILITY_LIMITS.get(difficulty, float('inf'))
     return ["readability_flag"] if len(clue_text) > max_len else []
 
 
 def ambiguity_check(clue_text: str) -> List[str]:
-    generic_markers = ["etwas", "thing", "quelque", "algo"]
-    normalized = normalize(clue_text)
-    return ["ambiguity_flag"] if any(m in normalized for m in generic_markers) else []
+    # generic markers are shared across languages, so any language's matcher works
+    return ["ambiguity_flag"] if "ambiguity" in _matcher_for("").scan(normalize(clue_text)) else []
 
 
-def similarity_check(clue_text: str, existing_clues: List[str]) -> List[str]:
-    candidate = normalize(clue_text)
+def _similarity_flags(
+    candidate: str,
+    existing_clues: List[str],
+    similarity_index: Optional[SimilarityIndex],
+) -> List[str]:
+    # the index covers the whole corpus; existing_clues stays for ad-hoc checks
+    if similarity_index is not None and similarity_index.find_similar(candidate) is not None:
+        return ["similarity_flag"]
     for existing in existing_clues:
-        if SequenceMatcher(None, candidate, normalize(existing)).ratio() > 0.88:
+        if is_near_duplicate(candidate, normalize(existing)):
             return ["similarity_flag"]
     return []
 
 
+def similarity_check(
+    clue_text: str,
+    existing_clues: List[str],
+    similarity_index: Optional[SimilarityIndex] = None,
+) -> List[str]:
+    return _similarity_flags(normalize(clue_text), existing_clues, similarity_index)
+
+
+# With `seconds`, the time of each step is added to it (see _QA_STAGES). Policy and
+# ambiguity share one term scan, so their time is reported as qa.term_scan.
+_QA_STAGES = ("qa.normalize", "qa.term_scan", "qa.leak", "qa.readability", "qa.similarity")
+
+
+def _qa_result(
+    word: str,
+    clue_text: str,
+    clue: str,
+    language: str,
+    difficulty: int,
+    similarity: List[str],
+    seconds: Optional[Dict[str, float]] = None,
+) -> Dict[str, List[str]]:
+    if seconds is None:
+        markers = _matcher_for(language).scan(clue)
+        leak = _leak_flags(word, clue)
+        readability = readability_check(clue_text, difficulty)
+    else:
+        t0 = time.perf_counter()
+        markers = _matcher_for(language).scan(clue)
+        t1 = time.perf_counter()
+        leak = _leak_flags(word, clue)
+        t2 = time.perf_counter()
+        readability = readability_check(clue_text, difficulty)
+        t3 = time.perf_counter()
+        seconds["qa.term_scan"] += t1 - t0
+        seconds["qa.leak"] += t2 - t1
+        seconds["qa.readability"] += t3 - t2
+    return {
+        "policy": ["policy_unsafe"] if "policy" in markers else [],
+        "leak": leak,
+        "readability": readability,
+        "ambiguity": ["ambiguity_flag"] if "ambiguity" in markers else [],
+        "similarity": similarity,
+    }
+
+
+def _check_entry(
+    entry: Mapping[str, Any],
+    position: int,
+    index: Optional[SimilarityIndex],
+    similarity_flags: Optional[Sequence[bool]],
+    seconds: Optional[Dict[str, float]] = None,
+) -> Dict[str, List[str]]:
+    # timestamps are only taken when timing is on
+    t0 = time.perf_counter() if seconds is not None else 0.0
+    clue_text = entry["clue_text"]
+    clue = normalize(clue_text)
+    word = normalize(entry["word"])
+    t1 = time.perf_counter() if seconds is not None else 0.0
+    similar = similarity_flags[position] if similarity_flags is not None else index.check_and_add(clue)
+    if seconds is not None:
+        t2 = time.perf_counter()
+        seconds["qa.normalize"] += t1 - t0
+        seconds["qa.similarity"] += t2 - t1
+    similarity = ["similarity_flag"] if similar else []
+    return _qa_result(word, clue_text, clue, entry["language"], entry["difficulty"], similarity, seconds)
+
+
 def run_auto_qa(
     word: str,
     clue_text: str,
     language: str,
     difficulty: int,
     existing_clues: List[str],
+    similarity_index: Optional[SimilarityIndex] = None,
 ) -> Dict[str, List[str]]:
+    clue = normalize(clue_text)
+    similarity = _similarity_flags(clue, existing_clues, similarity_index)
+    return _qa_result(normalize(word), clue_text, clue, language, difficulty, similarity)
+
+
+def run_auto_qa_batch(
+    entries: Iterable[Mapping[str, Any]],
+    existing_clues: Optional[List[str]] = None,
+    similarity_index: Optional[SimilarityIndex] = None,
+    similarity_flags: Optional[Sequence[bool]] = None,
+    metrics: Optional[Metrics] = None,
+    cache: Optional[QACache] = None,
+) -> List[Dict[str, List[str]]]:
+    # Entries carry the same fields run_auto_qa takes (word, clue_text, language,
+    # difficulty). Each clue is normalized once, checked against the index and then
+    # added to it, so later entries of the batch are compared with earlier ones.
+    # existing_clues only seeds a fresh index when no similarity_index is passed.
+    # similarity_flags replaces the index with results from an earlier corpus pass.
+    index = similarity_index
+    if index is None and similarity_flags is None:
+        index = SimilarityIndex()
+        index.add_many(normalize(text) for text in existing_clues or [])
+    if cache is not None:
+        return _run_auto_qa_batch_cached(entries, index, similarity_flags, cache, metrics)
+
+    seconds = dict.fromkeys(_QA_STAGES, 0.0) if metrics is not None else None
+    results = [
+        _check_entry(entry, position, index, similarity_flags, seconds)
+        for position, entry in enumerate(entries)
+    ]
+    if metrics is not None:
+        _record_qa_metrics(metrics, seconds, results)
+    return results
+
+
+def _record_qa_metrics(metrics: Metrics, seconds: Dict[str, float], results: List[Dict[str, List[str]]]) -> None:
+    hits = {f"qa.{check}": 0 for check in ("policy", "leak", "readability", "ambiguity", "similarity")}
+    for result in results:
+        for check, flags in result.items():
+            if flags:
+                hits[f"qa.{check}"] += 1
+    count = len(results)
+    for name, spent in seconds.items():
+        metrics.record(name, spent, count, hits.get(name))
+    for name in ("qa.policy", "qa.ambiguity"):
+        metrics.record(name, 0.0, count, hits[name])
+
+
+def _fingerprint(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+
+def rule_fingerprints(language: str) -> Dict[str, str]:
+    # One fingerprint per cacheable check, covering only the rules that check
+    # reads, so editing one table invalidates only that check's cached results.
+    # Similarity is left out: its result depends on the rest of the corpus.
     return {
-        "policy": policy_check(clue_text, language),
-        "leak": leak_check(word, clue_text),
-        "readability": readability_check(clue_text, difficulty),
-        "ambiguity": ambiguity_check(clue_text),
-        "similarity": similarity_check(clue_text, existing_clues),
+        "policy": _fingerprint([CHECK_VERSIONS["policy"], sorted(BANNED_TERMS.get(language, ()))]),
+        "leak": _fingerprint([CHECK_VERSIONS["leak"]]),
+        "readability": _fingerprint([CHECK_VERSIONS["readability"], sorted(READABILITY_LIMITS.items())]),
+        "ambiguity": _fingerprint([CHECK_VERSIONS["ambiguity"], sorted(GENERIC_MARKERS)]),
     }
+
+
+def entry_content_hash(entry: Mapping[str, Any]) -> str:
+    key = [entry["word"], entry["clue_text"], entry["language"], entry["difficulty"]]
+    return hashlib.sha256(json.dumps(key, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _run_auto_qa_batch_cached(
+    entries: Iterable[Mapping[str, Any]],
+    index: Optional[SimilarityIndex],
+    similarity_flags: Optional[Sequence[bool]],
+    cache: QACache,
+    metrics: Optional[Metrics],
+) -> List[Dict[str, List[str]]]:
+    entries = list(entries)
+    fingerprints: Dict[str, Dict[str, str]] = {}
+    entry_keys: List[Dict[str, str]] = []
+    for entry in entries:
+        language = entry["language"]
+        if language not in fingerprints:
+            fingerprints[language] = rule_fingerprints(language)
+        content_hash = entry_content_hash(entry)
+        entry_keys.append({
+            check: f"{check}:{fingerprint}:{content_hash}"
+            for check, fingerprint in fingerprints[language].items()
+        })
+
+    started = time.perf_counter()
+    cached = cache.get_many(key for keys in entry_keys for key in keys.values())
+    fresh: Dict[str, List[str]] = {}
+    results: List[Dict[str, List[str]]] = []
+    for position, (entry, keys) in enumerate(zip(entries, entry_keys)):
+        clue_text = entry["clue_text"]
+        clue = normalize(clue_text)
+        similar = similarity_flags[position] if similarity_flags is not None else index.check_and_add(clue)
+        similarity = ["similarity_flag"] if similar else []
+        if all(key in cached for key in keys.values()):
+            result = {check: cached[key] for check, key in keys.items()}
+            result["similarity"] = similarity
+        else:
+            result = _qa_result(
+                normalize(entry["word"]), clue_text, clue, entry["language"], entry["difficulty"], similarity
+            )
+            for check, key in keys.items():
+                if key not in cached:
+                    fresh[key] = result[check]
+        results.append(result)
+    cache.put_many(fresh)
+
+    if metrics is not None:
+        lookups = sum(len(keys) for keys in entry_keys)
+        metrics.record("qa.cache", time.perf_counter() - started, lookups, lookups - len(fresh))
+    return results
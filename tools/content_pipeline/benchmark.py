@@ -0,0 +1,187 @@
+"""Benchmark harness for content pipeline stages with regression thresholds."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+STAGES = (
+    "run_auto_qa_batch",
+    "generate_language_entries",
+    "write_pilot_dataset",
+    "build_review_sample",
+    "write_review_exports",
+)
+DEFAULT_SIZES = (250, 1000)
+DEFAULT_THRESHOLD = 0.25
+REVIEW_SAMPLE_SIZE = 500
+DATASET_CHUNK_SIZE = 300
+
+
+# Each stage gets (size, workdir) and returns (measured callable, entries it processes).
+# Setup inside the stage function is not timed.
+def _stage_run_auto_qa_batch(size: int, workdir: Path) -> Tuple[Callable[[], object], int]:
+    from tools.content_pipeline.auto_qa import run_auto_qa_batch
+    from tools.content_pipeline.pilot_generation import iter_language_entries
+
+    entries = list(iter_language_entries("en", size))
+    return lambda: run_auto_qa_batch(entries), size
+
+
+def _stage_generate_language_entries(size: int, workdir: Path) -> Tuple[Callable[[], object], int]:
+    from tools.content_pipeline.pilot_generation import generate_language_entries
+
+    return lambda: generate_language_entries("en", size), size
+
+
+def _stage_write_pilot_dataset(size: int, workdir: Path) -> Tuple[Callable[[], object], int]:
+    from tools.content_pipeline.pilot_generation import LANGUAGES, write_pilot_dataset
+
+    target = workdir / "write_pilot_dataset"
+    return (
+        lambda: write_pilot_dataset(str(target), per_language=size, chunk_size=DATASET_CHUNK_SIZE, resume=False),
+        size * len(LANGUAGES),
+    )
+
+
+def _stage_build_review_sample(size: int, workdir: Path) -> Tuple[Callable[[], object], int]:
+    from tools.content_pipeline.pilot_generation import LANGUAGES
+    from tools.content_pipeline.review_sample import build_review_sample
+
+    return lambda: build_review_sample(str(workdir / "dataset"), sample_size=REVIEW_SAMPLE_SIZE), size * len(LANGUAGES)
+
+
+def _stage_write_review_exports(size: int, workdir: Path) -> Tuple[Callable[[], object], int]:
+    from tools.content_pipeline.review_sample import build_review_sample, write_review_exports
+
+    sample = build_review_sample(str(workdir / "dataset"), sample_size=REVIEW_SAMPLE_SIZE)
+    return lambda: write_review_exports(sample, str(workdir / "exports")), len(sample)
+
+
+_STAGE_SETUP = {
+    "run_auto_qa_batch": _stage_run_auto_qa_batch,
+    "generate_language_entries": _stage_generate_language_entries,
+    "write_pilot_dataset": _stage_write_pilot_dataset,
+    "build_review_sample": _stage_build_review_sample,
+    "write_review_exports": _stage_write_review_exports,
+}
+
+
+def _peak_rss_kb() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _measure_stage(stage: str, size: int, workdir: str) -> Dict:
+    measured, entries = _STAGE_SETUP[stage](size, Path(workdir))
+    started = time.perf_counter()
+    measured()
+    seconds = time.perf_counter() - started
+    return {
+        "stage": stage,
+        "size": size,
+        "entries": entries,
+        "seconds": round(seconds, 6),
+        "entries_per_sec": round(entries / seconds, 2) if seconds > 0 else None,
+        "peak_rss_kb": _peak_rss_kb(),
+    }
+
+
+def run_benchmarks(
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    stages: Sequence[str] = STAGES,
+    isolate: bool = True,
+) -> Dict:
+    from tools.content_pipeline.pilot_generation import write_pilot_dataset
+
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise ValueError("unknown_stage")
+
+    results: List[Dict] = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            # the sampling/export stages read a dataset of this size from disk
+            write_pilot_dataset(str(Path(tmp) / "dataset"), per_language=size, chunk_size=DATASET_CHUNK_SIZE)
+            for stage in stages:
+                if not isolate:
+                    results.append(_measure_stage(stage, size, tmp))
+                    continue
+                # a fresh interpreter per stage makes peak RSS a per-stage number
+                spawn = multiprocessing.get_context("spawn")
+                with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                    results.append(pool.submit(_measure_stage, stage, size, tmp).result())
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "isolated": isolate,
+        "results": results,
+    }
+
+
+def compare_to_baseline(report: Dict, baseline: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    # A stage regresses when throughput drops, or peak RSS grows, by more than
+    # `threshold` (a fraction) against the same stage and size in the baseline.
+    expected = {(r["stage"], r["size"]): r for r in baseline.get("results", [])}
+    regressions: List[str] = []
+    for result in report["results"]:
+        base = expected.get((result["stage"], result["size"]))
+        if base is None:
+            continue
+        label = f"{result['stage']}@{result['size']}"
+        if base.get("entries_per_sec") and result.get("entries_per_sec") is not None:
+            if result["entries_per_sec"] < base["entries_per_sec"] * (1 - threshold):
+                regressions.append(
+                    f"{label}: {result['entries_per_sec']} entries/sec vs baseline {base['entries_per_sec']}"
+                )
+        if base.get("peak_rss_kb") and result["peak_rss_kb"] > base["peak_rss_kb"] * (1 + threshold):
+            regressions.append(f"{label}: peak RSS {result['peak_rss_kb']} KB vs baseline {base['peak_rss_kb']} KB")
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="entries per language")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--output", help="write the report as JSON to this path")
+    parser.add_argument("--baseline", help="report JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed regression, e.g. 0.25")
+    parser.add_argument("--in-process", action="store_true", help="skip per-stage subprocesses (RSS is cumulative)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(sizes=args.sizes, stages=args.stages, isolate=not args.in_process)
+    for result in report["results"]:
+        print(
+            f"{result['stage']:<28} size={result['size']:<8} "
+            f"{result['entries_per_sec']} entries/sec  peak_rss={result['peak_rss_kb']} KB"
+        )
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare_to_baseline(report, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""Difficulty calibration from gameplay solve/attempt telemetry."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+from random import Random
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from tools.content_pipeline.auto_qa import readability_check
+from tools.content_pipeline.chunk_store import (
+    manifest_storage_format,
+    read_chunk,
+    read_manifest,
+    write_atomic,
+    write_chunk,
+)
+from tools.content_pipeline.entry_index import build_entry_index
+
+try:
+    import numpy as np
+except ImportError:  # the stdlib path is slower but gives the same numbers
+    np = None
+
+EVENT_BATCH = 200_000
+# attempts needed before an entry's difficulty is replaced
+MIN_ATTEMPTS = 20
+# weight (in attempts) of the entry's current predicted_solve_rate as a prior
+PRIOR_ATTEMPTS = 10
+# solve rate at or above each bound maps to that difficulty; below all of them is 5
+DIFFICULTY_BOUNDS = ((0.85, 1), (0.7, 2), (0.5, 3), (0.3, 4))
+
+
+def iter_events(path: str) -> Iterator[Tuple[str, bool]]:
+    # One JSON object per line: {"entry_id": ..., "solved": true|false, ...}.
+    # Each line is one attempt; extra fields are ignored.
+    with open(path, "r", encoding="utf-8") as fp:
+        for line in fp:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            yield event["entry_id"], bool(event["solved"])
+
+
+class _Counters:
+    # Per-entry attempt/solve totals, indexed by a dense id per entry_id. Memory
+    # grows with the number of entries, never with the number of events.
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {}
+        self.events = 0
+        if np is not None:
+            self._attempts = np.zeros(0, dtype=np.int64)
+            self._solves = np.zeros(0, dtype=np.int64)
+        else:
+            self._attempts = array("q")
+            self._solves = array("q")
+
+    def add_batch(self, batch: Sequence[Tuple[str, bool]]) -> None:
+        ids = self.ids
+        dense = [ids.setdefault(entry_id, len(ids)) for entry_id, _ in batch]
+        solved = [1 if flag else 0 for _, flag in batch]
+        size = len(ids)
+        self.events += len(batch)
+        if np is not None:
+            dense_ids = np.fromiter(dense, dtype=np.int64, count=len(dense))
+            weights = np.fromiter(solved, dtype=np.int64, count=len(solved))
+            if len(self._attempts) < size:
+                self._attempts = np.concatenate([self._attempts, np.zeros(size - len(self._attempts), np.int64)])
+                self._solves = np.concatenate([self._solves, np.zeros(size - len(self._solves), np.int64)])
+            self._attempts += np.bincount(dense_ids, minlength=size)
+            self._solves += np.bincount(dense_ids, weights=weights, minlength=size).astype(np.int64)
+            return
+        if len(self._attempts) < size:
+            missing = size - len(self._attempts)
+            self._attempts.extend([0] * missing)
+            self._solves.extend([0] * missing)
+        attempts = self._attempts
+        solves = self._solves
+        for dense_id, flag in zip(dense, solved):
+            attempts[dense_id] += 1
+            solves[dense_id] += flag
+
+    def totals(self, entry_id: str) -> Tuple[int, int]:
+        dense_id = self.ids.get(entry_id)
+        if dense_id is None:
+            return 0, 0
+        return int(self._attempts[dense_id]), int(self._solves[dense_id])
+
+
+def aggregate_events(events: Iterable[Tuple[str, bool]], batch_size: int = EVENT_BATCH) -> _Counters:
+    counters = _Counters()
+    batch: List[Tuple[str, bool]] = []
+    for event in events:
+        batch.append(event)
+        if len(batch) == batch_size:
+            counters.add_batch(batch)
+            batch = []
+    if batch:
+        counters.add_batch(batch)
+    return counters
+
+
+def difficulty_for_solve_rate(solve_rate: float) -> int:
+    for bound, difficulty in DIFFICULTY_BOUNDS:
+        if solve_rate >= bound:
+            return difficulty
+    return 5
+
+
+def calibrate_entry(entry: Dict, attempts: int, solves: int) -> Optional[Dict]:
+    # Returns the next version of the entry, or None while it lacks attempts.
+    # The current predicted_solve_rate acts as PRIOR_ATTEMPTS pseudo-attempts.
+    if attempts < MIN_ATTEMPTS:
+        return None
+    prior = entry.get("quality_scores", {}).get("predicted_solve_rate", 0.5)
+    solve_rate = (solves + prior * PRIOR_ATTEMPTS) / (attempts + PRIOR_ATTEMPTS)
+    updated = dict(entry)
+    updated["quality_scores"] = {**entry.get("quality_scores", {}), "predicted_solve_rate": round(solve_rate, 3)}
+    updated["difficulty"] = difficulty_for_solve_rate(solve_rate)
+    if "auto_qa" in entry:
+        # readability limits depend on difficulty; the other checks do not
+        updated["auto_qa"] = {
+            **entry["auto_qa"],
+            "readability": readability_check(entry["clue_text"], updated["difficulty"]),
+        }
+    updated["difficulty_confidence"] = round(attempts / (attempts + PRIOR_ATTEMPTS), 3)
+    updated["version"] = entry.get("version", 1) + 1
+    return updated
+
+
+def calibrate_dataset(
+    dataset_dir: str,
+    events_path: str,
+    output_dir: str,
+    batch_size: int = EVENT_BATCH,
+) -> Dict:
+    # Writes a copy of the dataset (same layout and storage format) in which every
+    # entry with enough attempts is replaced by a new, calibrated version.
+    source = Path(dataset_dir)
+    target = Path(output_dir)
+    manifest = read_manifest(source)
+    storage_format = manifest_storage_format(manifest)
+    counters = aggregate_events(iter_events(events_path), batch_size)
+
+    calibrated = 0
+    seen: Set[str] = set()
+    missing: List[str] = []
+    new_manifest = json.loads(json.dumps(manifest))
+    for info in new_manifest.get("languages", {}).values():
+        records = []
+        previous = {record["file"]: record for record in info.get("chunk_records", [])}
+        for rel_file in info.get("files", []):
+            path = source / rel_file
+            if not path.exists():
+                # left out of files and chunk_records alike, and reported
+                missing.append(rel_file)
+                continue
+            entries = read_chunk(path, storage_format)
+            for position, entry in enumerate(entries):
+                seen.add(entry["entry_id"])
+                updated = calibrate_entry(entry, *counters.totals(entry["entry_id"]))
+                if updated is not None:
+                    entries[position] = updated
+                    calibrated += 1
+            (target / rel_file).parent.mkdir(parents=True, exist_ok=True)
+            payload = write_chunk(target / rel_file, entries, storage_format)
+            records.append({
+                **previous.get(rel_file, {}),
+                "file": rel_file,
+                "sha256": hashlib.sha256(payload).hexdigest(),
+                "entries": len(entries),
+            })
+        info["chunk_records"] = records
+        info["files"] = [record["file"] for record in records]
+        info["chunks"] = len(records)
+        info["entries"] = sum(record["entries"] for record in records)
+
+    new_manifest["calibration"] = {
+        "calibrated_at": datetime.now(timezone.utc).isoformat(),
+        "events": counters.events,
+        "entries_with_events": len(counters.ids),
+        "calibrated_entries": calibrated,
+        "unknown_entry_ids": len(set(counters.ids) - seen),
+        "missing_files": missing,
+        "min_attempts": MIN_ATTEMPTS,
+        "prior_attempts": PRIOR_ATTEMPTS,
+    }
+    if "entry_index" in new_manifest:
+        build_entry_index(target, new_manifest)
+    write_atomic(target / "manifest.json", json.dumps(new_manifest, ensure_ascii=False, indent=2).encode("utf-8"))
+    return new_manifest
+
+
+def write_event_fixture(
+    dataset_dir: str,
+    path: str,
+    events_per_entry: int = 40,
+    seed: int = 42,
+) -> int:
+    # Local stand-in for the gameplay log: each entry is solved with its current
+    # predicted_solve_rate. Returns the number of events written.
+    root = Path(dataset_dir)
+    manifest = read_manifest(root)
+    storage_format = manifest_storage_format(manifest)
+    rng = Random(seed)
+    written = 0
+    with open(path, "w", encoding="utf-8") as fp:
+        for info in manifest.get("languages", {}).values():
+            for rel_file in info.get("files", []):
+                for entry in read_chunk(root / rel_file, storage_format, ["entry_id", "quality_scores"]):
+                    rate = entry["quality_scores"]["predicted_solve_rate"]
+                    for _ in range(events_per_entry):
+                        fp.write(json.dumps({"entry_id": entry["entry_id"], "solved": rng.random() < rate}) + "\n")
+                        written += 1
+    return written
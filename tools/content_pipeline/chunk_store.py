@@ -0,0 +1,282 @@
+"""Chunk storage formats for pilot datasets (json, jsonl.gz, columnar)."""
+
+from __future__ import annotations
+
+import copy
+import gzip
+import json
+import mmap
+import os
+import struct
+import uuid
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+STORAGE_FORMATS = {
+    "json": ".json",
+    "jsonl.gz": ".jsonl.gz",
+    "columnar": ".spcol",
+}
+
+COLUMNAR_MAGIC = b"SPCOL\x01"
+_HEADER_LENGTH = struct.Struct("<I")
+
+
+def chunk_filename(number: int, storage_format: str = "json") -> str:
+    if storage_format not in STORAGE_FORMATS:
+        raise ValueError("unknown_storage_format")
+    return f"batch_{number:03d}{STORAGE_FORMATS[storage_format]}"
+
+
+def read_manifest(dataset_root: Path) -> Dict:
+    manifest_path = dataset_root / "manifest.json"
+    if not manifest_path.exists():
+        raise FileNotFoundError("manifest_not_found")
+    return json.loads(manifest_path.read_text(encoding="utf-8"))
+
+
+def manifest_storage_format(manifest: Dict) -> str:
+    # manifests written before storage formats existed only contain json chunks
+    return manifest.get("storage_format", "json")
+
+
+# Columnar layout:
+#   magic | u32 header length | header JSON | column blocks
+# Nested dicts (quality_scores, auto_qa, source_trace) are flattened to dotted
+# column names. Every column is one zlib-compressed JSON block; columns with few
+# distinct values (language, status, source_trace.*) are dictionary-encoded as
+# {"values": [...], "codes": [...]}. The header stores each block's offset, so a
+# reader only inflates the columns it was asked for.
+def _flatten(entries: List[Dict]) -> Dict[str, Dict[str, Any]]:
+    columns: Dict[str, Dict[str, Any]] = {}
+    for row, entry in enumerate(entries):
+        for key, value in entry.items():
+            if isinstance(value, dict) and value:
+                items = [(f"{key}.{sub}", key, sub, sub_value) for sub, sub_value in value.items()]
+            else:
+                items = [(key, None, key, value)]
+            for name, parent, field, field_value in items:
+                column = columns.get(name)
+                if column is None:
+                    column = columns[name] = {"parent": parent, "field": field, "values": [], "rows": []}
+                column["values"].append(field_value)
+                column["rows"].append(row)
+    return columns
+
+
+def _encode_column(values: List[Any]) -> Dict[str, Any]:
+    codes: Dict[str, int] = {}
+    unique: List[Any] = []
+    encoded: List[int] = []
+    for value in values:
+        key = json.dumps(value, ensure_ascii=False)
+        code = codes.get(key)
+        if code is None:
+            code = codes[key] = len(unique)
+            unique.append(value)
+        encoded.append(code)
+
+    if len(unique) * 2 <= len(values):
+        return {"encoding": "dict", "data": {"values": unique, "codes": encoded}}
+    return {"encoding": "plain", "data": values}
+
+
+def _encode_columnar(entries: List[Dict]) -> bytes:
+    blocks: List[bytes] = []
+    header_columns = []
+    offset = 0
+    for name, column in _flatten(entries).items():
+        encoded = _encode_column(column["values"])
+        block = zlib.compress(json.dumps(encoded["data"], ensure_ascii=False).encode("utf-8"))
+        meta = {
+            "name": name,
+            "parent": column["parent"],
+            "field": column["field"],
+            "encoding": encoded["encoding"],
+            "offset": offset,
+            "length": len(block),
+        }
+        if len(column["rows"]) != len(entries):
+            meta["rows"] = column["rows"]
+        header_columns.append(meta)
+        blocks.append(block)
+        offset += len(block)
+
+    header = json.dumps({"rows": len(entries), "columns": header_columns}, ensure_ascii=False).encode("utf-8")
+    return COLUMNAR_MAGIC + _HEADER_LENGTH.pack(len(header)) + header + b"".join(blocks)
+
+
+def _copy_value(value: Any) -> Any:
+    if isinstance(value, list) and not any(isinstance(item, (list, dict)) for item in value):
+        return list(value)
+    return copy.deepcopy(value)
+
+
+class ColumnarChunkReader:
+    def __init__(self, path: Path) -> None:
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[: len(COLUMNAR_MAGIC)] != COLUMNAR_MAGIC:
+            self.close()
+            raise ValueError("not_a_columnar_chunk")
+
+        start = len(COLUMNAR_MAGIC)
+        (header_length,) = _HEADER_LENGTH.unpack(self._map[start : start + _HEADER_LENGTH.size])
+        header_start = start + _HEADER_LENGTH.size
+        header = json.loads(self._map[header_start : header_start + header_length].decode("utf-8"))
+        self._data_start = header_start + header_length
+        self.row_count: int = header["rows"]
+        self._columns: Dict[str, Dict] = {column["name"]: column for column in header["columns"]}
+
+    def __enter__(self) -> "ColumnarChunkReader":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def _selected(self, columns: Optional[Sequence[str]]) -> List[Dict]:
+        if columns is None:
+            return list(self._columns.values())
+        # a nested field name ("quality_scores") selects all of its sub-columns
+        wanted = set(columns)
+        return [
+            meta for meta in self._columns.values()
+            if meta["name"] in wanted or meta["parent"] in wanted
+        ]
+
+    def read_column(self, name: str) -> List[Any]:
+        meta = self._columns[name]
+        start = self._data_start + meta["offset"]
+        data = json.loads(zlib.decompress(self._map[start : start + meta["length"]]).decode("utf-8"))
+        if meta["encoding"] == "dict":
+            values = data["values"]
+            if any(isinstance(value, (list, dict)) for value in values):
+                # dictionary-encoded containers would otherwise be shared between rows
+                return [_copy_value(values[code]) for code in data["codes"]]
+            return [values[code] for code in data["codes"]]
+        return data
+
+    def read_rows(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        row_ids: Optional[Sequence[int]] = None,
+    ) -> List[Dict]:
+        if row_ids is not None:
+            return self._read_picked_rows(columns, row_ids)
+        rows: List[Dict] = [{} for _ in range(self.row_count)]
+        for meta in self._selected(columns):
+            values = self.read_column(meta["name"])
+            row_ids = meta.get("rows", range(self.row_count))
+            parent = meta["parent"]
+            field = meta["field"]
+            for row_id, value in zip(row_ids, values):
+                if parent is None:
+                    rows[row_id][field] = value
+                else:
+                    rows[row_id].setdefault(parent, {})[field] = value
+        return rows
+
+    def _read_picked_rows(self, columns: Optional[Sequence[str]], row_ids: Sequence[int]) -> List[Dict]:
+        # columns are still inflated whole, but only the picked rows are built
+        positions: Dict[int, int] = {row_id: position for position, row_id in enumerate(row_ids)}
+        if len(positions) != len(row_ids):
+            raise ValueError("duplicate_row_ids")
+        rows: List[Dict] = [{} for _ in row_ids]
+        for meta in self._selected(columns):
+            values = self.read_column(meta["name"])
+            parent = meta["parent"]
+            field = meta["field"]
+            for row_id, value in zip(meta.get("rows", range(self.row_count)), values):
+                position = positions.get(row_id)
+                if position is None:
+                    continue
+                if parent is None:
+                    rows[position][field] = value
+                else:
+                    rows[position].setdefault(parent, {})[field] = value
+        return rows
+
+
+def encode_chunk(entries: List[Dict], storage_format: str = "json") -> bytes:
+    if storage_format == "json":
+        return json.dumps(entries, ensure_ascii=False, indent=2).encode("utf-8")
+    if storage_format == "jsonl.gz":
+        lines = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+        # mtime=0 keeps the bytes reproducible between runs
+        return gzip.compress(lines.encode("utf-8"), mtime=0)
+    if storage_format == "columnar":
+        return _encode_columnar(entries)
+    raise ValueError("unknown_storage_format")
+
+
+def write_atomic(path: Path, payload: bytes) -> None:
+    # readers and resumed runs never see a half-written file; every writer gets
+    # its own temp file, so concurrent writers of one target cannot interleave
+    tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with tmp_path.open("xb") as fp:
+            fp.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def write_chunk(path: Path, entries: List[Dict], storage_format: str = "json") -> bytes:
+    payload = encode_chunk(entries, storage_format)
+    write_atomic(path, payload)
+    return payload
+
+
+def _project(entry: Dict, columns: Optional[Sequence[str]]) -> Dict:
+    if columns is None:
+        return entry
+    return {key: entry[key] for key in columns if key in entry}
+
+
+def read_chunk(
+    path: Path,
+    storage_format: str = "json",
+    columns: Optional[Sequence[str]] = None,
+) -> List[Dict]:
+    if storage_format == "json":
+        return [_project(entry, columns) for entry in json.loads(path.read_text(encoding="utf-8"))]
+    if storage_format == "jsonl.gz":
+        with gzip.open(path, "rt", encoding="utf-8") as fp:
+            return [_project(json.loads(line), columns) for line in fp if line.strip()]
+    if storage_format == "columnar":
+        with ColumnarChunkReader(path) as reader:
+            return reader.read_rows(columns)
+    raise ValueError("unknown_storage_format")
+
+
+def iter_dataset_entries(
+    dataset_root: Path,
+    manifest: Dict,
+    columns: Optional[Sequence[str]] = None,
+) -> Iterator[Dict]:
+    storage_format = manifest_storage_format(manifest)
+    # language is always read: rows filed under the wrong language are skipped
+    drop_language = columns is not None and "language" not in columns
+    read_columns = None if columns is None else [*columns, "language"] if drop_language else columns
+    for language, info in manifest.get("languages", {}).items():
+        for rel_file in info.get("files", []):
+            path = dataset_root / rel_file
+            if not path.exists():
+                continue
+            for entry in read_chunk(path, storage_format, read_columns):
+                if entry.get("language") != language:
+                    continue
+                if drop_language:
+                    del entry["language"]
+                yield entry
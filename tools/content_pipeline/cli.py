@@ -0,0 +1,226 @@
+"""Command line entry point for the content pipeline (python -m tools.content_pipeline)."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import Any, Dict, List, Optional
+
+# Only argparse is imported up front. Every subcommand imports its pipeline
+# modules (and with them the rule tables) when it runs, so --help and stats
+# stay cheap enough to call from cron and CI shards in a loop.
+
+STORAGE_FORMAT_CHOICES = ("json", "jsonl.gz", "columnar")
+
+
+def _print_json(payload: Any) -> None:
+    import json
+
+    print(json.dumps(payload, ensure_ascii=False, indent=2))
+
+
+def _cmd_generate(args: argparse.Namespace) -> int:
+    from tools.content_pipeline.pilot_generation import write_pilot_dataset
+
+    metrics = None
+    if args.metrics:
+        from tools.content_pipeline.instrumentation import Metrics
+
+        metrics = Metrics()
+    manifest = write_pilot_dataset(
+        args.output_dir,
+        per_language=args.per_language,
+        chunk_size=args.chunk_size,
+        seed=args.seed,
+        workers=args.workers,
+        storage_format=args.storage_format,
+        resume=not args.no_resume,
+        metrics=metrics,
+        qa_cache_path=args.qa_cache,
+        writer_threads=args.writer_threads,
+    )
+    _print_json({
+        "output_dir": args.output_dir,
+        "storage_format": manifest["storage_format"],
+        "languages": {language: info["entries"] for language, info in manifest["languages"].items()},
+        "chunks": sum(info["chunks"] for info in manifest["languages"].values()),
+    })
+    return 0
+
+
+def _run_shard_task(args: argparse.Namespace, task: str, options: Dict[str, Any]) -> Dict:
+    from tools.content_pipeline.sharding import merge_partials, run_shard_worker
+
+    run_shard_worker(args.dataset_dir, task, args.worker_id, options, max_chunks=args.max_chunks)
+    if args.no_merge:
+        return {}
+    return merge_partials(args.dataset_dir, task, options)
+
+
+def _summary(merged: Dict) -> Dict:
+    return {key: merged[key] for key in ("task", "complete", "missing", "entries")}
+
+
+def _cmd_qa(args: argparse.Namespace) -> int:
+    merged = _run_shard_task(args, "qa", {"qa_cache_path": args.qa_cache})
+    if merged:
+        flagged: Dict[str, int] = {}
+        for chunk in merged["chunks"]:
+            for check, count in chunk["flagged"].items():
+                flagged[check] = flagged.get(check, 0) + count
+        changed = sum(len(chunk["changed"]) for chunk in merged["chunks"])
+        _print_json({**_summary(merged), "changed": changed, "flagged": dict(sorted(flagged.items()))})
+    return 0
+
+
+def _cmd_validate(args: argparse.Namespace) -> int:
+    merged = _run_shard_task(args, "validate", {})
+    if not merged:
+        return 0
+    issues = {entry_id: problems for chunk in merged["chunks"] for entry_id, problems in chunk["issues"].items()}
+    _print_json({**_summary(merged), "issues": issues})
+    return 1 if issues else 0
+
+
+def _cmd_export(args: argparse.Namespace) -> int:
+    options = {
+        "output_dir": args.output_dir,
+        "storage_format": args.storage_format,
+        "approved_only": not args.all_statuses,
+    }
+    merged = _run_shard_task(args, "export", options)
+    if merged:
+        _print_json({**_summary(merged), "output_dir": args.output_dir})
+    return 0
+
+
+def _cmd_sample(args: argparse.Namespace) -> int:
+    from tools.content_pipeline.review_sample import build_review_sample, write_review_exports
+
+    sample = build_review_sample(args.dataset_dir, args.size, args.seed, args.allocation)
+    paths = write_review_exports(sample, args.output_dir)
+    _print_json({"entries": len(sample), **paths})
+    return 0
+
+
+def _cmd_clues(args: argparse.Namespace) -> int:
+    from tools.content_pipeline.clue_generation import generate_dataset_clues
+
+    manifest = generate_dataset_clues(
+        args.dataset_dir,
+        args.output_dir,
+        args.backend_url,
+        candidates=args.candidates,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        qa_cache_path=args.qa_cache,
+    )
+    _print_json(manifest["clue_generation"])
+    return 0
+
+
+def _cmd_stats(args: argparse.Namespace) -> int:
+    import os
+    from pathlib import Path
+
+    from tools.content_pipeline.chunk_store import manifest_storage_format, read_manifest
+
+    root = Path(args.dataset_dir)
+    manifest = read_manifest(root)
+    languages = {}
+    for language, info in manifest.get("languages", {}).items():
+        files = info.get("files", [])
+        languages[language] = {
+            "entries": info.get("entries", 0),
+            "chunks": len(files),
+            "bytes": sum(os.stat(root / rel_file).st_size for rel_file in files if (root / rel_file).exists()),
+        }
+    stats: Dict[str, Any] = {
+        "generated_at": manifest.get("generated_at"),
+        "storage_format": manifest_storage_format(manifest),
+        "generation": manifest.get("generation"),
+        "entries": sum(info["entries"] for info in languages.values()),
+        "languages": languages,
+        "entry_index": manifest.get("entry_index"),
+    }
+    if "calibration" in manifest:
+        stats["calibration"] = manifest["calibration"]
+    if args.metrics and "metrics" in manifest:
+        stats["metrics"] = manifest["metrics"]
+    _print_json(stats)
+    return 0
+
+
+def _add_shard_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("dataset_dir")
+    parser.add_argument("--worker-id", default="cli", help="lease owner name; give each parallel shard its own")
+    parser.add_argument("--max-chunks", type=int, help="stop after this many chunks")
+    parser.add_argument("--no-merge", action="store_true", help="skip merging partials (merge from one shard later)")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m tools.content_pipeline", description=__doc__)
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    commands.required = True
+
+    generate = commands.add_parser("generate", help="write a chunked pilot dataset")
+    generate.add_argument("output_dir")
+    generate.add_argument("--per-language", type=int, default=1200)
+    generate.add_argument("--chunk-size", type=int, default=300)
+    generate.add_argument("--seed", type=int, default=42)
+    generate.add_argument("--workers", type=int, default=1)
+    generate.add_argument("--storage-format", choices=STORAGE_FORMAT_CHOICES, default="json")
+    generate.add_argument("--qa-cache", help="SQLite file for cached QA results")
+    generate.add_argument("--writer-threads", type=int, default=0)
+    generate.add_argument("--no-resume", action="store_true", help="rebuild every chunk")
+    generate.add_argument("--metrics", action="store_true", help="record stage/rule timings in the manifest")
+    generate.set_defaults(handler=_cmd_generate)
+
+    qa = commands.add_parser("qa", help="re-run auto-QA over a dataset's chunks")
+    _add_shard_arguments(qa)
+    qa.add_argument("--qa-cache", help="SQLite file for cached QA results")
+    qa.set_defaults(handler=_cmd_qa)
+
+    validate = commands.add_parser("validate", help="validate every entry against the content model")
+    _add_shard_arguments(validate)
+    validate.set_defaults(handler=_cmd_validate)
+
+    export = commands.add_parser("export", help="copy approved entries into a new chunk tree")
+    _add_shard_arguments(export)
+    export.add_argument("--output-dir", required=True)
+    export.add_argument("--storage-format", choices=STORAGE_FORMAT_CHOICES, help="defaults to the source format")
+    export.add_argument("--all-statuses", action="store_true", help="export every entry, not only approved")
+    export.set_defaults(handler=_cmd_export)
+
+    sample = commands.add_parser("sample", help="build a stratified review sample (JSON + CSV)")
+    sample.add_argument("dataset_dir")
+    sample.add_argument("output_dir")
+    sample.add_argument("--size", type=int, default=500)
+    sample.add_argument("--seed", type=int, default=42)
+    sample.add_argument("--allocation", choices=("round_robin", "proportional"), default="round_robin")
+    sample.set_defaults(handler=_cmd_sample)
+
+    clues = commands.add_parser("clues", help="replace clues with ranked candidates from a generation backend")
+    clues.add_argument("dataset_dir")
+    clues.add_argument("output_dir")
+    clues.add_argument("--backend-url", required=True)
+    clues.add_argument("--candidates", type=int, default=4, help="candidates per word (3-8 recommended)")
+    clues.add_argument("--batch-size", type=int, default=16, help="words per request")
+    clues.add_argument("--concurrency", type=int, default=8, help="requests in flight (and pooled connections)")
+    clues.add_argument("--qa-cache", help="SQLite file caching backend responses and QA results")
+    clues.set_defaults(handler=_cmd_clues)
+
+    stats = commands.add_parser("stats", help="summarize a dataset from its manifest")
+    stats.add_argument("dataset_dir")
+    stats.add_argument("--metrics", action="store_true", help="include recorded metrics")
+    stats.set_defaults(handler=_cmd_stats)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except (ValueError, FileNotFoundError, ConnectionError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
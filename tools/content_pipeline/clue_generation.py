@@ -0,0 +1,534 @@
+"""Batched asyncio clue generation against an HTTP backend, ranked by auto-QA."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import ssl
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from random import Random
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from tools.content_pipeline.auto_qa import READABILITY_LIMITS, normalize, run_auto_qa_batch
+from tools.content_pipeline.chunk_store import manifest_storage_format, read_chunk, read_manifest, write_atomic, write_chunk
+from tools.content_pipeline.entry_index import build_entry_index
+from tools.content_pipeline.instrumentation import Metrics
+from tools.content_pipeline.qa_cache import QACache
+from tools.content_pipeline.similarity_index import SimilarityIndex
+
+# bump when the prompt text or request format changes; part of every cache key
+PROMPT_VERSION = 1
+DEFAULT_CANDIDATES = 4
+DEFAULT_BATCH_SIZE = 16
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.2
+DEFAULT_TIMEOUT = 30.0
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# the hard rules of the prompting standard (CLUE_CONTENT_PIPELINE.md, 4.2)
+PROMPT_RULES = {
+    "de": "Schreibe {n} Hinweise ({style}) für das Wort \"{word}\". Das Wort und Teile davon dürfen nicht vorkommen. "
+          "Eine eindeutige Lösung, altersgerecht, höchstens {max_len} Zeichen.",
+    "en": "Write {n} {style} clues for the word \"{word}\". Never use the word or parts of it. "
+          "One clear answer, family friendly, at most {max_len} characters.",
+    "fr": "Écris {n} indices ({style}) pour le mot « {word} ». Jamais le mot ni une partie du mot. "
+          "Une seule réponse, adapté à tous, {max_len} caractères au plus.",
+    "es": "Escribe {n} pistas ({style}) para la palabra «{word}». Nunca la palabra ni partes de ella. "
+          "Una sola respuesta, apta para todos, como máximo {max_len} caracteres.",
+}
+
+
+def build_prompt(entry: Mapping[str, Any], candidates: int) -> str:
+    return PROMPT_RULES[entry["language"]].format(
+        n=candidates,
+        style=entry.get("clue_style", "neutral"),
+        word=entry["word"],
+        max_len=READABILITY_LIMITS.get(entry["difficulty"], max(READABILITY_LIMITS.values())),
+    )
+
+
+def candidate_cache_key(backend_name: str, entry: Mapping[str, Any], candidates: int) -> str:
+    fields = [
+        backend_name,
+        PROMPT_VERSION,
+        entry["language"],
+        entry["word"],
+        entry["difficulty"],
+        entry.get("clue_style", "neutral"),
+        candidates,
+    ]
+    return "clue:" + hashlib.sha256(json.dumps(fields, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class _ConnectionPool:
+    # Keep-alive HTTP/1.1 connections to one host. At most `size` requests run at
+    # once; a finished connection goes back to the idle list unless the server
+    # asked to close it.
+    def __init__(self, host: str, port: int, use_ssl: bool, size: int) -> None:
+        self.host = host
+        self.port = port
+        self._ssl = ssl.create_default_context() if use_ssl else None
+        self._slots = asyncio.Semaphore(size)
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self.opened = 0
+
+    async def request(self, path: str, body: bytes, headers: Mapping[str, str], timeout: float) -> Tuple[int, bytes]:
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else None
+            if connection is None:
+                connection = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port, ssl=self._ssl), timeout
+                )
+                self.opened += 1
+            try:
+                status, payload, keep_alive = await asyncio.wait_for(
+                    self._exchange(connection, path, body, headers), timeout
+                )
+            except BaseException:
+                connection[1].close()
+                raise
+            if keep_alive:
+                self._idle.append(connection)
+            else:
+                connection[1].close()
+            return status, payload
+
+    async def _exchange(
+        self,
+        connection: Tuple[asyncio.StreamReader, asyncio.StreamWriter],
+        path: str,
+        body: bytes,
+        headers: Mapping[str, str],
+    ) -> Tuple[int, bytes, bool]:
+        reader, writer = connection
+        lines = [f"POST {path} HTTP/1.1", f"Host: {self.host}:{self.port}", f"Content-Length: {len(body)}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("connection_closed")
+        parts = status_line.decode("latin-1").split(" ", 2)
+        if len(parts) < 2 or not parts[1].isdigit():
+            # a garbled response is retried like a dropped connection
+            raise ConnectionError("malformed_status_line")
+        version, status = parts[:2]
+        response_headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        keep_alive = version == "HTTP/1.1" and response_headers.get("connection", "").lower() != "close"
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            parts = []
+            while True:
+                try:
+                    size = int((await reader.readline()).split(b";")[0], 16)
+                except ValueError:
+                    raise ConnectionError("malformed_chunk_size") from None
+                if size == 0:
+                    await reader.readline()
+                    break
+                parts.append(await reader.readexactly(size))
+                await reader.readline()
+            payload = b"".join(parts)
+        elif "content-length" in response_headers:
+            payload = await reader.readexactly(int(response_headers["content-length"]))
+        else:
+            payload = await reader.read()
+            keep_alive = False
+        return int(status), payload, keep_alive
+
+    def close(self) -> None:
+        while self._idle:
+            self._idle.pop()[1].close()
+
+
+# Backends are pluggable: anything with a `name` and an async
+# generate(language, items, candidates) -> {item id: [clue, ...]} works.
+# HttpClueBackend speaks the JSON format of StubClueServer; other HTTP APIs can
+# subclass it and override encode_request/decode_response.
+class HttpClueBackend:
+    def __init__(
+        self,
+        url: str,
+        max_connections: int = DEFAULT_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        headers: Optional[Mapping[str, str]] = None,
+        name: Optional[str] = None,
+    ) -> None:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError("invalid_backend_url")
+        self.name = name or f"{parts.hostname}{parts.path}"
+        self.path = parts.path or "/"
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.requests = 0
+        self.retried = 0
+        self._endpoint = (parts.hostname, parts.port or (443 if parts.scheme == "https" else 80), parts.scheme == "https")
+        self._max_connections = max_connections
+        self._pool: Optional[_ConnectionPool] = None
+        self._closed_opened = 0
+        self._rng = Random()
+
+    @property
+    def connections_opened(self) -> int:
+        return self._closed_opened + (self._pool.opened if self._pool is not None else 0)
+
+    def encode_request(self, language: str, items: Sequence[Dict], candidates: int) -> bytes:
+        payload = {"prompt_version": PROMPT_VERSION, "language": language, "candidates": candidates, "items": items}
+        return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+    def decode_response(self, body: bytes) -> Dict[str, List[str]]:
+        return json.loads(body)["results"]
+
+    async def generate(self, language: str, items: Sequence[Dict], candidates: int) -> Dict[str, List[str]]:
+        if self._pool is None:
+            # created on first use so the pool belongs to the running event loop
+            self._pool = _ConnectionPool(*self._endpoint, self._max_connections)
+        body = self.encode_request(language, items, candidates)
+        for attempt in range(self.retries + 1):
+            self.requests += 1
+            try:
+                status, payload = await self._pool.request(self.path, body, self.headers, self.timeout)
+            except (OSError, EOFError, asyncio.TimeoutError):
+                status, payload = None, b""
+            if status == 200:
+                try:
+                    return self.decode_response(payload)
+                except (ValueError, KeyError, TypeError):
+                    # a truncated or non-JSON body is retried like a dropped connection
+                    status = None
+            if status is not None and status not in RETRY_STATUSES:
+                raise ValueError("backend_rejected_request")
+            if attempt < self.retries:
+                self.retried += 1
+                await asyncio.sleep(self.backoff * 2 ** attempt * (0.5 + self._rng.random()))
+        raise ConnectionError("backend_unavailable")
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
+            self._closed_opened += self._pool.opened
+            self._pool = None
+
+
+def _clean_candidates(texts: Sequence[Any], limit: int) -> List[str]:
+    cleaned: List[str] = []
+    for text in texts:
+        if isinstance(text, str) and text.strip() and text.strip() not in cleaned:
+            cleaned.append(text.strip())
+    return cleaned[:limit]
+
+
+async def generate_candidates(
+    entries: Sequence[Mapping[str, Any]],
+    backend: Any,
+    candidates: int = DEFAULT_CANDIDATES,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    cache: Optional[QACache] = None,
+) -> List[List[str]]:
+    # Candidates per entry, in the backend's order. Cached words are not sent;
+    # the rest go out in per-language batches, at most `concurrency` at a time.
+    if batch_size < 1 or concurrency < 1 or candidates < 1:
+        raise ValueError("generation_limits_must_be_positive")
+    keys = [candidate_cache_key(backend.name, entry, candidates) for entry in entries]
+    cached = cache.get_many(keys) if cache is not None else {}
+    results: List[List[str]] = [list(cached.get(key, [])) for key in keys]
+
+    by_language: Dict[str, List[int]] = {}
+    for position, (entry, key) in enumerate(zip(entries, keys)):
+        if key not in cached:
+            by_language.setdefault(entry["language"], []).append(position)
+    batches = [
+        (language, positions[start : start + batch_size])
+        for language, positions in by_language.items()
+        for start in range(0, len(positions), batch_size)
+    ]
+
+    slots = asyncio.Semaphore(concurrency)
+
+    async def run(language: str, positions: List[int]) -> Tuple[List[int], Dict[str, List[str]]]:
+        items = [
+            {
+                "id": str(position),
+                "word": entries[position]["word"],
+                "difficulty": entries[position]["difficulty"],
+                "style": entries[position].get("clue_style", "neutral"),
+                "prompt": build_prompt(entries[position], candidates),
+            }
+            for position in positions
+        ]
+        async with slots:
+            return positions, await backend.generate(language, items, candidates)
+
+    for finished in asyncio.as_completed([run(language, positions) for language, positions in batches]):
+        positions, generated = await finished
+        fresh: Dict[str, List[str]] = {}
+        for position in positions:
+            texts = _clean_candidates(generated.get(str(position), []), candidates)
+            results[position] = texts
+            if texts:
+                fresh[keys[position]] = texts
+        # cached per batch, so a later failure keeps the responses already paid for
+        if cache is not None:
+            cache.put_many(fresh)
+    return results
+
+
+def _flag_count(qa: Mapping[str, List[str]]) -> int:
+    return sum(1 for flags in qa.values() if flags)
+
+
+def rank_candidates(
+    entries: List[Dict],
+    candidate_lists: Sequence[Sequence[str]],
+    similarity_index: Optional[SimilarityIndex] = None,
+    cache: Optional[QACache] = None,
+    metrics: Optional[Metrics] = None,
+) -> List[Dict]:
+    # Every candidate goes through the batch QA (without similarity, which would
+    # only compare a word's candidates with each other). Per entry the candidate
+    # with the fewest flagged checks wins, ties going to the backend's order; the
+    # other clean candidates stay as clue_variants. The winners then get their
+    # final auto_qa, similarity included, against the given (or a fresh) index.
+    flat = [{**entry, "clue_text": text} for entry, texts in zip(entries, candidate_lists) for text in texts]
+    qa_results = run_auto_qa_batch(flat, similarity_flags=[False] * len(flat), metrics=metrics, cache=cache)
+    position = 0
+    for entry, texts in zip(entries, candidate_lists):
+        if not texts:
+            continue  # nothing generated: the entry keeps its clue
+        scored = qa_results[position : position + len(texts)]
+        position += len(texts)
+        best = min(range(len(texts)), key=lambda i: _flag_count(scored[i]))
+        entry["clue_text"] = texts[best]
+        entry["clue_variants"] = [text for i, text in enumerate(texts) if i != best and not _flag_count(scored[i])]
+
+    index = similarity_index if similarity_index is not None else SimilarityIndex()
+    for entry, qa in zip(entries, run_auto_qa_batch(entries, similarity_index=index, metrics=metrics, cache=cache)):
+        entry["auto_qa"] = qa
+    return entries
+
+
+async def generate_clues(
+    entries: List[Dict],
+    backend: Any,
+    candidates: int = DEFAULT_CANDIDATES,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    cache: Optional[QACache] = None,
+    similarity_index: Optional[SimilarityIndex] = None,
+    metrics: Optional[Metrics] = None,
+) -> List[Dict]:
+    # cache holds backend responses and QA results (QACache keys are opaque)
+    options = (candidates, batch_size, concurrency, cache, similarity_index, metrics)
+    return (await _generate_and_rank(entries, backend, *options))[0]
+
+
+async def _generate_and_rank(
+    entries: List[Dict],
+    backend: Any,
+    candidates: int,
+    batch_size: int,
+    concurrency: int,
+    cache: Optional[QACache],
+    similarity_index: Optional[SimilarityIndex],
+    metrics: Optional[Metrics],
+) -> Tuple[List[Dict], int]:
+    started = time.perf_counter()
+    candidate_lists = await generate_candidates(entries, backend, candidates, batch_size, concurrency, cache)
+    generated = sum(1 for texts in candidate_lists if texts)
+    if metrics is None:
+        return rank_candidates(entries, candidate_lists, similarity_index, cache), generated
+    metrics.record("stage.clue_generation", time.perf_counter() - started, len(entries), generated)
+    with metrics.timed("stage.qa", len(entries)):
+        return rank_candidates(entries, candidate_lists, similarity_index, cache, metrics), generated
+
+
+def generate_dataset_clues(
+    dataset_dir: str,
+    output_dir: str,
+    backend_url: str,
+    candidates: int = DEFAULT_CANDIDATES,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    qa_cache_path: Optional[str] = None,
+    metrics: Optional[Metrics] = None,
+) -> Dict:
+    # Writes a copy of the dataset (same layout and storage format) whose clues
+    # come from the backend. Chunks are handled one at a time; similarity runs
+    # against all earlier clues of the language, as in pilot generation.
+    return asyncio.run(_generate_dataset_clues(
+        Path(dataset_dir), Path(output_dir), backend_url, candidates, batch_size, concurrency, qa_cache_path, metrics
+    ))
+
+
+async def _generate_dataset_clues(
+    source: Path,
+    target: Path,
+    backend_url: str,
+    candidates: int,
+    batch_size: int,
+    concurrency: int,
+    qa_cache_path: Optional[str],
+    metrics: Optional[Metrics],
+) -> Dict:
+    manifest = read_manifest(source)
+    storage_format = manifest_storage_format(manifest)
+    backend = HttpClueBackend(backend_url, max_connections=concurrency)
+    cache = QACache(qa_cache_path) if qa_cache_path is not None else None
+    new_manifest = json.loads(json.dumps(manifest))
+    generated = 0
+    try:
+        for language, info in new_manifest.get("languages", {}).items():
+            index = SimilarityIndex()
+            previous = {record["file"]: record for record in info.get("chunk_records", [])}
+            records = []
+            for rel_file in info.get("files", []):
+                path = source / rel_file
+                if not path.exists():
+                    continue
+                entries = [entry for entry in read_chunk(path, storage_format) if entry.get("language") == language]
+                options = (candidates, batch_size, concurrency, cache, index, metrics)
+                generated += (await _generate_and_rank(entries, backend, *options))[1]
+                (target / rel_file).parent.mkdir(parents=True, exist_ok=True)
+                payload = write_chunk(target / rel_file, entries, storage_format)
+                records.append({
+                    **previous.get(rel_file, {}),
+                    "file": rel_file,
+                    "sha256": hashlib.sha256(payload).hexdigest(),
+                    "entries": len(entries),
+                })
+            info["chunk_records"] = records
+    finally:
+        await backend.close()
+        if cache is not None:
+            cache.close()
+
+    new_manifest["clue_generation"] = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "backend": backend.name,
+        "prompt_version": PROMPT_VERSION,
+        "candidates": candidates,
+        "entries_generated": generated,
+        "requests": backend.requests,
+        "retried": backend.retried,
+    }
+    if metrics is not None:
+        new_manifest["metrics"] = metrics.snapshot()
+    if "entry_index" in new_manifest:
+        build_entry_index(target, new_manifest)
+    write_atomic(target / "manifest.json", json.dumps(new_manifest, ensure_ascii=False, indent=2).encode("utf-8"))
+    return new_manifest
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_StubHTTPServer"
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.lock:
+            self.server.stub.connections += 1
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        stub = self.server.stub
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.server.lock:
+            stub.requests += 1
+            fail = stub.requests <= stub.fail_first
+            stub.in_flight += 1
+            stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+        try:
+            if stub.delay:
+                time.sleep(stub.delay)
+            if fail:
+                self._reply(503, {"error": "unavailable"})
+                return
+            request = json.loads(body)
+            results = {item["id"]: stub.candidates_for(item, request["candidates"]) for item in request["items"]}
+            self._reply(200, {"results": results})
+        finally:
+            with self.server.lock:
+                stub.in_flight -= 1
+
+    def _reply(self, status: int, payload: Dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, stub: "StubClueServer") -> None:
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.stub = stub
+        self.lock = threading.Lock()
+
+
+# Local stand-in for the LLM service, for tests and offline runs. Candidates are
+# deterministic per word; the first one deliberately leaks the word so that the
+# QA ranking has something to reject. fail_first answers the first requests with
+# 503, delay slows every request down.
+class StubClueServer:
+    def __init__(self, fail_first: int = 0, delay: float = 0.0) -> None:
+        self.fail_first = fail_first
+        self.delay = delay
+        self.requests = 0
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._server = _StubHTTPServer(self)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1/clues"
+
+    def candidates_for(self, item: Mapping[str, Any], count: int) -> List[str]:
+        word = str(item["word"])
+        letters = normalize("".join(char for char in word if char.isalpha()))
+        digest = hashlib.sha256(word.encode("utf-8")).hexdigest()
+        texts = [f"{word} in other words"]
+        for i in range(1, count):
+            texts.append(f"Hint {digest[i * 4 : i * 4 + 4]}: {len(letters)} letters, begins with {letters[:1].upper()}")
+        return texts[:count]
+
+    def start(self) -> "StubClueServer":
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubClueServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
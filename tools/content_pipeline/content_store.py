@@ -0,0 +1,214 @@
+"""Content-addressed, deduplicated store of dataset versions with bucketed diffs."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from tools.content_pipeline.chunk_store import iter_dataset_entries, read_manifest, write_atomic
+
+DEFAULT_BUCKET_COUNT = 1024
+_VERSION_NAME = re.compile(r"^[A-Za-z0-9._-]+$")
+
+# Layout:
+#   objects/<first 2 hex>/<sha256>   entry JSON and bucket lists, written once
+#   versions/<name>.json             {"buckets": [bucket hash, ...], ...}
+# An entry lands in bucket sha256(entry_id) % bucket_count. A bucket object is the
+# sorted [[entry_id, entry hash], ...] list of its entries, so two versions share
+# every bucket whose entries did not change. diff() compares bucket hashes first
+# and only opens buckets that differ: its cost follows the size of the change,
+# not of the corpus.
+# Volatile fields (VOLATILE_FIELDS) change on every rebuild without the content
+# changing. They are left out of the entry object and its hash and kept per
+# version in "volatile_buckets" (same bucketing, [[entry_id, {field: value}], ...]),
+# so a rebuilt dataset still shares its entries and content buckets.
+VOLATILE_FIELDS = (("source_trace", "imported_at"),)
+
+
+def _hash(payload: bytes) -> str:
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _canonical(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def _split_volatile(entry: Mapping[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    content = dict(entry)
+    volatile: Dict[str, Any] = {}
+    for parent, field in VOLATILE_FIELDS:
+        nested = content.get(parent)
+        if isinstance(nested, Mapping) and field in nested:
+            nested = dict(nested)
+            volatile[f"{parent}.{field}"] = nested.pop(field)
+            content[parent] = nested
+    return content, volatile
+
+
+def _restore_volatile(content: Dict[str, Any], volatile: Mapping[str, Any]) -> Dict[str, Any]:
+    for key, value in volatile.items():
+        parent, field = key.split(".", 1)
+        content[parent][field] = value
+    return content
+
+
+def _bucket_of(entry_id: str, bucket_count: int) -> int:
+    return int(hashlib.sha256(entry_id.encode("utf-8")).hexdigest()[:8], 16) % bucket_count
+
+
+class ContentStore:
+    def __init__(self, root: str) -> None:
+        self.root = Path(root)
+        (self.root / "objects").mkdir(parents=True, exist_ok=True)
+        (self.root / "versions").mkdir(parents=True, exist_ok=True)
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / digest
+
+    def put_object(self, payload: bytes) -> str:
+        digest = _hash(payload)
+        path = self._object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            write_atomic(path, payload)
+        return digest
+
+    def get_object(self, digest: str) -> bytes:
+        path = self._object_path(digest)
+        if not path.exists():
+            raise KeyError("object_not_found")
+        return path.read_bytes()
+
+    def _version_path(self, name: str) -> Path:
+        if not _VERSION_NAME.match(name):
+            raise ValueError("invalid_version_name")
+        return self.root / "versions" / f"{name}.json"
+
+    def versions(self) -> List[str]:
+        return sorted(path.stem for path in (self.root / "versions").glob("*.json"))
+
+    def load_version(self, name: str) -> Dict:
+        path = self._version_path(name)
+        if not path.exists():
+            raise KeyError("version_not_found")
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def commit_entries(
+        self,
+        name: str,
+        entries: Iterable[Mapping[str, Any]],
+        bucket_count: int = DEFAULT_BUCKET_COUNT,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict:
+        path = self._version_path(name)
+        if path.exists():
+            raise ValueError("version_exists")
+        if bucket_count < 1:
+            raise ValueError("bucket_count_must_be_positive")
+
+        buckets: List[Dict[str, str]] = [{} for _ in range(bucket_count)]
+        volatile_buckets: List[Dict[str, Dict[str, Any]]] = [{} for _ in range(bucket_count)]
+        stored = 0
+        for entry in entries:
+            position = _bucket_of(entry["entry_id"], bucket_count)
+            bucket = buckets[position]
+            if entry["entry_id"] in bucket:
+                raise ValueError("duplicate_entry_id")
+            content, volatile = _split_volatile(entry)
+            payload = _canonical(content)
+            before = self._object_path(_hash(payload)).exists()
+            bucket[entry["entry_id"]] = self.put_object(payload)
+            if volatile:
+                volatile_buckets[position][entry["entry_id"]] = volatile
+            stored += 0 if before else 1
+
+        version = {
+            "name": name,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "bucket_count": bucket_count,
+            "entries": sum(len(bucket) for bucket in buckets),
+            "new_objects": stored,
+            "buckets": [self.put_object(_canonical(sorted(bucket.items()))) for bucket in buckets],
+            "volatile_buckets": [self.put_object(_canonical(sorted(bucket.items()))) for bucket in volatile_buckets],
+            "metadata": metadata or {},
+        }
+        write_atomic(path, json.dumps(version, ensure_ascii=False, indent=2).encode("utf-8"))
+        return version
+
+    def commit_dataset(self, name: str, dataset_dir: str, bucket_count: int = DEFAULT_BUCKET_COUNT) -> Dict:
+        root = Path(dataset_dir)
+        manifest = read_manifest(root)
+        metadata = {"source": str(root), "generated_at": manifest.get("generated_at")}
+        return self.commit_entries(name, iter_dataset_entries(root, manifest), bucket_count, metadata)
+
+    def _bucket(self, digest: str) -> Dict[str, str]:
+        return dict(json.loads(self.get_object(digest)))
+
+    def _volatile_bucket(self, version: Mapping[str, Any], position: int) -> Dict[str, Dict[str, Any]]:
+        # versions written before volatile fields were split off have none
+        digests = version.get("volatile_buckets")
+        return dict(json.loads(self.get_object(digests[position]))) if digests else {}
+
+    def iter_entries(self, name: str) -> Iterator[Dict]:
+        version = self.load_version(name)
+        for position, digest in enumerate(version["buckets"]):
+            volatile = self._volatile_bucket(version, position)
+            for entry_id, entry_hash in sorted(self._bucket(digest).items()):
+                yield _restore_volatile(json.loads(self.get_object(entry_hash)), volatile.get(entry_id, {}))
+
+    def get_entry(self, name: str, entry_id: str) -> Optional[Dict]:
+        version = self.load_version(name)
+        position = _bucket_of(entry_id, version["bucket_count"])
+        entry_hash = self._bucket(version["buckets"][position]).get(entry_id)
+        if entry_hash is None:
+            return None
+        volatile = self._volatile_bucket(version, position).get(entry_id, {})
+        return _restore_volatile(json.loads(self.get_object(entry_hash)), volatile)
+
+    def diff(self, old_name: str, new_name: str) -> Dict[str, List[str]]:
+        old = self.load_version(old_name)
+        new = self.load_version(new_name)
+        if old["bucket_count"] == new["bucket_count"]:
+            pairs = [
+                (self._bucket(old_digest), self._bucket(new_digest))
+                for old_digest, new_digest in zip(old["buckets"], new["buckets"])
+                if old_digest != new_digest
+            ]
+        else:
+            # bucketing differs, so every bucket has to be read once
+            pairs = [(self._merged_buckets(old), self._merged_buckets(new))]
+
+        added: List[str] = []
+        changed: List[str] = []
+        removed: List[str] = []
+        for before, after in pairs:
+            for entry_id, entry_hash in after.items():
+                previous = before.get(entry_id)
+                if previous is None:
+                    added.append(entry_id)
+                elif previous != entry_hash:
+                    changed.append(entry_id)
+            removed.extend(entry_id for entry_id in before if entry_id not in after)
+        return {"added": sorted(added), "changed": sorted(changed), "removed": sorted(removed)}
+
+    def _merged_buckets(self, version: Mapping[str, Any]) -> Dict[str, str]:
+        merged: Dict[str, str] = {}
+        for digest in version["buckets"]:
+            merged.update(self._bucket(digest))
+        return merged
+
+    def diff_entries(
+        self,
+        old_name: str,
+        new_name: str,
+        entry_ids: Iterable[str],
+    ) -> List[Tuple[str, Optional[Dict], Optional[Dict]]]:
+        # (entry_id, old entry, new entry), e.g. for reviewing a diff's changed ids
+        return [
+            (entry_id, self.get_entry(old_name, entry_id), self.get_entry(new_name, entry_id))
+            for entry_id in entry_ids
+        ]
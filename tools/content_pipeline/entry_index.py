@@ -0,0 +1,215 @@
+"""Sidecar entry_id index for random access into chunked pilot datasets."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from tools.content_pipeline.chunk_store import ColumnarChunkReader, manifest_storage_format, read_manifest
+
+ENTRY_INDEX_FILE = "entry_index.sqlite"
+_LOOKUP_BATCH = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entry_locations (
+    entry_id TEXT PRIMARY KEY,
+    file TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    byte_offset INTEGER,
+    byte_length INTEGER
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_entry_locations_file ON entry_locations (file, row);
+CREATE TABLE IF NOT EXISTS indexed_chunks (
+    file TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS index_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+# (entry_id, language, row, byte_offset, byte_length)
+_Location = Tuple[str, str, int, Optional[int], Optional[int]]
+
+
+def _json_locations(payload: bytes) -> List[_Location]:
+    # Byte span of every object in a json chunk. Each span parses on its own, so a
+    # lookup reads and decodes one entry instead of the whole array.
+    text = payload.decode("utf-8")
+    decoder = json.JSONDecoder()
+    locations: List[_Location] = []
+    char_pos = text.index("[") + 1
+    byte_pos = len(text[:char_pos].encode("utf-8"))
+    while True:
+        while text[char_pos] in " \t\r\n,":
+            char_pos += 1
+            byte_pos += 1
+        if text[char_pos] == "]":
+            return locations
+        entry, end = decoder.raw_decode(text, char_pos)
+        length = len(text[char_pos:end].encode("utf-8"))
+        locations.append((entry["entry_id"], entry.get("language"), len(locations), byte_pos, length))
+        byte_pos += length
+        char_pos = end
+
+
+def _chunk_locations(path: Path, storage_format: str) -> List[_Location]:
+    if storage_format == "json":
+        return _json_locations(path.read_bytes())
+    if storage_format == "jsonl.gz":
+        # gzip has no random access; the row number is the line to stop at
+        with gzip.open(path, "rt", encoding="utf-8") as fp:
+            rows = [json.loads(line) for line in fp if line.strip()]
+        return [(row["entry_id"], row.get("language"), i, None, None) for i, row in enumerate(rows)]
+    if storage_format == "columnar":
+        with ColumnarChunkReader(path) as reader:
+            ids = reader.read_column("entry_id")
+            languages = reader.read_column("language")
+        return [(entry_id, language, i, None, None) for i, (entry_id, language) in enumerate(zip(ids, languages))]
+    raise ValueError("unknown_storage_format")
+
+
+def build_entry_index(dataset_root: Path, manifest: Optional[Dict] = None) -> int:
+    # Incremental: chunks whose sha256 matches the last build keep their rows.
+    # Rows filed under the wrong language are skipped, as iter_dataset_entries
+    # does, and the first chunk listing an entry_id wins.
+    manifest = manifest if manifest is not None else read_manifest(dataset_root)
+    storage_format = manifest_storage_format(manifest)
+    wanted: List[Tuple[str, str, Optional[str]]] = []
+    for language, info in manifest.get("languages", {}).items():
+        hashes = {record["file"]: record["sha256"] for record in info.get("chunk_records", [])}
+        for rel_file in info.get("files", []):
+            wanted.append((language, rel_file, hashes.get(rel_file)))
+
+    conn = sqlite3.connect(dataset_root / ENTRY_INDEX_FILE)
+    try:
+        conn.executescript(_SCHEMA)
+        with conn:
+            previous_format = conn.execute("SELECT value FROM index_meta WHERE key = 'storage_format'").fetchone()
+            indexed = dict(conn.execute("SELECT file, sha256 FROM indexed_chunks"))
+            if previous_format is None or previous_format[0] != storage_format:
+                indexed = {}
+                conn.execute("DELETE FROM entry_locations")
+                conn.execute("DELETE FROM indexed_chunks")
+                conn.execute(
+                    "INSERT OR REPLACE INTO index_meta (key, value) VALUES ('storage_format', ?)", (storage_format,)
+                )
+
+            current = {rel_file for _, rel_file, _ in wanted}
+            for rel_file in set(indexed) - current:
+                conn.execute("DELETE FROM entry_locations WHERE file = ?", (rel_file,))
+                conn.execute("DELETE FROM indexed_chunks WHERE file = ?", (rel_file,))
+
+            for language, rel_file, sha256 in wanted:
+                path = dataset_root / rel_file
+                if sha256 is not None and indexed.get(rel_file) == sha256:
+                    continue
+                conn.execute("DELETE FROM entry_locations WHERE file = ?", (rel_file,))
+                conn.execute("DELETE FROM indexed_chunks WHERE file = ?", (rel_file,))
+                if not path.exists():
+                    continue
+                conn.executemany(
+                    "INSERT OR IGNORE INTO entry_locations (entry_id, file, row, byte_offset, byte_length) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (entry_id, rel_file, row, offset, length)
+                        for entry_id, entry_language, row, offset, length in _chunk_locations(path, storage_format)
+                        if entry_language == language
+                    ],
+                )
+                if sha256 is not None:
+                    conn.execute("INSERT INTO indexed_chunks (file, sha256) VALUES (?, ?)", (rel_file, sha256))
+        return conn.execute("SELECT COUNT(*) FROM entry_locations").fetchone()[0]
+    finally:
+        conn.close()
+
+
+class EntryIndex:
+    def __init__(self, dataset_root: Path) -> None:
+        path = Path(dataset_root) / ENTRY_INDEX_FILE
+        if not path.exists():
+            raise FileNotFoundError("entry_index_not_found")
+        self._root = Path(dataset_root)
+        self._conn = sqlite3.connect(path)
+        row = self._conn.execute("SELECT value FROM index_meta WHERE key = 'storage_format'").fetchone()
+        self.storage_format = row[0] if row else "json"
+
+    def __enter__(self) -> "EntryIndex":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM entry_locations").fetchone()[0]
+
+    def __contains__(self, entry_id: object) -> bool:
+        return self.locate(str(entry_id)) is not None
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def locate(self, entry_id: str) -> Optional[Tuple[str, int, Optional[int], Optional[int]]]:
+        row = self._conn.execute(
+            "SELECT file, row, byte_offset, byte_length FROM entry_locations WHERE entry_id = ?", (entry_id,)
+        ).fetchone()
+        return tuple(row) if row else None
+
+    def get(self, entry_id: str) -> Optional[Dict]:
+        return self.get_many([entry_id]).get(entry_id)
+
+    def get_many(self, entry_ids: Iterable[str]) -> Dict[str, Dict]:
+        # unknown ids are left out of the result
+        by_file: Dict[str, List[Tuple[str, int, Optional[int], Optional[int]]]] = {}
+        ids = list(dict.fromkeys(entry_ids))
+        for start in range(0, len(ids), _LOOKUP_BATCH):
+            batch = ids[start : start + _LOOKUP_BATCH]
+            placeholders = ", ".join("?" * len(batch))
+            for entry_id, rel_file, row, offset, length in self._conn.execute(
+                f"SELECT entry_id, file, row, byte_offset, byte_length FROM entry_locations "
+                f"WHERE entry_id IN ({placeholders})",
+                batch,
+            ):
+                by_file.setdefault(rel_file, []).append((entry_id, row, offset, length))
+
+        found: Dict[str, Dict] = {}
+        for rel_file, locations in by_file.items():
+            found.update(self._read_locations(self._root / rel_file, sorted(locations, key=lambda loc: loc[1])))
+        return {entry_id: found[entry_id] for entry_id in ids if entry_id in found}
+
+    def _read_locations(
+        self,
+        path: Path,
+        locations: List[Tuple[str, int, Optional[int], Optional[int]]],
+    ) -> Dict[str, Dict]:
+        if self.storage_format == "json":
+            entries: Dict[str, Dict] = {}
+            with path.open("rb") as fp:
+                for entry_id, _, offset, length in locations:
+                    fp.seek(offset)
+                    entries[entry_id] = json.loads(fp.read(length).decode("utf-8"))
+            return entries
+        if self.storage_format == "jsonl.gz":
+            wanted = {row: entry_id for entry_id, row, _, _ in locations}
+            last_row = max(wanted)
+            entries = {}
+            with gzip.open(path, "rt", encoding="utf-8") as fp:
+                row = 0
+                for line in fp:
+                    if not line.strip():
+                        continue
+                    if row in wanted:
+                        entries[wanted[row]] = json.loads(line)
+                    if row == last_row:
+                        break
+                    row += 1
+            return entries
+        if self.storage_format == "columnar":
+            with ColumnarChunkReader(path) as reader:
+                rows = reader.read_rows(row_ids=[row for _, row, _, _ in locations])
+            return {entry_id: entry for (entry_id, _, _, _), entry in zip(locations, rows)}
+        raise ValueError("unknown_storage_format")
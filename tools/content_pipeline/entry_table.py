@@ -0,0 +1,341 @@
+"""Column-wise in-memory table of content entries for million-row corpora."""
+
+from __future__ import annotations
+
+import copy
+import json
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from tools.content_pipeline.chunk_store import iter_dataset_entries, read_manifest
+
+try:
+    import numpy as np
+except ImportError:  # filters and groups fall back to plain loops with the same results
+    np = None
+
+# Layout: nested dicts are flattened to dotted columns as in the columnar chunk
+# format. A column is numeric (array "q" for ints, "d" for floats) while every
+# value it sees has that exact type; otherwise it is categorical: one list of
+# distinct values plus an array("I") of codes per row. Strings therefore exist
+# once per distinct value, so language/status/style and the source_trace fields
+# cost four bytes per row, and even unique strings (entry_id, clue_text) drop
+# the per-row dict and key overhead.
+
+_MISSING = object()
+_COLLECTIONS = (list, tuple, set, frozenset, range)
+
+
+def _value_key(value: Any) -> Any:
+    if value is _MISSING or isinstance(value, str):
+        return value
+    return (type(value).__name__, json.dumps(value, ensure_ascii=False, sort_keys=True))
+
+
+def _copy_value(value: Any) -> Any:
+    return copy.deepcopy(value) if isinstance(value, (list, dict)) else value
+
+
+class _Column:
+    def __init__(self, parent: Optional[str], field: str, first: Any, backfill: int) -> None:
+        self.parent = parent
+        self.field = field
+        self.values: List[Any] = []
+        self._codes_by_key: Dict[Any, int] = {}
+        if backfill == 0 and type(first) is int:
+            self.kind = "q"
+            self.data = array("q")
+        elif backfill == 0 and type(first) is float:
+            self.kind = "d"
+            self.data = array("d")
+        else:
+            self.kind = "cat"
+            self.data = array("I")
+            for _ in range(backfill):
+                self._append_code(_MISSING)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def _append_code(self, value: Any) -> None:
+        key = _value_key(value)
+        code = self._codes_by_key.get(key)
+        if code is None:
+            code = self._codes_by_key[key] = len(self.values)
+            self.values.append(sys.intern(value) if isinstance(value, str) else value)
+        self.data.append(code)
+
+    def _to_categorical(self) -> None:
+        numbers = self.data
+        self.kind = "cat"
+        self.data = array("I")
+        for number in numbers:
+            self._append_code(number)
+
+    def append(self, value: Any) -> None:
+        if self.kind == "cat":
+            self._append_code(value)
+            return
+        if (self.kind == "q" and type(value) is int) or (self.kind == "d" and type(value) is float):
+            try:
+                self.data.append(value)
+                return
+            except OverflowError:
+                pass
+        self._to_categorical()
+        self._append_code(value)
+
+    def get(self, row: int) -> Any:
+        if self.kind == "cat":
+            return _copy_value(self.values[self.data[row]])
+        return self.data[row]
+
+    def numpy_data(self) -> Any:
+        dtype = {"q": np.int64, "d": np.float64, "cat": np.uint32}[self.kind]
+        return np.frombuffer(self.data, dtype=dtype) if len(self.data) else np.zeros(0, dtype=dtype)
+
+    def matching_codes(self, wanted: Iterable[Any]) -> List[int]:
+        codes = (self._codes_by_key.get(_value_key(value)) for value in wanted)
+        return [code for code in codes if code is not None]
+
+    def matching_numbers(self, wanted: Iterable[Any]) -> List[Any]:
+        if self.kind == "q":
+            return [value for value in wanted if type(value) is int]
+        return [float(value) for value in wanted if type(value) in (int, float)]
+
+    def group_codes(self, rows: Optional[Sequence[int]]) -> Tuple[Any, List[Any]]:
+        # (per-row codes, value of each code); numeric values are ranked in sorted order
+        if self.kind == "cat":
+            values = [None if value is _MISSING else value for value in self.values]
+            if np is not None:
+                data = self.numpy_data()
+                return (data if rows is None else data[rows]).astype(np.int64), values
+            return (list(self.data) if rows is None else [self.data[row] for row in rows]), values
+        if np is not None:
+            data = self.numpy_data()
+            uniques, codes = np.unique(data if rows is None else data[rows], return_inverse=True)
+            return codes.astype(np.int64), uniques.tolist()
+        picked = list(self.data) if rows is None else [self.data[row] for row in rows]
+        uniques = sorted(set(picked))
+        ranks = {value: rank for rank, value in enumerate(uniques)}
+        return [ranks[value] for value in picked], uniques
+
+
+def _row_array(indices: Any) -> array:
+    result = array("q")
+    if np is not None and isinstance(indices, np.ndarray):
+        result.frombytes(indices.astype(np.int64).tobytes())
+    else:
+        result.extend(indices)
+    return result
+
+
+class EntryTable:
+    def __init__(self) -> None:
+        self._columns: Dict[str, _Column] = {}
+        self._by_path: Dict[Tuple[Optional[str], str], _Column] = {}
+        self._rows = 0
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Mapping[str, Any]]) -> "EntryTable":
+        table = cls()
+        table.extend(entries)
+        return table
+
+    @classmethod
+    def from_dataset(cls, dataset_dir: str, columns: Optional[Sequence[str]] = None) -> "EntryTable":
+        root = Path(dataset_dir)
+        return cls.from_entries(iter_dataset_entries(root, read_manifest(root), columns=columns))
+
+    def __len__(self) -> int:
+        return self._rows
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def _column(self, parent: Optional[str], field: str, value: Any) -> _Column:
+        name = field if parent is None else f"{parent}.{field}"
+        column = _Column(parent, field, value, self._rows)
+        self._columns[name] = column
+        self._by_path[(parent, field)] = column
+        return column
+
+    def append(self, entry: Mapping[str, Any]) -> None:
+        by_path = self._by_path
+        seen = 0
+        for key, value in entry.items():
+            if isinstance(value, dict) and value:
+                for field, field_value in value.items():
+                    column = by_path.get((key, field))
+                    if column is None:
+                        column = self._column(key, field, field_value)
+                    column.append(field_value)
+                    seen += 1
+            else:
+                column = by_path.get((None, key))
+                if column is None:
+                    column = self._column(None, key, value)
+                column.append(value)
+                seen += 1
+        self._rows += 1
+        if seen != len(self._columns):
+            for column in self._columns.values():
+                if len(column) < self._rows:
+                    column.append(_MISSING)
+
+    def extend(self, entries: Iterable[Mapping[str, Any]]) -> None:
+        for entry in entries:
+            self.append(entry)
+
+    def _get(self, name: str) -> _Column:
+        column = self._columns.get(name)
+        if column is None:
+            raise KeyError("unknown_column")
+        return column
+
+    def column(self, name: str) -> List[Any]:
+        column = self._get(name)
+        if column.kind != "cat":
+            return column.data.tolist()
+        values = [None if value is _MISSING else value for value in column.values]
+        if any(isinstance(value, (list, dict)) for value in values):
+            return [_copy_value(values[code]) for code in column.data]
+        return [values[code] for code in column.data]
+
+    def _build_row(self, index: int, columns: Iterable[_Column]) -> Dict:
+        entry: Dict[str, Any] = {}
+        for column in columns:
+            value = column.get(index)
+            if value is _MISSING:
+                continue
+            if column.parent is None:
+                entry[column.field] = value
+            else:
+                entry.setdefault(column.parent, {})[column.field] = value
+        return entry
+
+    def row(self, index: int) -> Dict:
+        if not 0 <= index < self._rows:
+            raise IndexError("row_out_of_range")
+        return self._build_row(index, self._columns.values())
+
+    def rows(self, indices: Optional[Iterable[int]] = None, columns: Optional[Sequence[str]] = None) -> Iterator[Dict]:
+        # columns projects like read_chunk: a nested field name keeps all of its sub-fields
+        picked = list(self._columns.values())
+        if columns is not None:
+            wanted = set(columns)
+            picked = [
+                column for column in picked
+                if column.parent in wanted or (column.parent is None and column.field in wanted)
+            ]
+        for index in range(self._rows) if indices is None else indices:
+            if not 0 <= index < self._rows:
+                raise IndexError("row_out_of_range")
+            yield self._build_row(index, picked)
+
+    def select(self, conditions: Mapping[str, Any]) -> array:
+        # {"language": "de", "difficulty": [1, 2]}: every condition must hold; a
+        # list/tuple/set/range means any of its values. Returns ascending row ids.
+        wanted = {
+            name: list(value) if isinstance(value, _COLLECTIONS) else [value]
+            for name, value in conditions.items()
+        }
+        if np is not None:
+            mask = np.ones(self._rows, dtype=bool)
+            for name, values in wanted.items():
+                column = self._get(name)
+                if column.kind == "cat":
+                    mask &= np.isin(column.numpy_data(), np.array(column.matching_codes(values), dtype=np.uint32))
+                else:
+                    data = column.numpy_data()
+                    mask &= np.isin(data, np.array(column.matching_numbers(values), dtype=data.dtype))
+            return _row_array(np.flatnonzero(mask))
+
+        selected: Optional[List[int]] = None
+        for name, values in wanted.items():
+            column = self._get(name)
+            if column.kind == "cat":
+                codes = set(column.matching_codes(values))
+            else:
+                codes = set(column.matching_numbers(values))
+            data = column.data
+            candidates = range(self._rows) if selected is None else selected
+            selected = [row for row in candidates if data[row] in codes]
+        return _row_array(range(self._rows) if selected is None else selected)
+
+    def _group_keys(self, names: Sequence[str], rows: Optional[Sequence[int]]) -> Tuple[Any, List[List[Any]], List[int]]:
+        # one combined integer key per row (mixed radix over the per-column codes)
+        parts = [self._get(name).group_codes(rows) for name in names]
+        radices = [max(len(values), 1) for _, values in parts]
+        keys: Any = None
+        for (codes, _), radix in zip(parts, radices):
+            if np is not None:
+                keys = codes if keys is None else keys * radix + codes
+            else:
+                keys = list(codes) if keys is None else [key * radix + code for key, code in zip(keys, codes)]
+        return keys, [values for _, values in parts], radices
+
+    @staticmethod
+    def _decode_key(key: int, values: List[List[Any]], radices: List[int]) -> Tuple:
+        decoded = []
+        for column_values, radix in zip(reversed(values), reversed(radices)):
+            key, code = divmod(key, radix)
+            decoded.append(column_values[code])
+        return tuple(reversed(decoded))
+
+    def group_counts(self, names: Sequence[str], rows: Optional[Sequence[int]] = None) -> Dict[Tuple, int]:
+        if not names:
+            raise ValueError("group_columns_required")
+        if rows is not None and np is not None:
+            rows = np.asarray(rows, dtype=np.int64)
+        keys, values, radices = self._group_keys(names, rows)
+        if np is not None:
+            uniques, counts = np.unique(keys, return_counts=True)
+            pairs = zip(uniques.tolist(), counts.tolist())
+        else:
+            totals: Dict[int, int] = {}
+            for key in keys:
+                totals[key] = totals.get(key, 0) + 1
+            pairs = sorted(totals.items())
+        return {self._decode_key(key, values, radices): count for key, count in pairs}
+
+    def group_indices(self, names: Sequence[str], rows: Optional[Sequence[int]] = None) -> Dict[Tuple, array]:
+        # groups come out ordered by their codes; row ids keep their order within a group
+        if not names:
+            raise ValueError("group_columns_required")
+        if np is not None:
+            row_ids = np.arange(self._rows, dtype=np.int64) if rows is None else np.asarray(rows, dtype=np.int64)
+            keys, values, radices = self._group_keys(names, None if rows is None else row_ids)
+            order = np.argsort(keys, kind="stable")
+            sorted_keys = keys[order]
+            starts = np.concatenate([[0], np.flatnonzero(np.diff(sorted_keys)) + 1]) if len(order) else []
+            groups: Dict[Tuple, array] = {}
+            for position, start in enumerate(starts):
+                stop = starts[position + 1] if position + 1 < len(starts) else len(order)
+                key = self._decode_key(int(sorted_keys[start]), values, radices)
+                groups[key] = _row_array(row_ids[order[start:stop]])
+            return groups
+
+        row_ids = list(range(self._rows)) if rows is None else list(rows)
+        keys, values, radices = self._group_keys(names, None if rows is None else row_ids)
+        buckets: Dict[int, array] = {}
+        for row, key in zip(row_ids, keys):
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = array("q")
+            bucket.append(row)
+        return {
+            self._decode_key(key, values, radices): bucket
+            for key, bucket in sorted(buckets.items())
+        }
+
+    def nbytes(self) -> int:
+        # rough footprint: column buffers plus the distinct values they point to
+        total = 0
+        for column in self._columns.values():
+            total += column.data.buffer_info()[1] * column.data.itemsize
+            total += sys.getsizeof(column.values) + sum(sys.getsizeof(value) for value in column.values)
+        return total
@@ -0,0 +1,158 @@
+"""Compile approved content into prebuilt per-language/size game dataset artifacts."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+from tools.content_pipeline.chunk_store import iter_dataset_entries, read_manifest, write_atomic
+from tools.content_pipeline.entry_table import EntryTable
+from tools.content_pipeline.word_square import add_grid_pools
+
+ARTIFACT_FORMAT_VERSION = 1
+GAME_SIZES = (5, 7, 9)
+# same ordering as profileRank in lib/game.ts: a profile may use its own and lower ranks
+PROFILE_RANK = {"kid": 0, "family": 1, "standard": 2}
+# the game rates difficulty 1-3, the pipeline 1-5
+GAME_DIFFICULTY = {1: 1, 2: 1, 3: 2, 4: 2, 5: 3}
+ARTIFACT_COLUMNS = ("language", "word", "clue_text", "difficulty", "status", "content_profile", "safety_flags", "auto_qa")
+
+_NON_LETTERS = re.compile(r"[^A-Z]")
+
+
+def normalize_game_word(word: str) -> str:
+    # mirrors normalizeWord in lib/game.ts, minus the pad/truncate to board size
+    return _NON_LETTERS.sub("", word.upper())
+
+
+def entry_profile(entry: Mapping[str, Any]) -> str:
+    # An explicit content_profile wins. Without one, entries carrying safety flags
+    # are standard-only and everything else is family; kid is never inferred.
+    profile = entry.get("content_profile")
+    if profile is not None:
+        if profile not in PROFILE_RANK:
+            raise ValueError("unknown_content_profile")
+        return profile
+    safety_flags = entry.get("safety_flags")
+    if safety_flags is None:
+        safety_flags = entry.get("auto_qa", {}).get("policy", [])
+    return "standard" if safety_flags else "family"
+
+
+def build_game_artifacts(
+    entries: Iterable[Mapping[str, Any]],
+    sizes: Sequence[int] = GAME_SIZES,
+) -> Dict[Tuple[str, int], Dict]:
+    # Only approved entries whose normalized word fits a board size exactly are
+    # kept; the first entry wins for duplicate words, as in buildSizeDataset.
+    buckets: Dict[Tuple[str, int], Dict] = {}
+    for entry in entries:
+        if entry.get("status") != "approved":
+            continue
+        word = normalize_game_word(entry["word"])
+        if len(word) not in sizes:
+            continue
+        key = (entry["language"], len(word))
+        bucket = buckets.setdefault(key, {"seen": set(), "words": [], "clues": [], "difficulty": [], "profiles": []})
+        if word in bucket["seen"]:
+            continue
+        bucket["seen"].add(word)
+        bucket["words"].append(word)
+        bucket["clues"].append(entry["clue_text"])
+        bucket["difficulty"].append(GAME_DIFFICULTY.get(entry["difficulty"], 3))
+        bucket["profiles"].append(PROFILE_RANK[entry_profile(entry)])
+
+    artifacts: Dict[Tuple[str, int], Dict] = {}
+    for (language, size), bucket in sorted(buckets.items()):
+        ranks = bucket["profiles"]
+        artifacts[(language, size)] = {
+            "format_version": ARTIFACT_FORMAT_VERSION,
+            "language": language,
+            "size": size,
+            "words": bucket["words"],
+            "clues": bucket["clues"],
+            "difficulty": bucket["difficulty"],
+            # the game picks straight from profiles[profile]; no filtering at startup
+            "profiles": {
+                profile: [i for i, entry_rank in enumerate(ranks) if entry_rank <= rank]
+                for profile, rank in PROFILE_RANK.items()
+            },
+        }
+    return artifacts
+
+
+def artifact_filename(language: str, size: int) -> str:
+    return f"{language}_{size}.json"
+
+
+def write_game_artifacts(
+    entries: Iterable[Mapping[str, Any]],
+    output_dir: str,
+    sizes: Sequence[int] = GAME_SIZES,
+    grid_pool_size: int = 0,
+) -> Dict:
+    # grid_pool_size > 0 also stores solved word squares per profile (see word_square)
+    base = Path(output_dir)
+    base.mkdir(parents=True, exist_ok=True)
+    manifest: Dict[str, Any] = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "artifacts": [],
+    }
+    for (language, size), artifact in build_game_artifacts(entries, sizes).items():
+        if grid_pool_size:
+            add_grid_pools(artifact, grid_pool_size)
+        payload = json.dumps(artifact, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        file_name = artifact_filename(language, size)
+        write_atomic(base / file_name, payload)
+        record = {
+            "file": file_name,
+            "language": language,
+            "size": size,
+            "entries": len(artifact["words"]),
+            "profiles": {profile: len(indices) for profile, indices in artifact["profiles"].items()},
+            "sha256": hashlib.sha256(payload).hexdigest(),
+        }
+        if "grids" in artifact:
+            record["grids"] = {profile: len(grids) for profile, grids in artifact["grids"].items()}
+        manifest["artifacts"].append(record)
+
+    manifest_payload = json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8")
+    write_atomic(base / "game_manifest.json", manifest_payload)
+    return manifest
+
+
+def compile_dataset(
+    dataset_dir: str,
+    output_dir: str,
+    sizes: Optional[Sequence[int]] = None,
+    grid_pool_size: int = 0,
+) -> Dict:
+    root = Path(dataset_dir)
+    entries = iter_dataset_entries(root, read_manifest(root), columns=ARTIFACT_COLUMNS)
+    return write_game_artifacts(entries, output_dir, sizes or GAME_SIZES, grid_pool_size)
+
+
+def compile_table(
+    table: EntryTable,
+    output_dir: str,
+    sizes: Optional[Sequence[int]] = None,
+    grid_pool_size: int = 0,
+) -> Dict:
+    # only approved rows are turned back into dicts, and only their artifact columns
+    if not len(table):
+        return write_game_artifacts([], output_dir, sizes or GAME_SIZES, grid_pool_size)
+    rows = table.select({"status": "approved"})
+    entries = table.rows(rows, columns=ARTIFACT_COLUMNS)
+    return write_game_artifacts(entries, output_dir, sizes or GAME_SIZES, grid_pool_size)
+
+
+def load_game_artifact(path: str) -> Dict:
+    artifact = json.loads(Path(path).read_text(encoding="utf-8"))
+    if artifact.get("format_version") != ARTIFACT_FORMAT_VERSION:
+        raise ValueError("unsupported_artifact_version")
+    return artifact
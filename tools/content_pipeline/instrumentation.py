@@ -0,0 +1,67 @@
+"""Opt-in timing and counter instrumentation for QA checks and pipeline stages."""
+
+from __future__ import annotations
+
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+
+# Callers pass a Metrics object explicitly and skip all bookkeeping when it is
+# None, so a disabled run pays one `is None` check per batch, not per entry.
+class Metrics:
+    def __init__(self) -> None:
+        self._seconds: Dict[str, float] = {}
+        self._calls: Dict[str, int] = {}
+        self._hits: Dict[str, int] = {}
+
+    def record(self, name: str, seconds: float = 0.0, calls: int = 1, hits: Optional[int] = None) -> None:
+        self._seconds[name] = self._seconds.get(name, 0.0) + seconds
+        self._calls[name] = self._calls.get(name, 0) + calls
+        if hits is not None:
+            self._hits[name] = self._hits.get(name, 0) + hits
+
+    @contextmanager
+    def timed(self, name: str, calls: int = 1) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started, calls)
+
+    def merge(self, snapshot: Dict[str, Dict]) -> None:
+        for name, values in snapshot.items():
+            self.record(name, values["seconds"], values["calls"], values.get("hits"))
+
+    def snapshot(self) -> Dict[str, Dict]:
+        result: Dict[str, Dict] = {}
+        for name in sorted(self._calls):
+            entry = {"seconds": round(self._seconds[name], 6), "calls": self._calls[name]}
+            if name in self._hits:
+                entry["hits"] = self._hits[name]
+                entry["hit_rate"] = round(self._hits[name] / self._calls[name], 6) if self._calls[name] else 0.0
+            result[name] = entry
+        return result
+
+    def write_prometheus(self, path: str, prefix: str = "content_pipeline") -> None:
+        lines = [
+            f"# TYPE {prefix}_seconds_total counter",
+            f"# TYPE {prefix}_calls_total counter",
+            f"# TYPE {prefix}_hits_total counter",
+        ]
+        for name, values in self.snapshot().items():
+            label = f'{{name="{name}"}}'
+            lines.append(f"{prefix}_seconds_total{label} {values['seconds']}")
+            lines.append(f"{prefix}_calls_total{label} {values['calls']}")
+            if "hits" in values:
+                lines.append(f"{prefix}_hits_total{label} {values['hits']}")
+        Path(path).write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    def append_jsonl(self, path: str, run: str = "") -> None:
+        recorded_at = datetime.now(timezone.utc).isoformat()
+        with Path(path).open("a", encoding="utf-8") as fp:
+            for name, values in self.snapshot().items():
+                fp.write(json.dumps({"recorded_at": recorded_at, "run": run, "name": name, **values}) + "\n")
@@ -0,0 +1,128 @@
+"""Corpus-wide answer-leak scan over all clues of a language."""
+
+from __future__ import annotations
+
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Tuple
+
+from tools.content_pipeline.auto_qa import normalize
+from tools.content_pipeline.chunk_store import iter_dataset_entries, read_manifest
+
+# same stem rule as auto_qa._leak_flags: words of 5+ chars leak through 4 chars
+STEM_LENGTH = 4
+# shorter answers ("eau", "rue") would match inside too many unrelated clue words
+MIN_CROSS_LEAK_LENGTH = 4
+SCAN_COLUMNS = ("entry_id", "language", "word", "lemma", "clue_text")
+
+
+class AhoCorasick:
+    # Multi-pattern automaton: one pass over a text reports every occurrence of
+    # every added term, so scanning N clues against M words costs O(total clue
+    # length + matches) instead of O(N * M) substring tests.
+    def __init__(self) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, Any]]] = [[]]
+        self._built = False
+
+    def add(self, term: str, payload: Any) -> None:
+        if self._built:
+            raise ValueError("automaton_already_built")
+        if not term:
+            return
+        node = 0
+        for char in term:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(term), payload))
+
+    def build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                # outputs of the longest proper suffix are reported here too
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+        self._built = True
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        # yields (start, length, payload) for every occurrence
+        if not self._built:
+            self.build()
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length, payload in out[node]:
+                yield position - length + 1, length, payload
+
+
+def _is_word_start(text: str, start: int) -> bool:
+    return start == 0 or not text[start - 1].isalnum()
+
+
+def scan_language_leaks(entries: Iterable[Mapping[str, Any]]) -> Dict[str, Dict[str, List[str]]]:
+    # Self leaks follow auto_qa (word, then 4-char stem) plus the lemma, which
+    # catches inflected forms. Cross leaks report other entries whose word or
+    # lemma starts a word of this clue ("houses" leaks "house").
+    rows = list(entries)
+    automaton = AhoCorasick()
+    for position, entry in enumerate(rows):
+        word = normalize(entry["word"])
+        lemma = normalize(entry.get("lemma") or entry["word"])
+        for term in {word, lemma}:
+            if len(term) >= MIN_CROSS_LEAK_LENGTH:
+                automaton.add(term, position)
+    automaton.build()
+
+    results: Dict[str, Dict[str, List[str]]] = {}
+    for position, entry in enumerate(rows):
+        clue = normalize(entry["clue_text"])
+        word = normalize(entry["word"])
+        lemma = normalize(entry.get("lemma") or entry["word"])
+
+        self_flags: List[str] = []
+        if word in clue:
+            self_flags.append("word_leak")
+        elif len(word) >= STEM_LENGTH + 1 and word[:STEM_LENGTH] in clue:
+            self_flags.append("stem_leak")
+        if lemma != word and lemma in clue:
+            self_flags.append("lemma_leak")
+
+        cross: Dict[str, None] = {}
+        for start, _, other in automaton.iter_matches(clue):
+            if other != position and _is_word_start(clue, start):
+                cross[rows[other]["entry_id"]] = None
+        results[entry["entry_id"]] = {"self": self_flags, "cross": sorted(cross)}
+    return results
+
+
+def scan_leaks(entries: Iterable[Mapping[str, Any]]) -> Dict[str, Dict[str, List[str]]]:
+    by_language: Dict[str, List[Mapping[str, Any]]] = {}
+    for entry in entries:
+        by_language.setdefault(entry["language"], []).append(entry)
+    results: Dict[str, Dict[str, List[str]]] = {}
+    for language in sorted(by_language):
+        results.update(scan_language_leaks(by_language[language]))
+    return results
+
+
+def scan_dataset_leaks(dataset_dir: str) -> Dict[str, Dict[str, List[str]]]:
+    root = Path(dataset_dir)
+    return scan_leaks(iter_dataset_entries(root, read_manifest(root), columns=SCAN_COLUMNS))
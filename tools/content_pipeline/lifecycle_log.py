@@ -0,0 +1,173 @@
+"""Append-only lifecycle log of entry status transitions with snapshot compaction."""
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from tools.content_pipeline.chunk_store import write_atomic
+from tools.content_pipeline.phase1_model import TRANSITIONS, Status
+from tools.content_pipeline.reviewer_queue import ReviewDecision, resolve_decision
+
+LOG_FILE = "lifecycle_log.jsonl"
+SNAPSHOT_FILE = "lifecycle_snapshot.json"
+DEFAULT_SNAPSHOT_EVERY = 100_000
+
+# the Status table flattened to value pairs, checked once per event
+_ALLOWED = frozenset((current.value, new.value) for current, targets in TRANSITIONS.items() for new in targets)
+_STATUSES = frozenset(status.value for status in Status)
+
+
+# (entry_id, new status, action, reason_code, note)
+Transition = Tuple[str, str, str, Optional[str], str]
+
+
+# The log is never rewritten: every registration, transition and decision stays
+# on disk as one JSON line. The snapshot only caches the statuses up to a byte
+# offset of the log, so loading reads the snapshot plus the tail after it.
+# A decision that keeps the current status (e.g. escalating an already reviewed
+# entry) is logged for the audit trail but is not a state-machine transition.
+class LifecycleLog:
+    def __init__(self, directory: str, snapshot_every: int = DEFAULT_SNAPSHOT_EVERY) -> None:
+        self._dir = Path(directory)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._log_path = self._dir / LOG_FILE
+        self.snapshot_every = snapshot_every
+        self._statuses: Dict[str, str] = {}
+        self._sequence = 0
+        self._offset = 0
+        self._since_snapshot = 0
+        self._load()
+
+    def _load(self) -> None:
+        snapshot_path = self._dir / SNAPSHOT_FILE
+        if snapshot_path.exists():
+            snapshot = json.loads(snapshot_path.read_text(encoding="utf-8"))
+            self._statuses = snapshot["statuses"]
+            self._sequence = snapshot["sequence"]
+            self._offset = snapshot["log_offset"]
+        if not self._log_path.exists():
+            return
+        with self._log_path.open("rb") as fp:
+            fp.seek(self._offset)
+            for line in fp:
+                if not line.endswith(b"\n"):
+                    break  # torn write of an interrupted append
+                event = json.loads(line)
+                self._statuses[event["entry_id"]] = event["to"]
+                self._sequence = event["seq"]
+                self._offset += len(line)
+                self._since_snapshot += 1
+        if self._log_path.stat().st_size > self._offset:
+            with self._log_path.open("r+b") as fp:
+                fp.truncate(self._offset)
+
+    def __len__(self) -> int:
+        return len(self._statuses)
+
+    def status(self, entry_id: str) -> Optional[Status]:
+        value = self._statuses.get(entry_id)
+        return Status(value) if value is not None else None
+
+    def statuses(self) -> Dict[str, str]:
+        return dict(self._statuses)
+
+    def _append(self, events: List[Dict]) -> None:
+        payload = b"".join(json.dumps(event, ensure_ascii=False).encode("utf-8") + b"\n" for event in events)
+        with self._log_path.open("ab") as fp:
+            fp.write(payload)
+            fp.flush()
+            os.fsync(fp.fileno())
+        self._offset += len(payload)
+        for event in events:
+            self._statuses[event["entry_id"]] = event["to"]
+        self._sequence = events[-1]["seq"]
+        self._since_snapshot += len(events)
+        if self._since_snapshot >= self.snapshot_every:
+            self.compact()
+
+    def _event(self, entry_id: str, before: Optional[str], after: str, action: str, **fields: object) -> Dict:
+        self._sequence += 1
+        return {
+            "seq": self._sequence,
+            "at": datetime.now(timezone.utc).isoformat(),
+            "entry_id": entry_id,
+            "from": before,
+            "to": after,
+            "action": action,
+            **fields,
+        }
+
+    def register(self, entries: Iterable[Tuple[str, str]], actor: str = "") -> int:
+        # (entry_id, initial status) for entries the log has not seen yet
+        start = self._sequence
+        pending: Dict[str, str] = {}
+        for entry_id, status in entries:
+            if status not in _STATUSES:
+                self._sequence = start
+                raise ValueError("unknown_status")
+            if entry_id in self._statuses or entry_id in pending:
+                self._sequence = start
+                raise ValueError("entry_already_registered")
+            pending[entry_id] = status
+        events = [self._event(entry_id, None, status, "register", actor=actor) for entry_id, status in pending.items()]
+        if events:
+            self._append(events)
+        return len(events)
+
+    def apply_transitions(self, transitions: Iterable[Transition], actor: str = "") -> int:
+        # All or nothing: the whole batch is checked (later items see the statuses
+        # set by earlier ones) before a single line is written.
+        start = self._sequence
+        current: Dict[str, str] = {}
+        events: List[Dict] = []
+        try:
+            for entry_id, new_status, action, reason_code, note in transitions:
+                before = current.get(entry_id, self._statuses.get(entry_id))
+                if before is None:
+                    raise ValueError("unknown_entry_id")
+                if before != new_status and (before, new_status) not in _ALLOWED:
+                    raise ValueError("invalid_transition")
+                current[entry_id] = new_status
+                events.append(self._event(
+                    entry_id, before, new_status, action, reason_code=reason_code, note=note, actor=actor
+                ))
+        except BaseException:
+            # also covers errors raised by a lazy `transitions` iterable itself
+            self._sequence = start
+            raise
+        if events:
+            self._append(events)
+        return len(events)
+
+    def apply_decisions(self, decisions: Sequence[Tuple[str, ReviewDecision]], actor: str = "") -> int:
+        return self.apply_transitions(
+            (
+                (entry_id, resolve_decision(decision), decision.action, decision.reason_code, decision.note)
+                for entry_id, decision in decisions
+            ),
+            actor,
+        )
+
+    def compact(self) -> None:
+        snapshot = {
+            "sequence": self._sequence,
+            "log_offset": self._offset,
+            "written_at": datetime.now(timezone.utc).isoformat(),
+            "statuses": self._statuses,
+        }
+        write_atomic(self._dir / SNAPSHOT_FILE, json.dumps(snapshot, ensure_ascii=False).encode("utf-8"))
+        self._since_snapshot = 0
+
+    def history(self, entry_id: Optional[str] = None) -> Iterator[Dict]:
+        # full audit trail, oldest first; this one does read the whole log
+        if not self._log_path.exists():
+            return
+        with self._log_path.open("rb") as fp:
+            for line in fp:
+                event = json.loads(line)
+                if entry_id is None or event["entry_id"] == entry_id:
+                    yield event
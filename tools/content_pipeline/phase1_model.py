@@ -4,11 +4,24 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict, List
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Union
 
 
 ALLOWED_LANGUAGES = {"de", "en", "fr", "es"}
 ALLOWED_CLUE_STYLES = {"neutral", "funny", "trivia", "wordplay"}
+REQUIRED_QUALITY_SCORES = ("ambiguity", "readability", "similarity", "predicted_solve_rate")
+_MISSING_SCORE_ISSUES = tuple((key, f"missing_quality_score:{key}") for key in REQUIRED_QUALITY_SCORES)
+# bump when _collect_issues changes, so stored validation results are redone
+VALIDATION_VERSION = 2
+
+
+def validation_rules() -> Dict[str, Any]:
+    return {
+        "version": VALIDATION_VERSION,
+        "languages": sorted(ALLOWED_LANGUAGES),
+        "clue_styles": sorted(ALLOWED_CLUE_STYLES),
+        "quality_scores": list(REQUIRED_QUALITY_SCORES),
+    }
 
 
 class Status(str, Enum):
@@ -18,7 +31,9 @@ class Status(str, Enum):
     DEPRECATED = "deprecated"
 
 
-@dataclass
+# Slotted: no per-instance __dict__, which matters once a chunk holds millions of
+# entries. Traces are frozen because provenance never changes after import.
+@dataclass(frozen=True, slots=True)
 class SourceTrace:
     source_name: str
     source_url: str
@@ -26,8 +41,18 @@ class SourceTrace:
     imported_at: str
     reviewer: str
 
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "SourceTrace":
+        return cls(
+            data["source_name"],
+            data["source_url"],
+            data["license_id"],
+            data["imported_at"],
+            data["reviewer"],
+        )
+
 
-@dataclass
+@dataclass(slots=True)
 class ContentEntry:
     entry_id: str
     language: str
@@ -44,40 +69,145 @@ class ContentEntry:
     status: Status
     version: int
 
-
-def validate_entry(entry: ContentEntry) -> List[str]:
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "ContentEntry":
+        # Chunk rows from pilot_generation carry no lemma/pos/confidence/safety
+        # fields yet; fall back to the word itself and the policy QA flags.
+        word = data["word"]
+        safety_flags = data.get("safety_flags")
+        if safety_flags is None:
+            safety_flags = list(data.get("auto_qa", {}).get("policy", []))
+        return cls(
+            data["entry_id"],
+            data["language"],
+            word,
+            data.get("lemma", word),
+            data.get("pos", ""),
+            data["difficulty"],
+            data.get("difficulty_confidence", 0.0),
+            data["clue_text"],
+            data["clue_style"],
+            safety_flags,
+            data["quality_scores"],
+            SourceTrace.from_dict(data["source_trace"]),
+            Status(data["status"]),
+            data["version"],
+        )
+
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _collect_issues(
+    entry_id: str,
+    language: str,
+    word: str,
+    difficulty: int,
+    difficulty_confidence: float,
+    clue_text: str,
+    clue_style: str,
+    quality_scores: Mapping[str, float],
+    version: int,
+) -> List[str]:
+    # raw chunk rows may hold anything, so types are checked before values
     issues: List[str] = []
 
-    if entry.language not in ALLOWED_LANGUAGES:
+    if not isinstance(language, str) or language not in ALLOWED_LANGUAGES:
         issues.append("language_not_supported")
 
-    if not 1 <= entry.difficulty <= 5:
+    if not _is_int(difficulty):
+        issues.append("invalid_difficulty")
+    elif not 1 <= difficulty <= 5:
         issues.append("difficulty_out_of_range")
 
-    if not 0.0 <= entry.difficulty_confidence <= 1.0:
+    if not _is_number(difficulty_confidence):
+        issues.append("invalid_difficulty_confidence")
+    elif not 0.0 <= difficulty_confidence <= 1.0:
         issues.append("difficulty_confidence_out_of_range")
 
-    if entry.clue_style not in ALLOWED_CLUE_STYLES:
+    if not isinstance(clue_style, str) or clue_style not in ALLOWED_CLUE_STYLES:
         issues.append("invalid_clue_style")
 
-    for key in ["ambiguity", "readability", "similarity", "predicted_solve_rate"]:
-        if key not in entry.quality_scores:
-            issues.append(f"missing_quality_score:{key}")
+    if not isinstance(quality_scores, Mapping):
+        issues.append("invalid_quality_scores")
+    else:
+        for key, issue in _MISSING_SCORE_ISSUES:
+            if key not in quality_scores:
+                issues.append(issue)
 
-    if entry.version < 1:
+    if not _is_int(version) or version < 1:
         issues.append("invalid_version")
 
-    if not entry.entry_id.strip() or not entry.word.strip() or not entry.clue_text.strip():
+    for field, value in (("entry_id", entry_id), ("word", word), ("clue_text", clue_text)):
+        if not isinstance(value, str):
+            issues.append(f"invalid_{field}")
+    if any(isinstance(value, str) and not value.strip() for value in (entry_id, word, clue_text)):
         issues.append("required_field_missing")
 
     return issues
 
 
+def validate_entry(entry: ContentEntry) -> List[str]:
+    return _collect_issues(
+        entry.entry_id,
+        entry.language,
+        entry.word,
+        entry.difficulty,
+        entry.difficulty_confidence,
+        entry.clue_text,
+        entry.clue_style,
+        entry.quality_scores,
+        entry.version,
+    )
+
+
+def validate_entries(entries: Iterable[Union[ContentEntry, Mapping[str, Any]]]) -> Dict[str, List[str]]:
+    # One pass over a whole chunk, straight from chunk rows (no ContentEntry needed).
+    # Only entries with issues are returned, keyed by entry_id.
+    problems: Dict[str, List[str]] = {}
+    seen = set()
+    for entry in entries:
+        if isinstance(entry, ContentEntry):
+            entry_id = entry.entry_id
+            issues = validate_entry(entry)
+        else:
+            get = entry.get
+            entry_id = get("entry_id") or ""
+            # missing fields get values that fail their own check
+            issues = _collect_issues(
+                entry_id,
+                get("language"),
+                get("word") or "",
+                get("difficulty", 0),
+                get("difficulty_confidence", 0.0),
+                get("clue_text") or "",
+                get("clue_style"),
+                get("quality_scores") or {},
+                get("version", 0),
+            )
+        if not isinstance(entry_id, str):
+            # reported as invalid_entry_id; keyed by its repr so results stay JSON-safe
+            entry_id = repr(entry_id)
+        if entry_id in seen:
+            issues.append("duplicate_entry_id")
+        seen.add(entry_id)
+        if issues:
+            problems.setdefault(entry_id, []).extend(issues)
+    return problems
+
+
+TRANSITIONS: Dict[Status, FrozenSet[Status]] = {
+    Status.DRAFT: frozenset({Status.REVIEWED, Status.DEPRECATED}),
+    Status.REVIEWED: frozenset({Status.APPROVED, Status.DRAFT, Status.DEPRECATED}),
+    Status.APPROVED: frozenset({Status.DEPRECATED}),
+    Status.DEPRECATED: frozenset(),
+}
+
+
 def can_transition(current: Status, new: Status) -> bool:
-    allowed = {
-        Status.DRAFT: {Status.REVIEWED, Status.DEPRECATED},
-        Status.REVIEWED: {Status.APPROVED, Status.DRAFT, Status.DEPRECATED},
-        Status.APPROVED: {Status.DEPRECATED},
-        Status.DEPRECATED: set(),
-    }
-    return new in allowed[current]
+    return new in TRANSITIONS[current]
@@ -2,16 +2,36 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
+import struct
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 from pathlib import Path
-from random import Random
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-from tools.content_pipeline.auto_qa import run_auto_qa
+from tools.content_pipeline.auto_qa import normalize, rule_fingerprints, run_auto_qa_batch
+from tools.content_pipeline.chunk_store import (
+    STORAGE_FORMATS,
+    chunk_filename,
+    encode_chunk,
+    manifest_storage_format,
+    read_manifest,
+    write_atomic,
+)
+from tools.content_pipeline.entry_index import ENTRY_INDEX_FILE, build_entry_index
+from tools.content_pipeline.instrumentation import Metrics
+from tools.content_pipeline.qa_cache import QACache
+from tools.content_pipeline.similarity_index import SimilarityIndex, similarity_settings
 
 LANGUAGES = ("de", "en", "fr", "es")
 
+# bump whenever generated content changes, so resumed runs rebuild old chunks
+GENERATOR_VERSION = 2
+BUILD_JOURNAL = "build_journal.jsonl"
+
 WORD_STEMS: Dict[str, List[str]] = {
     "de": ["haus", "baum", "wasser", "schule", "garten", "fenster", "straße", "blume"],
     "en": ["house", "tree", "water", "school", "garden", "window", "street", "flower"],
@@ -55,88 +75,583 @@ def _build_clue(language: str, word: str, idx: int) -> str:
     return template.format(word=word_hint)
 
 
-def generate_language_entries(language: str, count: int, seed: int = 42) -> List[Dict]:
-    rng = Random(seed)
-    entries: List[Dict] = []
+_ENTRY_DRAWS = struct.Struct("<4Q")
+_UNIT = 1.0 / (1 << 53)
+
+
+def _entry_draws(seed: int, language: str, i: int) -> Tuple[float, ...]:
+    # Counter-based: entry i's uniforms in [0, 1) come from a hash of
+    # (seed, language, i), so any entry can be rebuilt without the ones before it.
+    digest = hashlib.blake2b(f"{seed}:{language}:{i}".encode("utf-8"), digest_size=_ENTRY_DRAWS.size).digest()
+    return tuple((value >> 11) * _UNIT for value in _ENTRY_DRAWS.unpack(digest))
+
+
+def _uniform(low: float, high: float, draw: float) -> float:
+    return low + (high - low) * draw
+
+
+def _build_entry(language: str, i: int, seed: int) -> Dict:
+    word = _build_word(language, i)
+    ambiguity, readability, similarity, solve_rate = _entry_draws(seed, language, i)
+    return {
+        "entry_id": f"{language}-{i:06d}",
+        "language": language,
+        "word": word,
+        "difficulty": 1 + (i % 5),
+        "clue_text": _build_clue(language, word, i),
+        "clue_style": "neutral" if i % 3 else "funny",
+        "status": "draft",
+        "quality_scores": {
+            "ambiguity": round(_uniform(0.03, 0.35, ambiguity), 3),
+            "readability": round(_uniform(0.7, 0.97, readability), 3),
+            "similarity": round(_uniform(0.02, 0.25, similarity), 3),
+            "predicted_solve_rate": round(_uniform(0.4, 0.9, solve_rate), 3),
+        },
+        # placeholder keeps the key order stable; filled by run_auto_qa_batch
+        "auto_qa": {},
+        "source_trace": {
+            "source_name": "phase2-pilot-generator",
+            "source_url": "internal://pilot_generation",
+            "license_id": "internal",
+            "imported_at": datetime.now(timezone.utc).isoformat(),
+            "reviewer": "pending",
+        },
+        "version": 1,
+    }
+
+
+def generate_entry(language: str, index: int, seed: int = 42) -> Dict:
+    # the entry exactly as a run with this seed generates it, minus auto_qa
+    return _build_entry(language, index, seed)
+
 
+def iter_language_entries(language: str, count: int, seed: int = 42) -> Iterator[Dict]:
     for i in range(count):
-        word = _build_word(language, i)
-        clue = _build_clue(language, word, i)
-        difficulty = 1 + (i % 5)
-
-        qa = run_auto_qa(
-            word=word,
-            clue_text=clue,
-            language=language,
-            difficulty=difficulty,
-            existing_clues=[e["clue_text"] for e in entries[-20:]],
-        )
+        yield _build_entry(language, i, seed)
 
-        entries.append(
-            {
-                "entry_id": f"{language}-{i:06d}",
-                "language": language,
-                "word": word,
-                "difficulty": difficulty,
-                "clue_text": clue,
-                "clue_style": "neutral" if i % 3 else "funny",
-                "status": "draft",
-                "quality_scores": {
-                    "ambiguity": round(rng.uniform(0.03, 0.35), 3),
-                    "readability": round(rng.uniform(0.7, 0.97), 3),
-                    "similarity": round(rng.uniform(0.02, 0.25), 3),
-                    "predicted_solve_rate": round(rng.uniform(0.4, 0.9), 3),
-                },
-                "auto_qa": qa,
-                "source_trace": {
-                    "source_name": "phase2-pilot-generator",
-                    "source_url": "internal://pilot_generation",
-                    "license_id": "internal",
-                    "imported_at": datetime.now(timezone.utc).isoformat(),
-                    "reviewer": "pending",
-                },
-                "version": 1,
-            }
-        )
 
+def iter_qa_chunks(
+    entries: Iterable[Dict],
+    chunk_size: int,
+    similarity_index: SimilarityIndex,
+) -> Iterator[List[Dict]]:
+    # Streaming counterpart of chunk_entries: only one chunk is held at a time and
+    # it is QA-checked right before it is handed out.
+    if chunk_size < 1:
+        raise ValueError("chunk_size_must_be_positive")
+
+    chunk: List[Dict] = []
+    for entry in entries:
+        chunk.append(entry)
+        if len(chunk) == chunk_size:
+            yield _apply_qa(chunk, similarity_index)
+            chunk = []
+    if chunk:
+        yield _apply_qa(chunk, similarity_index)
+
+
+def _apply_qa(
+    entries: List[Dict],
+    similarity_index: SimilarityIndex,
+    metrics: Optional[Metrics] = None,
+    cache: Optional[QACache] = None,
+) -> List[Dict]:
+    qa_results = run_auto_qa_batch(entries, similarity_index=similarity_index, metrics=metrics, cache=cache)
+    for entry, qa in zip(entries, qa_results):
+        entry["auto_qa"] = qa
     return entries
 
 
+def generate_language_entries(
+    language: str,
+    count: int,
+    seed: int = 42,
+    similarity_index: Optional[SimilarityIndex] = None,
+) -> List[Dict]:
+    # pass a loaded index to check new clues against an existing corpus too
+    index = similarity_index if similarity_index is not None else SimilarityIndex()
+    return _apply_qa(list(iter_language_entries(language, count, seed)), index)
+
+
 def chunk_entries(entries: List[Dict], chunk_size: int) -> List[List[Dict]]:
     if chunk_size < 1:
         raise ValueError("chunk_size_must_be_positive")
     return [entries[i : i + chunk_size] for i in range(0, len(entries), chunk_size)]
 
 
-def write_pilot_dataset(output_dir: str, per_language: int = 1200, chunk_size: int = 300) -> Dict:
+def _chunk_params(language: str, seed: int, start: int, stop: int, storage_format: str) -> Dict:
+    # Everything a chunk's content depends on, including the QA rules its auto_qa
+    # was checked with. per_language is not part of it: growing a run keeps its
+    # earlier chunks valid.
+    return {
+        "generator_version": GENERATOR_VERSION,
+        "language": language,
+        "seed": seed,
+        "start": start,
+        "stop": stop,
+        "storage_format": storage_format,
+        "qa_rules": _qa_rules(language),
+    }
+
+
+def _qa_rules(language: str) -> Dict:
+    return {"checks": rule_fingerprints(language), "similarity": similarity_settings()}
+
+
+def _chunk_ranges(per_language: int, chunk_size: int) -> List[Tuple[int, int, int]]:
+    return [
+        (number, start, min(start + chunk_size, per_language))
+        for number, start in enumerate(range(0, per_language, chunk_size), start=1)
+    ]
+
+
+def _chunk_rel_file(language: str, number: int, storage_format: str) -> str:
+    return str(Path(language) / chunk_filename(number, storage_format))
+
+
+def _write_chunk(
+    base: Path,
+    language: str,
+    number: int,
+    chunk: List[Dict],
+    params: Dict,
+    metrics: Optional[Metrics] = None,
+) -> Dict:
+    rel_file = _chunk_rel_file(language, number, params["storage_format"])
+    if metrics is None:
+        payload = encode_chunk(chunk, params["storage_format"])
+        write_atomic(base / rel_file, payload)
+    else:
+        with metrics.timed("stage.serialization", len(chunk)):
+            payload = encode_chunk(chunk, params["storage_format"])
+        with metrics.timed("stage.disk_write"):
+            write_atomic(base / rel_file, payload)
+    return {
+        "file": rel_file,
+        "sha256": hashlib.sha256(payload).hexdigest(),
+        "entries": len(chunk),
+        "params": params,
+        "similar": _encode_flags(bool(entry["auto_qa"].get("similarity")) for entry in chunk),
+    }
+
+
+# A chunk's similarity flags are stored in its record as a hex bitmask (bit k is
+# entry start + k), so a chunk can be regenerated without rebuilding the index.
+def _encode_flags(flags: Iterable[bool]) -> str:
+    return format(sum(1 << k for k, flag in enumerate(flags) if flag), "x")
+
+
+def _decode_flags(mask: str, count: int) -> List[bool]:
+    value = int(mask, 16)
+    return [bool(value >> k & 1) for k in range(count)]
+
+
+def _load_previous_records(base: Path) -> Dict[Tuple[str, str], Dict]:
+    # Chunk records from the last complete manifest, overridden by the journal of
+    # an interrupted run. Keyed by (language, file).
+    records: Dict[Tuple[str, str], Dict] = {}
+    manifest_path = base / "manifest.json"
+    if manifest_path.exists():
+        previous = json.loads(manifest_path.read_text(encoding="utf-8"))
+        for language, info in previous.get("languages", {}).items():
+            for record in info.get("chunk_records", []):
+                records[(language, record["file"])] = record
+
+    journal_path = base / BUILD_JOURNAL
+    if journal_path.exists():
+        for line in journal_path.read_text(encoding="utf-8").splitlines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn last line of an interrupted append
+            records[(record["params"]["language"], record["file"])] = record
+    return records
+
+
+def _is_reusable(base: Path, record: Optional[Dict], params: Dict) -> bool:
+    if record is None or record.get("params") != params:
+        return False
+    path = base / record["file"]
+    return path.exists() and hashlib.sha256(path.read_bytes()).hexdigest() == record["sha256"]
+
+
+def _append_journal(base: Path, record: Dict) -> None:
+    with (base / BUILD_JOURNAL).open("a", encoding="utf-8") as fp:
+        fp.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def _language_clue(language: str, i: int) -> str:
+    return normalize(_build_clue(language, _build_word(language, i), i))
+
+
+def _plan_language(language: str, count: int, instrument: bool = False) -> Tuple[List[bool], Optional[Dict]]:
+    # Entry i is similar when any entry j < i of the language has a near-duplicate
+    # clue. That depends on the index, not on which chunk is generated first, so
+    # the scan runs here once and chunk workers get their slice of the flags.
+    started = time.perf_counter()
+    index = SimilarityIndex()
+    similar = [index.check_and_add(_language_clue(language, i)) for i in range(count)]
+    if not instrument:
+        return similar, None
+    metrics = Metrics()
+    metrics.record("stage.plan", time.perf_counter() - started, count, sum(similar))
+    return similar, metrics.snapshot()
+
+
+def _generate_range(language: str, start: int, stop: int, seed: int, metrics: Optional[Metrics]) -> List[Dict]:
+    if metrics is None:
+        return [_build_entry(language, i, seed) for i in range(start, stop)]
+    with metrics.timed("stage.generation", stop - start):
+        return [_build_entry(language, i, seed) for i in range(start, stop)]
+
+
+def _generate_and_write_chunk(
+    output_dir: str,
+    number: int,
+    similar: List[bool],
+    params: Dict,
+    instrument: bool = False,
+    qa_cache_path: Optional[str] = None,
+) -> Tuple[Dict, Optional[Dict]]:
+    # workers cannot share the parent's Metrics; they return a snapshot to merge
+    metrics = Metrics() if instrument else None
+    language = params["language"]
+    entries = _generate_range(language, params["start"], params["stop"], params["seed"], metrics)
+    cache = QACache(qa_cache_path) if qa_cache_path is not None else None
+    try:
+        if metrics is None:
+            qa_results = run_auto_qa_batch(entries, similarity_flags=similar, cache=cache)
+        else:
+            with metrics.timed("stage.qa", len(entries)):
+                qa_results = run_auto_qa_batch(entries, similarity_flags=similar, metrics=metrics, cache=cache)
+    finally:
+        if cache is not None:
+            cache.close()
+    for entry, qa in zip(entries, qa_results):
+        entry["auto_qa"] = qa
+    record = _write_chunk(Path(output_dir), language, number, entries, params, metrics)
+    return record, metrics.snapshot() if metrics is not None else None
+
+
+def _write_languages_parallel(
+    base: Path,
+    per_language: int,
+    chunk_size: int,
+    seed: int,
+    workers: int,
+    storage_format: str,
+    previous: Dict[Tuple[str, str], Dict],
+    metrics: Optional[Metrics] = None,
+    qa_cache_path: Optional[str] = None,
+) -> Dict[str, List[Dict]]:
+    instrument = metrics is not None
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        plans = {
+            language: pool.submit(_plan_language, language, per_language, instrument)
+            for language in LANGUAGES
+        }
+        slots: Dict[str, List] = {}
+        pending = {}
+        # chunks of a language are queued as soon as its plan is ready
+        for language in LANGUAGES:
+            similar, plan_snapshot = plans[language].result()
+            if plan_snapshot is not None:
+                metrics.merge(plan_snapshot)
+            slots[language] = []
+            for number, start, stop in _chunk_ranges(per_language, chunk_size):
+                params = _chunk_params(language, seed, start, stop, storage_format)
+                record = previous.get((language, _chunk_rel_file(language, number, storage_format)))
+                if _is_reusable(base, record, params):
+                    slots[language].append(record)
+                    continue
+                future = pool.submit(
+                    _generate_and_write_chunk,
+                    str(base),
+                    number,
+                    similar[start:stop],
+                    params,
+                    instrument,
+                    qa_cache_path,
+                )
+                pending[future] = (language, len(slots[language]))
+                slots[language].append(None)
+
+        for future in as_completed(pending):
+            record, snapshot = future.result()
+            if snapshot is not None:
+                metrics.merge(snapshot)
+            _append_journal(base, record)
+            language, position = pending[future]
+            slots[language][position] = record
+    # slots keep language/chunk order, so the manifest never depends on timing
+    return slots
+
+
+class _PipelinedWriter:
+    # Encodes and writes finished chunks on background threads while the caller
+    # generates and checks the next one. At most `depth` chunks are in flight;
+    # submit blocks beyond that, so entry memory stays bounded.
+    def __init__(self, base: Path, threads: int, metrics: Optional[Metrics]) -> None:
+        self._base = base
+        self._metrics = metrics
+        # written to by the threads only; merged into `metrics` once they are done
+        self._thread_metrics = Metrics() if metrics is not None else None
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="chunk-writer")
+        self._slots = threading.BoundedSemaphore(threads * 2)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+        if self._metrics is not None:
+            self._metrics.merge(self._thread_metrics.snapshot())
+            self._thread_metrics = Metrics()
+
+    def submit(self, language: str, number: int, entries: List[Dict], params: Dict) -> Future:
+        self._slots.acquire()
+        try:
+            future = self._pool.submit(self._write, language, number, entries, params)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _write(self, language: str, number: int, entries: List[Dict], params: Dict) -> Dict:
+        # Metrics is not thread-safe: each write records into its own and merges
+        local = Metrics() if self._thread_metrics is not None else None
+        record = _write_chunk(self._base, language, number, entries, params, local)
+        with self._lock:
+            _append_journal(self._base, record)
+            if local is not None:
+                self._thread_metrics.merge(local.snapshot())
+        return record
+
+
+def _write_languages_serial(
+    base: Path,
+    per_language: int,
+    chunk_size: int,
+    seed: int,
+    storage_format: str,
+    previous: Dict[Tuple[str, str], Dict],
+    metrics: Optional[Metrics] = None,
+    qa_cache: Optional[QACache] = None,
+    writer: Optional[_PipelinedWriter] = None,
+) -> Dict[str, List[Dict]]:
+    records_by_language: Dict[str, List[Dict]] = {}
+    pending: Dict[str, List[Union[Dict, Future]]] = {}
+    for language in LANGUAGES:
+        index = SimilarityIndex()
+        records: List[Union[Dict, Future]] = []
+        # streaming: each chunk is generated, checked and written before the next
+        # one starts, so entry memory is bounded by chunk_size
+        for number, start, stop in _chunk_ranges(per_language, chunk_size):
+            params = _chunk_params(language, seed, start, stop, storage_format)
+            record = previous.get((language, _chunk_rel_file(language, number, storage_format)))
+            if _is_reusable(base, record, params):
+                # later chunks are still checked against this chunk's clues
+                index.add_many(_language_clue(language, i) for i in range(start, stop))
+                records.append(record)
+                continue
+
+            entries = _generate_range(language, start, stop, seed, metrics)
+            if metrics is None:
+                _apply_qa(entries, index, cache=qa_cache)
+            else:
+                with metrics.timed("stage.qa", len(entries)):
+                    _apply_qa(entries, index, metrics, qa_cache)
+            if writer is not None:
+                records.append(writer.submit(language, number, entries, params))
+                continue
+            record = _write_chunk(base, language, number, entries, params, metrics)
+            _append_journal(base, record)
+            records.append(record)
+        pending[language] = records
+
+    for language, records in pending.items():
+        records_by_language[language] = [
+            record.result() if isinstance(record, Future) else record for record in records
+        ]
+    return records_by_language
+
+
+def write_pilot_dataset(
+    output_dir: str,
+    per_language: int = 1200,
+    chunk_size: int = 300,
+    seed: int = 42,
+    workers: int = 1,
+    storage_format: str = "json",
+    resume: bool = True,
+    metrics: Optional[Metrics] = None,
+    qa_cache_path: Optional[str] = None,
+    writer_threads: int = 0,
+    entry_index: bool = True,
+) -> Dict:
+    # qa_cache_path: SQLite file of cached QA results (see qa_cache), shared by runs
+    # writer_threads: serial mode only; > 0 writes chunks in the background
+    if chunk_size < 1:
+        raise ValueError("chunk_size_must_be_positive")
+    if workers < 1:
+        raise ValueError("workers_must_be_positive")
+    if writer_threads < 0:
+        raise ValueError("writer_threads_must_not_be_negative")
+    if writer_threads and workers > 1:
+        # process workers already write their own chunks in parallel
+        raise ValueError("writer_threads_require_serial_mode")
+    if storage_format not in STORAGE_FORMATS:
+        raise ValueError("unknown_storage_format")
+
     base = Path(output_dir)
     base.mkdir(parents=True, exist_ok=True)
+    for language in LANGUAGES:
+        (base / language).mkdir(parents=True, exist_ok=True)
+
+    # resume: chunks whose params and sha256 still match are kept as they are.
+    # The previous records are loaded either way, so stale chunk files get removed.
+    previous = _load_previous_records(base)
+    reusable = previous if resume else {}
 
     manifest = {
         "generated_at": datetime.now(timezone.utc).isoformat(),
         "per_language": per_language,
         "chunk_size": chunk_size,
+        "storage_format": storage_format,
+        "generation": {"generator_version": GENERATOR_VERSION, "seed": seed},
         "languages": {},
     }
 
+    if workers > 1:
+        records_by_language = _write_languages_parallel(
+            base, per_language, chunk_size, seed, workers, storage_format, reusable, metrics, qa_cache_path
+        )
+    else:
+        qa_cache = QACache(qa_cache_path) if qa_cache_path is not None else None
+        writer = _PipelinedWriter(base, writer_threads, metrics) if writer_threads else None
+        try:
+            records_by_language = _write_languages_serial(
+                base, per_language, chunk_size, seed, storage_format, reusable, metrics, qa_cache, writer
+            )
+        finally:
+            if writer is not None:
+                writer.close()
+            if qa_cache is not None:
+                qa_cache.close()
+
     for language in LANGUAGES:
-        entries = generate_language_entries(language=language, count=per_language)
-        chunks = chunk_entries(entries, chunk_size=chunk_size)
+        records = records_by_language[language]
+        manifest["languages"][language] = {
+            "entries": per_language,
+            "chunks": len(records),
+            "files": [record["file"] for record in records],
+            "chunk_records": records,
+        }
 
-        lang_dir = base / language
-        lang_dir.mkdir(parents=True, exist_ok=True)
+    # chunks from an earlier, larger or differently shaped run are rolled back
+    current_files = {record["file"] for records in records_by_language.values() for record in records}
+    for _, rel_file in previous:
+        if rel_file not in current_files and (base / rel_file).exists():
+            (base / rel_file).unlink()
 
-        chunk_files = []
-        for idx, chunk in enumerate(chunks, start=1):
-            p = lang_dir / f"batch_{idx:03d}.json"
-            p.write_text(json.dumps(chunk, ensure_ascii=False, indent=2), encoding="utf-8")
-            chunk_files.append(str(p.relative_to(base)))
+    if entry_index:
+        # unchanged chunks keep their index rows, so resumed runs index only the delta
+        if metrics is None:
+            build_entry_index(base, manifest)
+        else:
+            with metrics.timed("stage.entry_index"):
+                build_entry_index(base, manifest)
+        manifest["entry_index"] = ENTRY_INDEX_FILE
+
+    if metrics is not None:
+        manifest["metrics"] = metrics.snapshot()
+    manifest_payload = json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8")
+    write_atomic(base / "manifest.json", manifest_payload)
+    (base / BUILD_JOURNAL).unlink(missing_ok=True)
+    return manifest
+
+
+def _similarity_flags_for(language: str, start: int, stop: int) -> List[bool]:
+    # fallback for records written without "similar": rebuilds the index of the
+    # entries before the chunk, which costs as much as planning that prefix
+    index = SimilarityIndex()
+    index.add_many(_language_clue(language, i) for i in range(start))
+    return [index.check_and_add(_language_clue(language, i)) for i in range(start, stop)]
 
-        manifest["languages"][language] = {
-            "entries": len(entries),
-            "chunks": len(chunks),
-            "files": chunk_files,
-        }
 
-    (base / "manifest.json").write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+def regenerate_chunks(
+    dataset_dir: str,
+    language: str,
+    numbers: Iterable[int],
+    seed: Optional[int] = None,
+    workers: int = 1,
+    qa_cache_path: Optional[str] = None,
+) -> Dict:
+    # Rewrites chunks of an existing dataset from their manifest params alone:
+    # entries come from the counter-based draws and similarity flags from the
+    # chunk record, so no other chunk is generated or read.
+    # seed re-rolls the chunks with a different seed. That is recorded in their
+    # params, so a later resumed write_pilot_dataset run restores the run seed.
+    # Chunks are always re-checked with the current QA rules; stored similarity
+    # flags are only reused while the similarity settings are unchanged.
+    if workers < 1:
+        raise ValueError("workers_must_be_positive")
+    base = Path(dataset_dir)
+    manifest = read_manifest(base)
+    if language not in manifest["languages"]:
+        raise ValueError("unknown_language")
+    storage_format = manifest_storage_format(manifest)
+    records = manifest["languages"][language]["chunk_records"]
+    positions = {record["file"]: position for position, record in enumerate(records)}
+
+    jobs = []
+    for number in sorted(set(numbers)):
+        position = positions.get(_chunk_rel_file(language, number, storage_format))
+        if position is None:
+            raise ValueError("unknown_chunk")
+        record = records[position]
+        params = dict(record["params"])
+        if params.get("generator_version") != GENERATOR_VERSION:
+            raise ValueError("generator_version_mismatch")
+        if seed is not None:
+            params["seed"] = seed
+        rules = _qa_rules(language)
+        same_similarity = params.get("qa_rules", {}).get("similarity") == rules["similarity"]
+        params["qa_rules"] = rules
+        start, stop = params["start"], params["stop"]
+        if "similar" in record and same_similarity:
+            similar = _decode_flags(record["similar"], stop - start)
+        else:
+            similar = _similarity_flags_for(language, start, stop)
+        jobs.append((position, number, similar, params))
+
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                (position, pool.submit(_generate_and_write_chunk, str(base), number, similar, params, False, qa_cache_path))
+                for position, number, similar, params in jobs
+            ]
+            results = [(position, future.result()[0]) for position, future in futures]
+    else:
+        results = [
+            (position, _generate_and_write_chunk(str(base), number, similar, params, qa_cache_path=qa_cache_path)[0])
+            for position, number, similar, params in jobs
+        ]
+    for position, record in results:
+        records[position] = record
+
+    if "entry_index" in manifest:
+        build_entry_index(base, manifest)
+    manifest_payload = json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8")
+    write_atomic(base / "manifest.json", manifest_payload)
     return manifest
+
+
+def regenerate_chunk(
+    dataset_dir: str,
+    language: str,
+    number: int,
+    seed: Optional[int] = None,
+    qa_cache_path: Optional[str] = None,
+) -> Dict:
+    manifest = regenerate_chunks(dataset_dir, language, [number], seed=seed, qa_cache_path=qa_cache_path)
+    return manifest["languages"][language]["chunk_records"][number - 1]
@@ -0,0 +1,100 @@
+"""On-disk LRU cache for auto-QA check results."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from typing import Any, Dict, Iterable, List, Mapping
+
+DEFAULT_MAX_ENTRIES = 500_000
+# keeps each lookup below SQLite's bound-parameter limit
+_LOOKUP_BATCH = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS qa_results (
+    cache_key TEXT PRIMARY KEY,
+    flags TEXT NOT NULL,
+    last_used INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_qa_results_last_used ON qa_results (last_used);
+"""
+
+
+# Keys are opaque to the cache; auto_qa builds them from the entry hash, the check
+# name and that check's rule fingerprint. Recency is tracked per batch: every
+# get_many/put_many call advances one tick and stamps the rows it touched.
+class QACache:
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries_must_be_positive")
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # parallel pilot workers open the same file, so wait for their writes
+        self._conn = sqlite3.connect(path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._tick = self._conn.execute("SELECT COALESCE(MAX(last_used), 0) FROM qa_results").fetchone()[0]
+        # Upper bound on the row count, so put_many does not scan the table per
+        # batch: replaced keys are counted as new and other processes' evictions
+        # are not seen. Only when it crosses max_entries is the table counted.
+        self._rows = len(self)
+
+    def __enter__(self) -> "QACache":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM qa_results").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[str]]:
+        wanted = list(dict.fromkeys(keys))
+        found: Dict[str, List[str]] = {}
+        for start in range(0, len(wanted), _LOOKUP_BATCH):
+            batch = wanted[start : start + _LOOKUP_BATCH]
+            placeholders = ", ".join("?" * len(batch))
+            rows = self._conn.execute(
+                f"SELECT cache_key, flags FROM qa_results WHERE cache_key IN ({placeholders})", batch
+            )
+            for cache_key, flags in rows:
+                found[cache_key] = json.loads(flags)
+        self.hits += len(found)
+        self.misses += len(wanted) - len(found)
+        if found:
+            self._tick += 1
+            with self._conn:
+                self._conn.executemany(
+                    "UPDATE qa_results SET last_used = ? WHERE cache_key = ?",
+                    [(self._tick, cache_key) for cache_key in found],
+                )
+        return found
+
+    def put_many(self, results: Mapping[str, List[str]]) -> None:
+        if not results:
+            return
+        self._tick += 1
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO qa_results (cache_key, flags, last_used) VALUES (?, ?, ?)",
+                [(cache_key, json.dumps(flags), self._tick) for cache_key, flags in results.items()],
+            )
+            self._rows += len(results)
+            if self._rows <= self.max_entries:
+                return
+            self._rows = len(self)
+            if self._rows <= self.max_entries:
+                return
+            # evict a little below the cap, so the next count is some batches away
+            excess = self._rows - (self.max_entries - self.max_entries // 20)
+            self._conn.execute(
+                "DELETE FROM qa_results WHERE cache_key IN "
+                "(SELECT cache_key FROM qa_results ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+            self._rows -= excess
@@ -0,0 +1,171 @@
+"""Persistent SQLite store for the reviewer queue."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+from tools.content_pipeline.reviewer_queue import QueueItem, ReviewDecision, resolve_decision
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS queue_items (
+    entry_id TEXT PRIMARY KEY,
+    language TEXT NOT NULL,
+    word TEXT NOT NULL,
+    clue_text TEXT NOT NULL,
+    auto_flags TEXT NOT NULL,
+    score_summary TEXT NOT NULL,
+    source_trace TEXT NOT NULL,
+    status TEXT NOT NULL,
+    last_action TEXT,
+    reason_code TEXT,
+    note TEXT NOT NULL DEFAULT ''
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_queue_status_language ON queue_items (status, language, entry_id);
+CREATE INDEX IF NOT EXISTS idx_queue_language ON queue_items (language, entry_id);
+CREATE TABLE IF NOT EXISTS queue_item_flags (
+    entry_id TEXT NOT NULL,
+    flag TEXT NOT NULL,
+    PRIMARY KEY (entry_id, flag)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_queue_flags_flag ON queue_item_flags (flag, entry_id);
+"""
+
+_ITEM_COLUMNS = "entry_id, language, word, clue_text, auto_flags, score_summary, source_trace, status"
+
+
+def _row_to_item(row: Sequence[Any]) -> QueueItem:
+    return QueueItem(
+        entry_id=row[0],
+        language=row[1],
+        word=row[2],
+        clue_text=row[3],
+        auto_flags=json.loads(row[4]),
+        score_summary=json.loads(row[5]),
+        source_trace=json.loads(row[6]),
+        status=row[7],
+    )
+
+
+class QueueStore:
+    def __init__(self, path: str) -> None:
+        self._conn = sqlite3.connect(path)
+        # WAL lets the admin UI read pages while a bulk decision is being written
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def __enter__(self) -> "QueueStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def add_items(self, items: Iterable[QueueItem]) -> int:
+        # re-adding a queued entry refreshes its content; reviewer state (status,
+        # last_action, reason_code, note) is kept
+        added = 0
+        with self._conn:
+            for item in items:
+                self._conn.execute(
+                    f"INSERT INTO queue_items ({_ITEM_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (entry_id) DO UPDATE SET language = excluded.language, word = excluded.word, "
+                    "clue_text = excluded.clue_text, auto_flags = excluded.auto_flags, "
+                    "score_summary = excluded.score_summary, source_trace = excluded.source_trace",
+                    (
+                        item.entry_id,
+                        item.language,
+                        item.word,
+                        item.clue_text,
+                        json.dumps(item.auto_flags, ensure_ascii=False),
+                        json.dumps(item.score_summary, ensure_ascii=False),
+                        json.dumps(item.source_trace, ensure_ascii=False),
+                        item.status,
+                    ),
+                )
+                self._conn.execute("DELETE FROM queue_item_flags WHERE entry_id = ?", (item.entry_id,))
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO queue_item_flags (entry_id, flag) VALUES (?, ?)",
+                    [(item.entry_id, flag) for flag in item.auto_flags],
+                )
+                added += 1
+        return added
+
+    def get(self, entry_id: str) -> Optional[QueueItem]:
+        row = self._conn.execute(
+            f"SELECT {_ITEM_COLUMNS} FROM queue_items WHERE entry_id = ?", (entry_id,)
+        ).fetchone()
+        return _row_to_item(row) if row else None
+
+    def _filters(
+        self,
+        status: Optional[str],
+        language: Optional[str],
+        flag: Optional[str],
+    ) -> Tuple[str, List[Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        if language is not None:
+            clauses.append("language = ?")
+            params.append(language)
+        if flag is not None:
+            clauses.append("entry_id IN (SELECT entry_id FROM queue_item_flags WHERE flag = ?)")
+            params.append(flag)
+        return " AND ".join(clauses) or "1 = 1", params
+
+    def fetch_page(
+        self,
+        status: Optional[str] = None,
+        language: Optional[str] = None,
+        flag: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> List[QueueItem]:
+        # keyset pagination: pass the last entry_id of a page as `after` for the next one
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError("invalid_page_size")
+        where, params = self._filters(status, language, flag)
+        if after is not None:
+            where += " AND entry_id > ?"
+            params.append(after)
+        rows = self._conn.execute(
+            f"SELECT {_ITEM_COLUMNS} FROM queue_items WHERE {where} ORDER BY entry_id LIMIT ?",
+            (*params, limit),
+        ).fetchall()
+        return [_row_to_item(row) for row in rows]
+
+    def count(
+        self,
+        status: Optional[str] = None,
+        language: Optional[str] = None,
+        flag: Optional[str] = None,
+    ) -> int:
+        where, params = self._filters(status, language, flag)
+        return self._conn.execute(f"SELECT COUNT(*) FROM queue_items WHERE {where}", params).fetchone()[0]
+
+    def apply_decisions(self, decisions: Iterable[Tuple[str, ReviewDecision]]) -> int:
+        # validate everything first, so one bad decision leaves the queue untouched
+        updates = [
+            (resolve_decision(decision), decision.action, decision.reason_code, decision.note, entry_id)
+            for entry_id, decision in decisions
+        ]
+        with self._conn:
+            for update in updates:
+                cursor = self._conn.execute(
+                    "UPDATE queue_items SET status = ?, last_action = ?, reason_code = ?, note = ? "
+                    "WHERE entry_id = ?",
+                    update,
+                )
+                if cursor.rowcount == 0:
+                    raise ValueError("unknown_entry_id")
+        return len(updates)
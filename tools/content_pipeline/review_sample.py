@@ -2,53 +2,70 @@
 
 from __future__ import annotations
 
-import csv
 import json
-from collections import defaultdict
+import math
 from pathlib import Path
 from random import Random
-from typing import Dict, Iterable, List, Tuple
+from typing import Any, Dict, Iterable, List, Tuple
+
+from tools.content_pipeline.chunk_store import iter_dataset_entries, read_manifest
+from tools.content_pipeline.entry_table import EntryTable
 
 LANGUAGES = ("de", "en", "fr", "es")
 DIFFICULTIES = (1, 2, 3, 4, 5)
-
-
-def _read_manifest(dataset_root: Path) -> Dict:
-    manifest_path = dataset_root / "manifest.json"
-    if not manifest_path.exists():
-        raise FileNotFoundError("manifest_not_found")
-    return json.loads(manifest_path.read_text(encoding="utf-8"))
-
-
-def _iter_entries(dataset_root: Path, manifest: Dict) -> Iterable[Dict]:
-    for language, info in manifest.get("languages", {}).items():
-        for rel_file in info.get("files", []):
-            path = dataset_root / rel_file
-            if not path.exists():
-                continue
-            entries = json.loads(path.read_text(encoding="utf-8"))
-            for entry in entries:
-                if entry.get("language") == language:
-                    yield entry
-
-
-def build_review_sample(dataset_dir: str, sample_size: int = 500, seed: int = 42) -> List[Dict]:
-    dataset_root = Path(dataset_dir)
-    manifest = _read_manifest(dataset_root)
-
-    buckets: Dict[Tuple[str, int], List[Dict]] = defaultdict(list)
-    for entry in _iter_entries(dataset_root, manifest):
-        language = entry.get("language")
-        difficulty = int(entry.get("difficulty", 0))
-        if language in LANGUAGES and difficulty in DIFFICULTIES:
-            buckets[(language, difficulty)].append(entry)
-
-    rng = Random(seed)
-    for items in buckets.values():
-        rng.shuffle(items)
-
+ALLOCATIONS = ("round_robin", "proportional")
+
+
+class _StratumReservoir:
+    # Algorithm L: a uniform sample of at most `capacity` items from a stream of
+    # unknown length. Random draws happen only on accepted items, not per entry.
+    def __init__(self, capacity: int, rng: Random) -> None:
+        self.capacity = capacity
+        self.rng = rng
+        self.items: List[Any] = []
+        self.seen = 0
+        self._weight = 1.0
+        self._next_accept = capacity
+
+    def _open_unit(self) -> float:
+        value = self.rng.random()
+        while value == 0.0:
+            value = self.rng.random()
+        return value
+
+    def _schedule_next(self) -> None:
+        self._weight *= math.exp(math.log(self._open_unit()) / self.capacity)
+        skip = math.floor(math.log(self._open_unit()) / math.log1p(-self._weight))
+        self._next_accept += skip + 1
+
+    def offer(self, entry: Any) -> None:
+        self.seen += 1
+        if len(self.items) < self.capacity:
+            self.items.append(entry)
+            if len(self.items) == self.capacity:
+                self._schedule_next()
+        elif self.seen == self._next_accept:
+            self.items[self.rng.randrange(self.capacity)] = entry
+            self._schedule_next()
+
+
+def _proportional_quotas(counts: Dict[Tuple[str, int], int], sample_size: int) -> Dict[Tuple[str, int], int]:
+    total = sum(counts.values())
+    if total <= sample_size:
+        return dict(counts)
+
+    # largest remainder method; ties go to the earlier stratum key
+    exact = {key: sample_size * count / total for key, count in counts.items()}
+    quotas = {key: int(value) for key, value in exact.items()}
+    leftover = sample_size - sum(quotas.values())
+    for key in sorted(exact, key=lambda k: (-(exact[k] - quotas[k]), k))[:leftover]:
+        quotas[key] += 1
+    return quotas
+
+
+def _round_robin(buckets: Dict[Tuple[str, int], List[Any]], sample_size: int) -> List[Any]:
     # proportional-ish baseline: one from each available bucket, then round-robin fill
-    sample: List[Dict] = []
+    sample: List[Any] = []
     bucket_keys = sorted(buckets.keys())
 
     for key in bucket_keys:
@@ -67,7 +84,82 @@ def build_review_sample(dataset_dir: str, sample_size: int = 500, seed: int = 42
     return sample
 
 
+def _sample_strata(
+    strata: Iterable[Tuple[Tuple[str, int], Any]],
+    sample_size: int,
+    seed: int,
+    allocation: str,
+) -> List[Any]:
+    # No stratum can contribute more than sample_size items, so a reservoir of that
+    # size per (language, difficulty) keeps memory independent of the dataset size.
+    rng = Random(seed)
+    reservoirs: Dict[Tuple[str, int], _StratumReservoir] = {}
+    for key, item in strata:
+        if key not in reservoirs:
+            reservoirs[key] = _StratumReservoir(sample_size, rng)
+        reservoirs[key].offer(item)
+
+    buckets = {key: reservoirs[key].items for key in sorted(reservoirs)}
+    for items in buckets.values():
+        rng.shuffle(items)
+
+    if allocation == "proportional":
+        quotas = _proportional_quotas({key: r.seen for key, r in reservoirs.items()}, sample_size)
+        buckets = {key: items[: quotas[key]] for key, items in buckets.items()}
+
+    return _round_robin(buckets, sample_size)
+
+
+def build_review_sample(
+    dataset_dir: str,
+    sample_size: int = 500,
+    seed: int = 42,
+    allocation: str = "round_robin",
+) -> List[Dict]:
+    if allocation not in ALLOCATIONS:
+        raise ValueError("invalid_allocation")
+    if sample_size < 1:
+        return []
+
+    dataset_root = Path(dataset_dir)
+    manifest = read_manifest(dataset_root)
+
+    def strata() -> Iterable[Tuple[Tuple[str, int], Dict]]:
+        for entry in iter_dataset_entries(dataset_root, manifest):
+            language = entry.get("language")
+            difficulty = int(entry.get("difficulty", 0))
+            if language in LANGUAGES and difficulty in DIFFICULTIES:
+                yield (language, difficulty), entry
+
+    return _sample_strata(strata(), sample_size, seed, allocation)
+
+
+def build_review_sample_from_table(
+    table: EntryTable,
+    sample_size: int = 500,
+    seed: int = 42,
+    allocation: str = "round_robin",
+) -> List[Dict]:
+    # Same sample as build_review_sample over the same entries in the same order;
+    # reservoirs hold row ids and only the sampled rows are turned into dicts.
+    if allocation not in ALLOCATIONS:
+        raise ValueError("invalid_allocation")
+    if sample_size < 1 or not len(table):
+        return []
+
+    def strata() -> Iterable[Tuple[Tuple[str, int], int]]:
+        columns = zip(table.column("language"), table.column("difficulty"))
+        for row, (language, difficulty) in enumerate(columns):
+            difficulty = int(difficulty if difficulty is not None else 0)
+            if language in LANGUAGES and difficulty in DIFFICULTIES:
+                yield (language, difficulty), row
+
+    return list(table.rows(_sample_strata(strata(), sample_size, seed, allocation)))
+
+
 def write_review_exports(sample: List[Dict], output_dir: str) -> Dict[str, str]:
+    import csv
+
     out = Path(output_dir)
     out.mkdir(parents=True, exist_ok=True)
 
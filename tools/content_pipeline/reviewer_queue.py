@@ -3,7 +3,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional
+
+if TYPE_CHECKING:
+    from tools.content_pipeline.lifecycle_log import LifecycleLog
 
 
 REASON_CODES = {
@@ -15,6 +18,14 @@ REASON_CODES = {
     "duplicate",
 }
 
+ACTION_TO_STATUS = {
+    "approve": "approved",
+    "request_edit": "draft",
+    "escalate": "reviewed",
+    "reject": "deprecated",
+    "deprecate": "deprecated",
+}
+
 
 @dataclass
 class QueueItem:
@@ -35,16 +46,21 @@ class ReviewDecision:
     note: str = ""
 
 
-def apply_decision(item: QueueItem, decision: ReviewDecision) -> QueueItem:
-    action_to_status = {
-        "approve": "approved",
-        "request_edit": "draft",
-        "escalate": "reviewed",
-        "reject": "deprecated",
-        "deprecate": "deprecated",
-    }
+def queue_item_from_entry(entry: Mapping[str, Any]) -> QueueItem:
+    auto_qa = entry.get("auto_qa", {})
+    return QueueItem(
+        entry_id=entry["entry_id"],
+        language=entry["language"],
+        word=entry["word"],
+        clue_text=entry["clue_text"],
+        auto_flags=[flag for check in auto_qa.values() for flag in check],
+        score_summary=dict(entry.get("quality_scores", {})),
+        source_trace=dict(entry.get("source_trace", {})),
+    )
 
-    new_status = action_to_status.get(decision.action)
+
+def resolve_decision(decision: ReviewDecision) -> str:
+    new_status = ACTION_TO_STATUS.get(decision.action)
     if new_status is None:
         raise ValueError("invalid_action")
 
@@ -52,5 +68,12 @@ def apply_decision(item: QueueItem, decision: ReviewDecision) -> QueueItem:
         if decision.reason_code is None or decision.reason_code not in REASON_CODES:
             raise ValueError("A valid reason_code is required for non-approve actions")
 
-    item.status = new_status
+    return new_status
+
+
+def apply_decision(item: QueueItem, decision: ReviewDecision, log: Optional[LifecycleLog] = None) -> QueueItem:
+    # with a log the decision is recorded (and checked against the state machine) first
+    if log is not None:
+        log.apply_decisions([(item.entry_id, decision)])
+    item.status = resolve_decision(decision)
     return item
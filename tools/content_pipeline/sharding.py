@@ -0,0 +1,286 @@
+"""Coordinator-free sharded processing of pilot dataset chunks via lease files."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from tools.content_pipeline.auto_qa import BANNED_TERMS, rule_fingerprints, run_auto_qa_batch
+from tools.content_pipeline.chunk_store import (
+    STORAGE_FORMATS,
+    encode_chunk,
+    manifest_storage_format,
+    read_chunk,
+    read_manifest,
+    write_atomic,
+)
+from tools.content_pipeline.phase1_model import validate_entries, validation_rules
+from tools.content_pipeline.qa_cache import QACache
+
+SHARD_DIR = "shards"
+DEFAULT_LEASE_SECONDS = 300
+
+# Layout under <dataset>/shards/<task>/<run key>/ (a hash of the task options and
+# of the rules the task applies, so exports to two output directories never share
+# leases or results, and a QA rule edit makes every chunk due again):
+#   leases/<chunk>.lease     one per claimed chunk, created with O_EXCL
+#   partials/<worker>.jsonl  one line per chunk the worker finished
+#   manifest.json            written by merge_partials
+# A lease holds {"worker", "expires_at", "state", "sha256"}. Workers skip chunks
+# whose lease is still valid or "done" for the chunk's current sha256; an expired
+# lease is renamed to a unique name and claimed again, so a crashed worker's
+# chunks get redone and rewritten chunks get reprocessed. The renamed file is
+# re-read first: if it is no longer the expired lease that was inspected, another
+# worker's fresh claim was moved by mistake and is put back. Only the worker and
+# expires_at named in a lease may mark it done.
+
+
+def _now() -> float:
+    return time.time()
+
+
+def _task_rules(task: str) -> Dict[str, Any]:
+    # qa keeps the stored similarity flags, so only the other checks' rules count
+    if task == "qa":
+        return {language: rule_fingerprints(language) for language in sorted(BANNED_TERMS)}
+    if task == "validate":
+        return validation_rules()
+    return {}
+
+
+def _run_key(task: str, options: Optional[Dict[str, Any]]) -> str:
+    canonical = {key: value for key, value in (options or {}).items() if value is not None}
+    if "output_dir" in canonical:
+        canonical["output_dir"] = os.path.abspath(canonical["output_dir"])
+    payload = json.dumps({"options": canonical, "rules": _task_rules(task)}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _task_dir(dataset_root: Path, task: str, options: Optional[Dict[str, Any]] = None) -> Path:
+    return dataset_root / SHARD_DIR / task / _run_key(task, options)
+
+
+def _read_partial(path: Path) -> Dict[str, Dict]:
+    # later lines win: a chunk redone after it was rewritten appears twice
+    chunks: Dict[str, Dict] = {}
+    if not path.exists():
+        return chunks
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            result = json.loads(line)
+        except json.JSONDecodeError:
+            continue  # torn last line of an interrupted append
+        chunks[result.pop("file")] = result
+    return chunks
+
+
+def _lease_path(task_dir: Path, rel_file: str) -> Path:
+    return task_dir / "leases" / (Path(rel_file).as_posix().replace("/", "__") + ".lease")
+
+
+def _read_lease(path: Path, lease_seconds: float) -> Optional[Dict]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except json.JSONDecodeError:
+        # caught between the O_EXCL create and its first write: held from its mtime
+        try:
+            return {"state": "claimed", "expires_at": path.stat().st_mtime + lease_seconds}
+        except FileNotFoundError:
+            return None
+
+
+def _try_claim(path: Path, worker_id: str, lease_seconds: float, sha256: Optional[str]) -> Optional[float]:
+    # Returns the claim's expires_at, which _finish_lease uses to check ownership.
+    lease = _read_lease(path, lease_seconds)
+    if lease is not None:
+        if lease.get("state") == "done":
+            if lease.get("sha256") == sha256:
+                return None
+        elif lease.get("expires_at", 0) > _now():
+            return None
+        moved = path.with_name(f"{path.name}.expired.{worker_id}.{uuid.uuid4().hex}")
+        try:
+            os.rename(path, moved)
+        except FileNotFoundError:
+            return None  # another worker took the expired lease first
+        if _read_lease(moved, lease_seconds) != lease:
+            # replaced by a fresh claim between the read and the rename: put it back
+            try:
+                os.link(moved, path)
+            except FileExistsError:
+                pass
+            moved.unlink(missing_ok=True)
+            return None
+        # the expired lease was ours to replace; it is not kept around
+        moved.unlink(missing_ok=True)
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return None
+    expires_at = _now() + lease_seconds
+    with os.fdopen(fd, "w", encoding="utf-8") as fp:
+        json.dump({"worker": worker_id, "expires_at": expires_at, "state": "claimed"}, fp)
+    return expires_at
+
+
+def _finish_lease(path: Path, worker_id: str, expires_at: float, lease_seconds: float, sha256: Optional[str]) -> bool:
+    # a worker whose lease expired and was taken over leaves the new owner's lease alone
+    lease = _read_lease(path, lease_seconds)
+    if lease is None or lease.get("worker") != worker_id or lease.get("expires_at") != expires_at:
+        return False
+    payload = json.dumps({"worker": worker_id, "expires_at": None, "state": "done", "sha256": sha256}).encode("utf-8")
+    write_atomic(path, payload)
+    return True
+
+
+def _task_qa(dataset_root: Path, rel_file: str, entries: List[Dict], options: Dict) -> Dict:
+    # Similarity depends on the whole language, so the stored flags are kept and
+    # every other check is re-run.
+    similar = [bool(entry.get("auto_qa", {}).get("similarity")) for entry in entries]
+    cache = QACache(options["qa_cache_path"]) if options.get("qa_cache_path") else None
+    try:
+        results = run_auto_qa_batch(entries, similarity_flags=similar, cache=cache)
+    finally:
+        if cache is not None:
+            cache.close()
+    flagged: Dict[str, int] = {}
+    changed: List[str] = []
+    for entry, qa in zip(entries, results):
+        for check, flags in qa.items():
+            if flags:
+                flagged[check] = flagged.get(check, 0) + 1
+        if qa != entry.get("auto_qa"):
+            changed.append(entry["entry_id"])
+    return {"entries": len(entries), "flagged": dict(sorted(flagged.items())), "changed": changed}
+
+
+def _task_validate(dataset_root: Path, rel_file: str, entries: List[Dict], options: Dict) -> Dict:
+    return {"entries": len(entries), "issues": validate_entries(entries)}
+
+
+def _task_export(dataset_root: Path, rel_file: str, entries: List[Dict], options: Dict) -> Dict:
+    # options: output_dir, storage_format (defaults to the source format),
+    # approved_only (default True)
+    storage_format = options.get("storage_format") or options["source_format"]
+    if storage_format not in STORAGE_FORMATS:
+        raise ValueError("unknown_storage_format")
+    if options.get("approved_only", True):
+        entries = [entry for entry in entries if entry.get("status") == "approved"]
+    suffix = STORAGE_FORMATS[options["source_format"]]
+    out_file = rel_file[: -len(suffix)] + STORAGE_FORMATS[storage_format]
+    target = Path(options["output_dir"]) / out_file
+    target.parent.mkdir(parents=True, exist_ok=True)
+    payload = encode_chunk(entries, storage_format)
+    write_atomic(target, payload)
+    return {"entries": len(entries), "output_file": out_file, "output_sha256": hashlib.sha256(payload).hexdigest()}
+
+
+SHARD_TASKS: Dict[str, Callable[[Path, str, List[Dict], Dict], Dict]] = {
+    "qa": _task_qa,
+    "validate": _task_validate,
+    "export": _task_export,
+}
+
+
+def _dataset_chunks(manifest: Dict) -> List[Tuple[str, str, Optional[str]]]:
+    chunks = []
+    for language, info in manifest.get("languages", {}).items():
+        hashes = {record["file"]: record["sha256"] for record in info.get("chunk_records", [])}
+        chunks.extend((language, rel_file, hashes.get(rel_file)) for rel_file in info.get("files", []))
+    return chunks
+
+
+def run_shard_worker(
+    dataset_dir: str,
+    task: str,
+    worker_id: str,
+    options: Optional[Dict[str, Any]] = None,
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    max_chunks: Optional[int] = None,
+) -> Dict:
+    # Claims and processes chunks until none are left (or max_chunks are done).
+    # Any number of workers can run this against the same dataset directory.
+    if task not in SHARD_TASKS:
+        raise ValueError("unknown_shard_task")
+    root = Path(dataset_dir)
+    manifest = read_manifest(root)
+    storage_format = manifest_storage_format(manifest)
+    task_options = {**(options or {}), "source_format": storage_format}
+    task_dir = _task_dir(root, task, options)
+    (task_dir / "leases").mkdir(parents=True, exist_ok=True)
+    (task_dir / "partials").mkdir(parents=True, exist_ok=True)
+
+    partial_path = task_dir / "partials" / f"{worker_id}.jsonl"
+    partial = {"worker": worker_id, "task": task, "chunks": _read_partial(partial_path)}
+    processed = 0
+    for language, rel_file, sha256 in _dataset_chunks(manifest):
+        if max_chunks is not None and processed >= max_chunks:
+            break
+        lease_path = _lease_path(task_dir, rel_file)
+        expires_at = _try_claim(lease_path, worker_id, lease_seconds, sha256)
+        if expires_at is None:
+            continue
+        entries = [
+            entry for entry in read_chunk(root / rel_file, storage_format)
+            if entry.get("language") == language
+        ]
+        result = SHARD_TASKS[task](root, rel_file, entries, task_options)
+        line = {"file": rel_file, "language": language, "sha256": sha256, **result}
+        # the result is on disk before the lease says done, so a finished chunk
+        # is never lost; appending keeps the I/O per chunk independent of how
+        # many chunks the worker has done
+        with partial_path.open("a", encoding="utf-8") as fp:
+            fp.write(json.dumps(line, ensure_ascii=False) + "\n")
+        line.pop("file")
+        partial["chunks"][rel_file] = line
+        _finish_lease(lease_path, worker_id, expires_at, lease_seconds, sha256)
+        processed += 1
+    return partial
+
+
+def merge_partials(dataset_dir: str, task: str, options: Optional[Dict[str, Any]] = None) -> Dict:
+    # Chunks come out in manifest order. If two workers both finished a chunk
+    # (a lease expired mid-run), the lowest worker id wins, so the merged
+    # manifest never depends on timing. Results for an older version of a chunk
+    # (different sha256) are ignored.
+    root = Path(dataset_dir)
+    manifest = read_manifest(root)
+    task_dir = _task_dir(root, task, options)
+    current_hashes = {rel_file: sha256 for _, rel_file, sha256 in _dataset_chunks(manifest)}
+    results: Dict[str, Tuple[str, Dict]] = {}
+    partial_dir = task_dir / "partials"
+    for partial_path in sorted(partial_dir.glob("*.jsonl")) if partial_dir.exists() else []:
+        worker = partial_path.stem
+        for rel_file, result in _read_partial(partial_path).items():
+            if rel_file not in current_hashes or result.get("sha256") != current_hashes[rel_file]:
+                continue
+            current = results.get(rel_file)
+            if current is None or worker < current[0]:
+                results[rel_file] = (worker, result)
+
+    chunks = []
+    missing = []
+    for _, rel_file, _ in _dataset_chunks(manifest):
+        if rel_file in results:
+            worker, result = results[rel_file]
+            chunks.append({"file": rel_file, "worker": worker, **result})
+        else:
+            missing.append(rel_file)
+
+    merged = {
+        "task": task,
+        "complete": not missing,
+        "missing": missing,
+        "workers": sorted({chunk["worker"] for chunk in chunks}),
+        "entries": sum(chunk.get("entries", 0) for chunk in chunks),
+        "chunks": chunks,
+    }
+    write_atomic(task_dir / "manifest.json", json.dumps(merged, ensure_ascii=False, indent=2).encode("utf-8"))
+    return merged
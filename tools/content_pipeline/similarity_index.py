@@ -0,0 +1,168 @@
+"""Corpus-wide near-duplicate index for clue similarity checks."""
+
+from __future__ import annotations
+
+import json
+import zlib
+from array import array
+from pathlib import Path
+from random import Random
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SHINGLE_SIZE = 3
+NUM_PERMUTATIONS = 30
+BANDS = 10
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SIMILARITY_THRESHOLD = 0.88
+INDEX_FORMAT_VERSION = 1
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MASK_64 = (1 << 64) - 1
+
+# Fixed seed: signatures (and therefore persisted band keys) must be stable
+# across processes and runs.
+_perm_rng = Random(20260201)
+_PERMUTATIONS = [
+    (_perm_rng.randrange(1, _MERSENNE_PRIME), _perm_rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+
+def _shingles(text: str) -> List[int]:
+    if len(text) <= SHINGLE_SIZE:
+        grams = {text}
+    else:
+        grams = {text[i : i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+    # crc32 instead of hash(): str hashing is randomized per process
+    return [zlib.crc32(g.encode("utf-8")) for g in grams]
+
+
+def _band_key(values: List[int]) -> int:
+    # FNV-1a style fold, independent of Python's tuple hashing
+    key = 0xCBF29CE484222325
+    for value in values:
+        key = ((key ^ value) * 0x100000001B3) & _MASK_64
+    return key
+
+
+def band_keys(normalized_text: str) -> List[int]:
+    hashed = _shingles(normalized_text)
+    signature = [min([(a * h + b) % _MERSENNE_PRIME for h in hashed]) for a, b in _PERMUTATIONS]
+    return [
+        _band_key(signature[band * ROWS_PER_BAND : (band + 1) * ROWS_PER_BAND])
+        for band in range(BANDS)
+    ]
+
+
+def similarity_settings() -> Dict[str, float]:
+    # everything that decides whether two clues count as similar
+    return {
+        "threshold": SIMILARITY_THRESHOLD,
+        "shingle_size": SHINGLE_SIZE,
+        "num_permutations": NUM_PERMUTATIONS,
+        "bands": BANDS,
+    }
+
+
+def is_near_duplicate(candidate: str, existing: str, threshold: float = SIMILARITY_THRESHOLD) -> bool:
+    # cheap upper bounds first; building the matcher and ratio() are the expensive part
+    total = len(candidate) + len(existing)
+    if not total or 2.0 * min(len(candidate), len(existing)) / total <= threshold:
+        return False
+    from difflib import SequenceMatcher  # only needed once a candidate survives the bounds
+
+    matcher = SequenceMatcher(None, candidate, existing)
+    return matcher.quick_ratio() > threshold and matcher.ratio() > threshold
+
+
+# Clues are reduced to character shingles and a MinHash signature that is split
+# into bands (LSH). A query only visits clues sharing a band bucket and then
+# verifies them with the same SequenceMatcher ratio auto_qa has always used,
+# so lookups stay sub-linear without changing what counts as a duplicate.
+class SimilarityIndex:
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD) -> None:
+        self.threshold = threshold
+        self._texts: List[str] = []
+        # band keys of item i live at [i * BANDS, (i + 1) * BANDS); packed as
+        # unsigned 64-bit ints instead of a list of Python ints per item
+        self._keys = array("Q")
+        self._exact: Dict[str, List[int]] = {}
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(BANDS)]
+        self._last_keys: Optional[Tuple[str, List[int]]] = None
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def text(self, item_id: int) -> str:
+        return self._texts[item_id]
+
+    def _insert(self, normalized_text: str, keys: List[int]) -> int:
+        item_id = len(self._texts)
+        self._texts.append(normalized_text)
+        self._keys.extend(keys)
+        self._exact.setdefault(normalized_text, []).append(item_id)
+        for band, key in enumerate(keys):
+            self._buckets[band].setdefault(key, []).append(item_id)
+        return item_id
+
+    def _keys_for(self, normalized_text: str) -> List[int]:
+        # query-then-add is the common pattern, so remember the last signature
+        if self._last_keys is None or self._last_keys[0] != normalized_text:
+            self._last_keys = (normalized_text, band_keys(normalized_text))
+        return self._last_keys[1]
+
+    def add(self, normalized_text: str) -> int:
+        return self._insert(normalized_text, self._keys_for(normalized_text))
+
+    def add_many(self, normalized_texts: Iterable[str]) -> None:
+        for text in normalized_texts:
+            self.add(text)
+
+    def find_similar(self, normalized_text: str) -> Optional[int]:
+        exact = self._exact.get(normalized_text)
+        if exact:
+            return exact[0]
+
+        checked = set()
+        for band, key in enumerate(self._keys_for(normalized_text)):
+            for item_id in self._buckets[band].get(key, ()):
+                if item_id in checked:
+                    continue
+                checked.add(item_id)
+                if is_near_duplicate(normalized_text, self._texts[item_id], self.threshold):
+                    return item_id
+        return None
+
+    def check_and_add(self, normalized_text: str) -> bool:
+        similar = self.find_similar(normalized_text)
+        self.add(normalized_text)
+        return similar is not None
+
+    def save(self, path: str) -> None:
+        payload = {
+            "format_version": INDEX_FORMAT_VERSION,
+            "threshold": self.threshold,
+            "num_permutations": NUM_PERMUTATIONS,
+            "bands": BANDS,
+            "items": [
+                [text, self._keys[item_id * BANDS : (item_id + 1) * BANDS].tolist()]
+                for item_id, text in enumerate(self._texts)
+            ],
+        }
+        Path(path).write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: str) -> "SimilarityIndex":
+        payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        if (
+            payload.get("format_version") != INDEX_FORMAT_VERSION
+            or payload.get("num_permutations") != NUM_PERMUTATIONS
+            or payload.get("bands") != BANDS
+        ):
+            raise ValueError("similarity_index_format_mismatch")
+
+        index = cls(threshold=payload.get("threshold", SIMILARITY_THRESHOLD))
+        # band keys are persisted, so loading does not recompute signatures
+        for text, keys in payload["items"]:
+            index._insert(text, keys)
+        return index
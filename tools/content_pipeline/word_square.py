@@ -0,0 +1,149 @@
+"""Word-square search over game words using per-(position, letter) bitsets."""
+
+from __future__ import annotations
+
+from random import Random
+from typing import Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+DEFAULT_MAX_NODES = 20_000
+DEFAULT_POOL_SIZE = 50
+
+
+def _bit_positions(mask: int) -> List[int]:
+    positions: List[int] = []
+    while mask:
+        low = mask & -mask
+        positions.append(low.bit_length() - 1)
+        mask ^= low
+    return positions
+
+
+class WordBitsetIndex:
+    # bits[pos][letter] has bit i set when words[i][pos] == letter, so "all words
+    # with these letters at these positions" is a handful of integer ANDs.
+    def __init__(self, words: Sequence[str]) -> None:
+        if not words:
+            raise ValueError("empty_word_list")
+        self.size = len(words[0])
+        if any(len(word) != self.size for word in words):
+            raise ValueError("mixed_word_lengths")
+        self.words = list(words)
+        self.all = (1 << len(words)) - 1
+        self.bits: List[Dict[str, int]] = [{} for _ in range(self.size)]
+        for i, word in enumerate(words):
+            for pos, letter in enumerate(word):
+                self.bits[pos][letter] = self.bits[pos].get(letter, 0) | (1 << i)
+
+    def letters_at(self, mask: int, pos: int) -> Set[str]:
+        return {letter for letter, bits in self.bits[pos].items() if bits & mask}
+
+    def with_letters(self, pos: int, letters: Set[str]) -> int:
+        mask = 0
+        for letter in letters:
+            mask |= self.bits[pos].get(letter, 0)
+        return mask
+
+
+def solve_word_square(
+    index: WordBitsetIndex,
+    rng: Optional[Random] = None,
+    max_nodes: int = DEFAULT_MAX_NODES,
+) -> Optional[Tuple[List[int], List[int]]]:
+    # Rows are filled top to bottom. col_masks[j] holds the words that still fit
+    # column j given the rows so far; a row candidate must put, at every column,
+    # a letter some of those words have at that depth. Returns (row word ids,
+    # column word ids) or None when max_nodes is used up. Rows are distinct, as
+    # are columns; a word may be both a row and a column (symmetric squares).
+    rng = rng or Random(0)
+    size = index.size
+    rows: List[int] = []
+    nodes = 0
+
+    def fill(col_masks: List[int], used: int) -> Optional[List[int]]:
+        nonlocal nodes
+        depth = len(rows)
+        if depth == size:
+            columns: List[int] = []
+            for mask in col_masks:
+                free = _bit_positions(mask & ~sum(1 << c for c in columns))
+                if not free:
+                    return None
+                columns.append(free[0])
+            return columns
+
+        candidates = index.all & ~used
+        for j, mask in enumerate(col_masks):
+            candidates &= index.with_letters(j, index.letters_at(mask, depth))
+            if not candidates:
+                return None
+
+        order = _bit_positions(candidates)
+        rng.shuffle(order)
+        for word_id in order:
+            nodes += 1
+            if nodes > max_nodes:
+                return None
+            word = index.words[word_id]
+            rows.append(word_id)
+            columns = fill(
+                [mask & index.bits[depth][word[j]] for j, mask in enumerate(col_masks)],
+                used | (1 << word_id),
+            )
+            if columns is not None:
+                return columns
+            rows.pop()
+        return None
+
+    columns = fill([index.all] * size, 0)
+    return (list(rows), columns) if columns is not None else None
+
+
+def build_grid_pool(
+    words: Sequence[str],
+    candidates: Sequence[int],
+    count: int = DEFAULT_POOL_SIZE,
+    seed: int = 42,
+    max_nodes: int = DEFAULT_MAX_NODES,
+    max_attempts: Optional[int] = None,
+) -> List[Dict[str, List[int]]]:
+    # candidates are positions in `words` (e.g. one profile's index list); the
+    # grids refer back to those positions. Attempts use independent shuffles, and
+    # duplicate grids are dropped, so the pool may come back short.
+    if not candidates:
+        return []
+    index = WordBitsetIndex([words[i] for i in candidates])
+    rng = Random(seed)
+    pool: List[Dict[str, List[int]]] = []
+    seen: Set[Tuple[int, ...]] = set()
+    for _ in range(max_attempts if max_attempts is not None else count * 4):
+        if len(pool) == count:
+            break
+        solved = solve_word_square(index, rng, max_nodes)
+        if solved is None:
+            continue
+        rows, columns = solved
+        if tuple(rows) in seen:
+            continue
+        seen.add(tuple(rows))
+        pool.append({"rows": [candidates[i] for i in rows], "columns": [candidates[i] for i in columns]})
+    return pool
+
+
+def add_grid_pools(
+    artifact: Dict,
+    count: int = DEFAULT_POOL_SIZE,
+    seed: int = 42,
+    max_nodes: int = DEFAULT_MAX_NODES,
+) -> Dict:
+    # fills artifact["grids"][profile] for a game artifact from game_artifact
+    profiles: Mapping[str, List[int]] = artifact["profiles"]
+    artifact["grids"] = {
+        profile: build_grid_pool(artifact["words"], indices, count, seed, max_nodes)
+        for profile, indices in profiles.items()
+    }
+    return artifact
+
+
+def grid_words(artifact: Mapping, grid: Mapping[str, List[int]]) -> Tuple[List[str], List[str]]:
+    words = artifact["words"]
+    return [words[i] for i in grid["rows"]], [words[i] for i in grid["columns"]]